@@ -1,20 +1,95 @@
 import logging
 import os
+from contextlib import asynccontextmanager
 
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from src.api.router import Router
-
-# Import auth module early to trigger Firebase initialization
-from src.core import auth  # noqa: F401
+from src.core.admission import AdmissionControlMiddleware
+from src.core.auth import initialize_firebase
+from src.core.config import settings
+from src.core.logs import RequestContextMiddleware, configure_logging
 from src.core.metrics import get_amp_writer
-from src.db.session import Base, engine
+from src.core.multiprocess import metrics_endpoint, multiproc_dir
+from src.core.profiling import ProfileRequestMiddleware
+from src.core.rate_limit import RateLimitHeadersMiddleware
+from src.core.timing import ServerTimingMiddleware
+from src.core.tracing import TracingMiddleware, configure_tracing, shutdown_tracing
+from src.db.holos import apply_invalidation
+from src.db.notify import PgNotifyListener
+from src.db.session import Base, get_engine
+from src.services.warmup import ready, warm_up
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Queue-based structured logging (see src/core/logs.py)
+configure_logging()
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+
+def _startup():
+    """Blocking startup work; runs in a thread before the worker takes traffic"""
+    # Per worker: the batch exporter's thread must start after the fork
+    if settings.TRACING_ENABLED:
+        configure_tracing()
+
+    # Firebase is imported and initialized here rather than at import time
+    if initialize_firebase():
+        logger.info("Firebase Admin SDK initialized successfully")
+    else:
+        logger.warning(
+            "Firebase Admin SDK not initialized. "
+            "FIREBASE_SERVICE_ACCOUNT_KEY may be missing or invalid. "
+            "Authentication will fail."
+        )
+
+    try:
+        logger.info("Attempting to create database tables...")
+        Base.metadata.create_all(bind=get_engine())
+        logger.info("Database tables created successfully")
+    except Exception as e:
+        logger.error(f"Failed to create database tables: {str(e)}", exc_info=True)
+        # Don't raise - allow the app to start even if tables already exist
+        # This prevents the app from crashing if tables are already created
+
+    if settings.WARMUP_ENABLED:
+        warm_up()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Size AnyIO's default threadpool (sync handlers outside the DB routes)
+    to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_TOKENS
+
+    listener = amp_writer = None
+    # During pytest, tests manage their own in-memory DB and schema
+    if not os.getenv("PYTEST_CURRENT_TEST"):
+        await to_thread.run_sync(_startup)
+
+        # Push this worker's metrics to AMP (no-op without an endpoint)
+        amp_writer = get_amp_writer()
+        amp_writer.start()
+
+        # Drop cached holo configs and stats when another worker changes them
+        channel = settings.HOLO_CONFIG_INVALIDATION_CHANNEL
+        engine = get_engine()
+        if channel and engine.dialect.name == "postgresql":
+            listener = PgNotifyListener(engine, channel, apply_invalidation)
+            listener.start()
+            logger.info("Listening for cache invalidations on '%s'", channel)
+
+    ready.set()
+    try:
+        yield
+    finally:
+        ready.clear()
+        if listener is not None:
+            listener.stop()
+        if amp_writer is not None:
+            await to_thread.run_sync(amp_writer.stop)
+        await to_thread.run_sync(shutdown_tracing)
+
+
+app = FastAPI(lifespan=lifespan)
 
 # CORS configuration
 # Get allowed origins from environment or use defaults
@@ -29,6 +104,20 @@ allowed_origins = [
     "https://www.holonote.xyz",
 ]
 
+# Added before CORS so that CORS stays outermost and browsers can read 429s
+# and 503s; admission control sheds load before it reaches the threadpools.
+# Server timing is innermost so queueing time is not counted as a phase
+if settings.DEBUG_ROUTES_ENABLED:
+    app.add_middleware(ProfileRequestMiddleware)
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(RateLimitHeadersMiddleware)
+app.add_middleware(AdmissionControlMiddleware)
+# Outside admission control so that queueing and shed requests are traced
+if settings.TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware)
+# Request ID, route and latency on every record logged while handling a request
+app.add_middleware(RequestContextMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,
@@ -45,7 +134,12 @@ try:
     from prometheus_fastapi_instrumentator import Instrumentator
 
     instrumentator = Instrumentator()
-    instrumentator.instrument(app).expose(app)
+    instrumentator.instrument(app)
+    if multiproc_dir():
+        # Every worker's values, merged from the shared multiprocess directory
+        app.add_api_route("/metrics", metrics_endpoint, include_in_schema=False)
+    else:
+        instrumentator.expose(app)
     logger.info("Prometheus metrics instrumentation enabled at /metrics")
 except ImportError as e:
     logger.error(
@@ -55,42 +149,3 @@ except ImportError as e:
     )
 except Exception as e:
     logger.error(f"Failed to set up Prometheus metrics: {str(e)}", exc_info=True)
-
-
-# Create database tables and verify Firebase initialization
-@app.on_event("startup")
-async def startup_event():
-    # During pytest, tests manage their own in-memory DB and schema
-    if os.getenv(
-        "PYTEST_CURRENT_TEST"
-    ):  # Automatically set by pytest when running tests
-        return
-
-    # Verify Firebase initialization
-    try:
-        import firebase_admin
-
-        firebase_admin.get_app()
-        logger.info("Firebase Admin SDK initialized successfully")
-    except ValueError:
-        logger.warning(
-            "Firebase Admin SDK not initialized. "
-            "FIREBASE_SERVICE_ACCOUNT_KEY may be missing or invalid. "
-            "Authentication will fail."
-        )
-
-    try:
-        logger.info("Attempting to create database tables...")
-        Base.metadata.create_all(bind=engine)
-        logger.info("Database tables created successfully")
-    except Exception as e:
-        logger.error(f"Failed to create database tables: {str(e)}", exc_info=True)
-        # Don't raise - allow the app to start even if tables already exist
-        # This prevents the app from crashing if tables are already created
-
-    # Initialize AMP writer (logs endpoint if configured)
-    amp_writer = get_amp_writer()
-    if amp_writer and amp_writer.enabled:
-        logger.info(
-            "AMP endpoint configured. Consider using AWS Distro for OpenTelemetry for remote write."
-        )
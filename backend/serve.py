@@ -0,0 +1,66 @@
+"""Production entry point: python serve.py
+
+Runs main:app in N uvicorn workers under gunicorn (see src/core/server.py).
+Without gunicorn installed it falls back to uvicorn's own process manager,
+which restarts dead workers but cannot preload the app.
+"""
+
+import logging
+
+from src.core.config import settings
+from src.core.logs import configure_logging
+from src.core.multiprocess import enable_multiprocess
+from src.core.server import gunicorn_options, worker_count
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    workers = worker_count()
+    if workers > 1:
+        # Before the app (and so prometheus_client) is imported
+        path = enable_multiprocess(settings.PROMETHEUS_MULTIPROC_DIR)
+        logger.info("Prometheus multiprocess metrics in %s", path)
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        import uvicorn
+
+        # No child_exit hook here: metrics files of restarted workers are only
+        # cleared on the next start
+        logger.warning("gunicorn not installed; using uvicorn's process manager")
+        uvicorn.run(
+            "main:app",
+            host=settings.SERVER_HOST,
+            port=settings.SERVER_PORT,
+            workers=workers,
+            loop="auto",
+            http="auto",
+            backlog=settings.SERVER_BACKLOG,
+            timeout_keep_alive=settings.SERVER_KEEPALIVE_SECONDS,
+            timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+            proxy_headers=True,
+            forwarded_allow_ips=settings.SERVER_FORWARDED_ALLOW_IPS,
+            # Keep configure_logging's pipeline; RequestContextMiddleware
+            # writes the access record
+            log_config=None,
+            access_log=False,
+        )
+        return
+
+    class Server(BaseApplication):
+        def load_config(self):
+            for key, value in gunicorn_options(workers).items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from main import app
+
+            return app
+
+    Server().run()
+
+
+if __name__ == "__main__":
+    configure_logging()
+    main()
@@ -13,5 +13,6 @@ class Router:
     def load_routers(self):
         for _, module_name, _ in pkgutil.iter_modules(routes.__path__):
             module = importlib.import_module(f"{routes.__name__}.{module_name}")
-            if hasattr(module, "router"):
+            # Modules can opt out with a falsy ENABLED (e.g. behind a setting)
+            if hasattr(module, "router") and getattr(module, "ENABLED", True):
                 self.app.include_router(module.router)
@@ -1,28 +1,83 @@
-from fastapi import APIRouter, Depends, Header, HTTPException
-from src.core.auth import verify_token, verify_token_and_ensure_user
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from src.core.auth import ensure_token_user, verify_token
+from src.core.config import settings
+from src.core.executors import auth_executor, db_executor
+from src.core.rate_limit import check_rate_limit
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
-def get_current_user(authorization: str = Header(...)):
+async def get_verified_token(authorization: str = Header(...)):
+    """Claims of a valid Firebase ID token; no database access"""
     if not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Invalid authorization header")
     token = authorization.split(" ")[1]
     try:
-        decoded = verify_token_and_ensure_user(token)
-        if decoded is None:
-            raise HTTPException(status_code=401, detail="Invalid or expired token")
-        return decoded  # contains uid, email, user_data, etc.
+        # Blocking Firebase call; bounded separately from DB work
+        decoded = await auth_executor.run(verify_token, token)
     except Exception:
+        decoded = None
+    if not decoded:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
+    return decoded
 
 
-@router.get("/protected")
+async def get_current_user(decoded=Depends(get_verified_token)):
+    try:
+        # Upserts the user on its own session: DB work, counted against the
+        # DB executor so it cannot outgrow the connection pool
+        user = await db_executor.run(ensure_token_user, decoded)
+    except Exception:
+        user = None
+    if user is None:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    return user  # contains uid, email, user_data, etc.
+
+
+def require_admin(user=Depends(get_current_user)):
+    """Allow only the Firebase uids listed in ADMIN_UIDS"""
+    if user["uid"] not in settings.ADMIN_UIDS:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return user
+
+
+def _rate_limit_dependency(budget: str):
+    def dependency(request: Request, token=Depends(get_verified_token)):
+        decision = check_rate_limit(token["uid"], budget)
+        if decision is None:
+            return
+        if not decision.allowed:
+            raise HTTPException(
+                status_code=429,
+                detail="Rate limit exceeded, please retry later",
+                headers=decision.headers(),
+            )
+        # Headers are added on the way out by RateLimitHeadersMiddleware
+        request.state.rate_limit = decision
+
+    return dependency
+
+
+_rate_limit_dependencies = {
+    budget: _rate_limit_dependency(budget) for budget in ("read", "write", "export")
+}
+
+
+def rate_limit(budget: str):
+    """Route dependency charging the request to the user's ``budget`` bucket.
+
+    Declared on the route, so it runs after token verification and before
+    ``get_current_user`` upserts the user or the handler opens a DB session.
+    """
+    return Depends(_rate_limit_dependencies[budget])
+
+
+@router.get("/protected", dependencies=[rate_limit("read")])
 def protected_route(user=Depends(get_current_user)):
     return {"message": f"Hello {user['uid']}, you are authenticated!"}
 
 
-@router.get("/user-info")
+@router.get("/user-info", dependencies=[rate_limit("read")])
 def get_user_info(user=Depends(get_current_user)):
     """Get current user information from database"""
     return {"firebase_uid": user["uid"], "user_data": user.get("user_data", {})}
@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from src.api.routes.auth import get_current_user, rate_limit
+from src.core.executors import DBRoute
+from src.db.session import get_db
+from src.models.dashboard import Dashboard
+from src.services.dashboard import get_dashboard
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"], route_class=DBRoute)
+
+
+@router.get("", response_model=Dashboard, dependencies=[rate_limit("read")])
+def get_dashboard_route(db: Session = Depends(get_db), user=Depends(get_current_user)):
+    """Home-screen data with a single auth check and holo lookup"""
+    try:
+        return get_dashboard(user["uid"], db)
+    except SQLAlchemyError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Database error while fetching dashboard: {str(e)}",
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error while fetching dashboard: {str(e)}",
+        )
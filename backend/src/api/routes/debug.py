@@ -0,0 +1,85 @@
+"""Admin-only profiling endpoints, loaded only with DEBUG_ROUTES_ENABLED.
+
+Each call covers only the worker that serves it (see src/core/profiling.py).
+"""
+
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from src.api.routes.auth import require_admin
+from src.core import profiling
+from src.core.config import settings
+
+ENABLED = settings.DEBUG_ROUTES_ENABLED
+
+router = APIRouter(
+    prefix="/debug", tags=["debug"], dependencies=[Depends(require_admin)]
+)
+
+GroupBy = Literal["lineno", "filename", "traceback"]
+
+
+@router.get("/profile/cpu", response_class=PlainTextResponse)
+def cpu_profile(
+    seconds: float = Query(10, gt=0, le=settings.DEBUG_PROFILE_MAX_SECONDS),
+    interval_ms: float = Query(5, ge=1, le=1000),
+):
+    """Sample all threads for ``seconds``; returns collapsed stacks"""
+    if not profiling.cpu_profile_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    try:
+        stacks = profiling.sample_stacks(seconds, interval_ms / 1000)
+    finally:
+        profiling.cpu_profile_lock.release()
+    return profiling.collapsed(stacks)
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+def request_profile(profile_id: str):
+    """cProfile stats of a request sent with the X-Debug-Profile header"""
+    profile = profiling.get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+
+@router.post("/tracemalloc/start")
+def tracemalloc_start(frames: int = Query(1, ge=1, le=50)):
+    """Start tracing allocations, keeping ``frames`` frames per trace"""
+    profiling.start_tracemalloc(frames)
+    return {"tracing": True, "frames": frames}
+
+
+@router.post("/tracemalloc/stop")
+def tracemalloc_stop():
+    profiling.stop_tracemalloc()
+    return {"tracing": False}
+
+
+@router.get("/tracemalloc/top")
+def tracemalloc_top(limit: int = Query(25, ge=1, le=500), group_by: GroupBy = "lineno"):
+    try:
+        return profiling.top_allocations(limit, group_by)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.post("/tracemalloc/snapshot")
+def tracemalloc_snapshot():
+    """Take the baseline that /tracemalloc/diff compares against"""
+    try:
+        profiling.take_baseline()
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"baseline": True}
+
+
+@router.get("/tracemalloc/diff")
+def tracemalloc_diff(
+    limit: int = Query(25, ge=1, le=500), group_by: GroupBy = "lineno"
+):
+    try:
+        return profiling.diff_allocations(limit, group_by)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
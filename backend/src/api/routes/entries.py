@@ -6,15 +6,21 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, ValidationError
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
-from src.api.routes.auth import get_current_user
+from src.api.routes.auth import get_current_user, rate_limit
+from src.core.cache import entries_tag
+from src.core.executors import DBRoute
+from src.core.response_cache import cached_response
 from src.db.entries import create_entry, delete_entry, get_entries, update_entry
 from src.db.session import get_db
 from src.models.entries import Entry, EntryCreate, EntryCreateRequest, EntryUpdate
 
-router = APIRouter(prefix="/entries", tags=["entries"])
+router = APIRouter(prefix="/entries", tags=["entries"], route_class=DBRoute)
 
 
-@router.get("", response_model=List[Entry])
+@router.get("", response_model=List[Entry], dependencies=[rate_limit("read")])
+@cached_response(
+    "entries.list", List[Entry], tags=lambda user_id, db: [entries_tag(user_id)]
+)
 def get_entries_route(db: Session = Depends(get_db), user=Depends(get_current_user)):
     """Get all entries for a user"""
     try:
@@ -29,7 +35,7 @@ def get_entries_route(db: Session = Depends(get_db), user=Depends(get_current_us
         )
 
 
-@router.post("", response_model=Entry)
+@router.post("", response_model=Entry, dependencies=[rate_limit("write")])
 def create_entry_route(
     entry: EntryCreateRequest,
     db: Session = Depends(get_db),
@@ -59,7 +65,7 @@ def create_entry_route(
         )
 
 
-@router.put("/{id}", response_model=Entry)
+@router.put("/{id}", response_model=Entry, dependencies=[rate_limit("write")])
 def update_entry_route(
     id: str,
     entry: EntryUpdate,
@@ -86,7 +92,7 @@ def update_entry_route(
         )
 
 
-@router.delete("/{id}")
+@router.delete("/{id}", dependencies=[rate_limit("write")])
 def delete_entry_route(
     id: str, db: Session = Depends(get_db), user=Depends(get_current_user)
 ):
@@ -1,4 +1,6 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from src.services.warmup import ready
 
 router = APIRouter(prefix="/api/health", tags=["health"])
 
@@ -13,3 +15,11 @@ def health_check():
 def ping():
     """Simple ping endpoint for health checks"""
     return {"message": "pong"}
+
+
+@router.get("/ready")
+def readiness():
+    """Readiness probe; 503 until startup warm-up has finished"""
+    if not ready.is_set():
+        return JSONResponse(status_code=503, content={"status": "warming up"})
+    return {"status": "ready"}
@@ -1,33 +1,68 @@
 from datetime import date
-from typing import List
+from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import ValidationError
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
-from src.api.routes.auth import get_current_user
+from src.api.routes.auth import get_current_user, rate_limit
+from src.core.cache import holo_config_tag, holo_tag
+from src.core.executors import DBRoute
+from src.core.response_cache import cached_response
+from src.db.holo_stats import get_holo_streak
 from src.db.holos import (
     create_holo_config,
     create_holo_daily,
     get_avg_score,
-    get_holo_config,
+    get_holo_config_snapshot,
     get_holo_daily_by_date,
     get_latest_holo_daily,
+    rename_holo_questions,
+    rescore_holo_dailies,
     update_holo_config,
+    upsert_holo_dailies,
+    upsert_holo_daily,
 )
 from src.db.session import get_db
-from src.models.holos import Holo, HoloCreate, HoloDaily, HoloDailyCreate, HoloUpdate
+from src.models.holos import (
+    Holo,
+    HoloAnswerAnalytics,
+    HoloCreate,
+    HoloDaily,
+    HoloDailyBatchCreate,
+    HoloDailyBatchResult,
+    HoloDailyCreate,
+    HoloDailyUpdate,
+    HoloQuestionsRename,
+    HoloQuestionsRenameResult,
+    HoloRescoreResult,
+    HoloScoreTimeseries,
+    HoloStreak,
+    HoloUpdate,
+)
+from src.services.holo_analytics import get_answer_analytics
+from src.services.holo_timeseries import get_score_timeseries
+
+router = APIRouter(prefix="/holos", tags=["holos"], route_class=DBRoute)
+
 
-router = APIRouter(prefix="/holos", tags=["holos"])
+def _response_tags(user_id: str, db: Session) -> list[str]:
+    """Cached holo responses go stale on config writes and on daily writes"""
+    holo = get_holo_config_snapshot(user_id, db)
+    tags = [holo_config_tag(user_id)]
+    if holo:
+        tags.append(holo_tag(holo.holo_id))
+    return tags
 
 
-@router.get("/holo", response_model=Holo)
+@router.get("/holo", response_model=Holo, dependencies=[rate_limit("read")])
+@cached_response("holos.config", Holo, tags=_response_tags)
 def get_holo_config_route(
     db: Session = Depends(get_db), user=Depends(get_current_user)
 ):
     """Get the holo questions config for a user"""
     try:
-        result = get_holo_config(user["uid"], db)
+        result = get_holo_config_snapshot(user["uid"], db)
         if result is None:
             raise HTTPException(status_code=404, detail="Holo configuration not found")
         return result
@@ -45,7 +80,7 @@ def get_holo_config_route(
         )
 
 
-@router.put("/holo", response_model=Holo)
+@router.put("/holo", response_model=Holo, dependencies=[rate_limit("write")])
 def update_holo_config_route(
     holo: HoloUpdate, db: Session = Depends(get_db), user=Depends(get_current_user)
 ):
@@ -59,6 +94,8 @@ def update_holo_config_route(
         raise  # Re-raise HTTPException as-is
     except ValidationError as e:
         raise HTTPException(status_code=422, detail=f"Validation error: {str(e)}")
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except SQLAlchemyError as e:
         raise HTTPException(
             status_code=500,
@@ -71,7 +108,73 @@ def update_holo_config_route(
         )
 
 
-@router.post("/holo", response_model=Holo)
+@router.patch(
+    "/holo/questions",
+    response_model=HoloQuestionsRenameResult,
+    dependencies=[rate_limit("write")],
+)
+def rename_holo_questions_route(
+    rename: HoloQuestionsRename,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Rename and/or reorder holo questions, carrying the answer history along"""
+    try:
+        result = rename_holo_questions(user["uid"], rename, db)
+        if result is None:
+            raise HTTPException(status_code=404, detail="Holo configuration not found")
+        holo, rows_touched = result
+        return HoloQuestionsRenameResult(
+            holo=Holo.model_validate(holo, from_attributes=True),
+            rows_touched=rows_touched,
+        )
+    except HTTPException:
+        raise  # Re-raise HTTPException as-is
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except SQLAlchemyError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Database error while renaming holo questions: {str(e)}",
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error while renaming holo questions: {str(e)}",
+        )
+
+
+@router.post(
+    "/holo/rescore",
+    response_model=HoloRescoreResult,
+    dependencies=[rate_limit("write")],
+)
+def rescore_holo_dailies_route(
+    db: Session = Depends(get_db), user=Depends(get_current_user)
+):
+    """Recompute every daily score from the holo's current question weights"""
+    try:
+        result = rescore_holo_dailies(user["uid"], db)
+        if result is None:
+            raise HTTPException(status_code=404, detail="Holo configuration not found")
+        return result
+    except HTTPException:
+        raise  # Re-raise HTTPException as-is
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except SQLAlchemyError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Database error while rescoring holo dailies: {str(e)}",
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error while rescoring holo dailies: {str(e)}",
+        )
+
+
+@router.post("/holo", response_model=Holo, dependencies=[rate_limit("write")])
 def create_holo_config_route(
     holo: HoloCreate, db: Session = Depends(get_db), user=Depends(get_current_user)
 ):
@@ -80,6 +183,8 @@ def create_holo_config_route(
         return create_holo_config(user["uid"], holo, db)
     except ValidationError as e:
         raise HTTPException(status_code=422, detail=f"Validation error: {str(e)}")
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except IntegrityError as e:
         raise HTTPException(status_code=400, detail=f"Data integrity error: {str(e)}")
     except SQLAlchemyError as e:
@@ -98,13 +203,15 @@ def create_holo_config_route(
     "/daily",
     response_model=HoloDaily,
     description="Get the holo daily by date for a user",
+    dependencies=[rate_limit("read")],
 )
+@cached_response("holos.daily", HoloDaily, tags=_response_tags)
 def get_holo_daily_route(
     entry_date: date, db: Session = Depends(get_db), user=Depends(get_current_user)
 ):
     """Get the holo daily for a user"""
     try:
-        holo = get_holo_config(user["uid"], db)
+        holo = get_holo_config_snapshot(user["uid"], db)
         if not holo:
             raise HTTPException(404, "No holo config found")
         result = get_holo_daily_by_date(holo.holo_id, entry_date, db)
@@ -129,13 +236,16 @@ def get_holo_daily_route(
         )
 
 
-@router.get("/daily/latest", response_model=HoloDaily)
+@router.get(
+    "/daily/latest", response_model=HoloDaily, dependencies=[rate_limit("read")]
+)
+@cached_response("holos.daily_latest", HoloDaily, tags=_response_tags)
 def get_latest_holo_daily_route(
     db: Session = Depends(get_db), user=Depends(get_current_user)
 ):
     """Get the latest holo daily for a user"""
     try:
-        holo = get_holo_config(user["uid"], db)
+        holo = get_holo_config_snapshot(user["uid"], db)
         if not holo:
             raise HTTPException(404, "No holo config found")
         latest_holo = get_latest_holo_daily(holo.holo_id, db)
@@ -160,7 +270,7 @@ def get_latest_holo_daily_route(
         )
 
 
-@router.post("/daily", response_model=HoloDaily)
+@router.post("/daily", response_model=HoloDaily, dependencies=[rate_limit("write")])
 def create_holo_daily_route(
     holo_daily: HoloDailyCreate,
     db: Session = Depends(get_db),
@@ -168,7 +278,7 @@ def create_holo_daily_route(
 ):
     """Create a new holo daily for a user"""
     try:
-        holo = get_holo_config(user["uid"], db)
+        holo = get_holo_config_snapshot(user["uid"], db)
         if not holo:
             raise HTTPException(404, "No holo config found")
         return create_holo_daily(holo.holo_id, holo_daily, db)
@@ -192,11 +302,79 @@ def create_holo_daily_route(
         )
 
 
-@router.get("/avg-score")
+@router.post(
+    "/daily/batch",
+    response_model=HoloDailyBatchResult,
+    dependencies=[rate_limit("write")],
+)
+def create_holo_dailies_batch_route(
+    batch: HoloDailyBatchCreate,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Create or replace many holo dailies at once (backfill / import)"""
+    try:
+        holo = get_holo_config_snapshot(user["uid"], db)
+        if not holo:
+            raise HTTPException(404, "No holo config found")
+        return upsert_holo_dailies(holo.holo_id, batch.dailies, db)
+    except HTTPException:
+        raise  # Re-raise HTTPException as-is
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=f"Validation error: {str(e)}")
+    except IntegrityError as e:
+        raise HTTPException(status_code=400, detail=f"Data integrity error: {str(e)}")
+    except SQLAlchemyError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Database error while saving holo dailies: {str(e)}",
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error while saving holo dailies: {str(e)}",
+        )
+
+
+@router.put(
+    "/daily/{entry_date}", response_model=HoloDaily, dependencies=[rate_limit("write")]
+)
+def upsert_holo_daily_route(
+    entry_date: date,
+    holo_daily: HoloDailyUpdate,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Create or replace the holo daily for a given date"""
+    try:
+        holo = get_holo_config_snapshot(user["uid"], db)
+        if not holo:
+            raise HTTPException(404, "No holo config found")
+        return upsert_holo_daily(holo.holo_id, entry_date, holo_daily, db)
+    except HTTPException:
+        raise  # Re-raise HTTPException as-is
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=f"Validation error: {str(e)}")
+    except IntegrityError as e:
+        raise HTTPException(status_code=400, detail=f"Data integrity error: {str(e)}")
+    except SQLAlchemyError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Database error while saving holo daily: {str(e)}",
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error while saving holo daily: {str(e)}",
+        )
+
+
+@router.get("/avg-score", dependencies=[rate_limit("read")])
+@cached_response("holos.avg_score", tags=_response_tags)
 def get_avg_score_route(db: Session = Depends(get_db), user=Depends(get_current_user)):
     """Get the average score from all holo dailies for a user"""
     try:
-        holo = get_holo_config(user["uid"], db)
+        holo = get_holo_config_snapshot(user["uid"], db)
         if not holo:
             raise HTTPException(404, "No holo config found")
 
@@ -214,3 +392,98 @@ def get_avg_score_route(db: Session = Depends(get_db), user=Depends(get_current_
             status_code=500,
             detail=f"Unexpected error while fetching average score: {str(e)}",
         )
+
+
+@router.get(
+    "/timeseries",
+    response_model=HoloScoreTimeseries,
+    dependencies=[rate_limit("export")],
+)
+@cached_response("holos.timeseries", HoloScoreTimeseries, tags=_response_tags)
+def get_score_timeseries_route(
+    db: Session = Depends(get_db), user=Depends(get_current_user)
+):
+    """Get moving averages, weekly/monthly means and weekday means of the score"""
+    try:
+        holo = get_holo_config_snapshot(user["uid"], db)
+        if not holo:
+            raise HTTPException(404, "No holo config found")
+        return get_score_timeseries(holo.holo_id, db)
+    except HTTPException:
+        raise  # Re-raise HTTPException as-is
+    except SQLAlchemyError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Database error while fetching score timeseries: {str(e)}",
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error while fetching score timeseries: {str(e)}",
+        )
+
+
+@router.get("/streak", response_model=HoloStreak, dependencies=[rate_limit("read")])
+@cached_response("holos.streak", HoloStreak, tags=_response_tags)
+def get_holo_streak_route(
+    today: Optional[date] = None,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Get the current and longest streak of consecutive holo dailies.
+
+    ``today`` lets the client pass its local date; it defaults to the server date.
+    """
+    try:
+        holo = get_holo_config_snapshot(user["uid"], db)
+        if not holo:
+            raise HTTPException(404, "No holo config found")
+        return get_holo_streak(holo.holo_id, db, today=today)
+    except HTTPException:
+        raise  # Re-raise HTTPException as-is
+    except SQLAlchemyError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Database error while fetching streak: {str(e)}",
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error while fetching streak: {str(e)}",
+        )
+
+
+@router.get(
+    "/analytics",
+    response_model=HoloAnswerAnalytics,
+    dependencies=[rate_limit("export")],
+)
+@cached_response("holos.analytics", HoloAnswerAnalytics, tags=_response_tags)
+def get_answer_analytics_route(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Get per-question completion rates, streaks and score correlation"""
+    try:
+        if start and end and start > end:
+            raise HTTPException(422, "start must not be after end")
+        holo = get_holo_config_snapshot(user["uid"], db)
+        if not holo:
+            raise HTTPException(404, "No holo config found")
+        return get_answer_analytics(
+            holo.holo_id, holo.questions, db, start=start, end=end
+        )
+    except HTTPException:
+        raise  # Re-raise HTTPException as-is
+    except SQLAlchemyError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Database error while fetching answer analytics: {str(e)}",
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error while fetching answer analytics: {str(e)}",
+        )
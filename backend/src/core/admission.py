@@ -0,0 +1,137 @@
+"""Admission control: cap in-flight requests per worker and shed the excess.
+
+Without a cap, overload queues requests in uvicorn and the threadpools until
+the load balancer times them out, long after the database is saturated.
+Here at most ``max_in_flight`` requests run at once; up to ``max_queue`` more
+wait (first come, first served) for ``queue_timeout`` seconds, and anything
+beyond that is answered immediately with 503 and ``Retry-After`` so clients
+back off instead of piling on. Health checks and /metrics bypass the limit
+so the worker stays observable while it sheds.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Iterable, Optional
+
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .config import settings
+from .metrics import admission_in_flight, admission_queue_wait_seconds, admission_shed
+
+EXEMPT_PATHS = ("/api/health", "/metrics")
+
+
+class AdmissionControlMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_in_flight: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+        retry_after: Optional[int] = None,
+        exempt_paths: Iterable[str] = EXEMPT_PATHS,
+    ):
+        self.app = app
+        self.max_in_flight = (
+            settings.ADMISSION_MAX_IN_FLIGHT if max_in_flight is None else max_in_flight
+        )
+        self.max_queue = (
+            settings.ADMISSION_MAX_QUEUE if max_queue is None else max_queue
+        )
+        self.queue_timeout = (
+            settings.ADMISSION_QUEUE_TIMEOUT_SECONDS
+            if queue_timeout is None
+            else queue_timeout
+        )
+        self.retry_after = (
+            settings.ADMISSION_RETRY_AFTER_SECONDS
+            if retry_after is None
+            else retry_after
+        )
+        self.exempt_paths = tuple(exempt_paths)
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            scope["type"] != "http"
+            or self.max_in_flight <= 0
+            or scope["path"].startswith(self.exempt_paths)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        if not await self._acquire():
+            response = JSONResponse(
+                {"detail": "Server is overloaded, please retry later"},
+                status_code=503,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self._release()
+
+    def queue_depth(self) -> int:
+        return sum(not waiter.done() for waiter in self._waiters)
+
+    async def _acquire(self) -> bool:
+        """Take a slot, waiting in the queue if needed; False means shed"""
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self._set_in_flight(self.in_flight + 1)
+            return True
+        if self.queue_depth() >= self.max_queue:
+            self._shed("queue_full")
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            # Client went away; hand back a slot granted in the meantime
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            self._discard(waiter)
+            raise
+        finally:
+            if admission_queue_wait_seconds is not None:
+                admission_queue_wait_seconds.observe(time.perf_counter() - started)
+
+        # A slot handed over right as the timeout fired still counts
+        if waiter.done() and not waiter.cancelled():
+            return True
+        self._discard(waiter)
+        self._shed("timeout")
+        return False
+
+    def _release(self):
+        """Pass the slot to the oldest waiter, or free it"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._set_in_flight(self.in_flight - 1)
+
+    def _discard(self, waiter: asyncio.Future):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _set_in_flight(self, value: int):
+        self.in_flight = value
+        if admission_in_flight is not None:
+            admission_in_flight.set(value)
+
+    def _shed(self, reason: str):
+        if admission_shed is not None:
+            admission_shed.labels(reason=reason).inc()
@@ -1,12 +1,19 @@
+"""Firebase token verification.
+
+firebase_admin (and the google-auth / cryptography stack behind it) is the
+heaviest import in the app, so it is imported on first use and initialized
+during startup (see main.py) rather than when this module is imported.
+"""
+
 import json
 import logging
 
-import firebase_admin
-from firebase_admin import auth, credentials
 from src.db.session import SessionLocal
 from src.services.user_service import ensure_user_exists
 
 from .config import settings
+from .timing import phase
+from .tracing import traced
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +25,8 @@ _firebase_initialized = False
 def initialize_firebase():
     """Initialize Firebase Admin SDK if not already initialized"""
     global _firebase_initialized
+    import firebase_admin
+    from firebase_admin import credentials
 
     # Check if already initialized in this process
     if _firebase_initialized:
@@ -70,8 +79,26 @@ def initialize_firebase():
             return False
 
 
-# Initialize on module import
-initialize_firebase()
+def prefetch_certificates(timeout: float = 5.0) -> bool:
+    """Fetch Google's token-signing certificates into the verifier's HTTP cache.
+
+    The first verify_id_token otherwise pays for this fetch. Relies on
+    firebase_admin internals, so any failure just leaves the fetch to the
+    first request.
+    """
+    if not initialize_firebase():
+        return False
+    try:
+        import firebase_admin
+        from firebase_admin import auth
+        from firebase_admin._token_gen import ID_TOKEN_CERT_URI
+
+        verifier = auth._get_client(firebase_admin.get_app())._token_verifier
+        response = verifier.request(ID_TOKEN_CERT_URI, timeout=timeout)
+        return response.status == 200
+    except Exception as e:
+        logger.warning("Could not prefetch Firebase certificates: %s", e)
+        return False
 
 
 def verify_token(id_token: str):
@@ -84,6 +111,9 @@ def verify_token(id_token: str):
         )
         return None
 
+    import firebase_admin
+    from firebase_admin import auth
+
     try:
         # Check if Firebase is initialized
         firebase_admin.get_app()
@@ -95,53 +125,39 @@ def verify_token(id_token: str):
         return None
 
     try:
-        decoded_token = auth.verify_id_token(id_token)
+        with phase("auth"), traced("firebase.verify_id_token"):
+            decoded_token = auth.verify_id_token(id_token)
         return decoded_token
     except Exception as e:
         logger.warning("verify_token failed: %s: %s", e.__class__.__name__, str(e))
         return None
 
 
-def verify_token_and_ensure_user(id_token: str):
-    """Verify Firebase ID token and ensure user exists in database"""
-    # Ensure Firebase is initialized (in case it wasn't during module import)
-    if not initialize_firebase():
-        logger.error(
-            "Firebase Admin SDK not initialized. Cannot verify tokens. "
-            "Set FIREBASE_SERVICE_ACCOUNT_KEY environment variable."
-        )
-        return None
+def ensure_token_user(decoded_token: dict):
+    """Ensure the verified token's user exists in the database.
 
+    Returns the claims with ``user_data`` added, or None if the user could not
+    be created.
+    """
+    db = SessionLocal()
     try:
-        # Check if Firebase is initialized
-        firebase_admin.get_app()
-    except ValueError:
-        logger.error(
-            "Firebase Admin SDK not initialized. Cannot verify tokens. "
-            "Set FIREBASE_SERVICE_ACCOUNT_KEY environment variable."
-        )
-        return None
-
-    try:
-        decoded_token = auth.verify_id_token(id_token)
-        if not decoded_token:
-            logger.warning(
-                "verify_token_and_ensure_user: token verification returned no claims"
-            )
-            return None
-
-        # Ensure user exists in our database
-        db = SessionLocal()
-        try:
+        with phase("user"), traced("ensure_user_exists"):
             user_data = ensure_user_exists(decoded_token, db)
-            if user_data:
-                # Add user data to the token for use in routes
-                decoded_token["user_data"] = user_data
-                return decoded_token
+        if not user_data:
             return None
-        finally:
-            db.close()
+        # Add user data to the token for use in routes
+        return {**decoded_token, "user_data": user_data}
+    finally:
+        db.close()
+
 
+def verify_token_and_ensure_user(id_token: str):
+    """Verify Firebase ID token and ensure user exists in database"""
+    decoded_token = verify_token(id_token)
+    if not decoded_token:
+        return None
+    try:
+        return ensure_token_user(decoded_token)
     except Exception as e:
         logger.warning(
             "verify_token_and_ensure_user failed: %s: %s", e.__class__.__name__, str(e)
@@ -0,0 +1,397 @@
+"""Caches for read-mostly data (holo configs, stats, analytics, responses).
+
+Every backend implements CacheBackend: get/set with an optional per-entry TTL,
+and invalidation by key or by tag. Entries are tagged (e.g. with the holo they
+were computed from) so the db layer can drop everything derived from a holo
+after a write to it. TTLCache keeps arbitrary objects in-process; RedisCache
+stores bytes on any server speaking the Redis protocol and is shared by all
+workers.
+
+Invalidations also bump per-tag generation counters (TagGenerations). A
+reader takes a snapshot before loading a value and stores it with
+``TTLCache.set_if_unchanged``, so a result computed from rows that a write
+replaced in the meantime is not cached over that write's invalidation.
+"""
+
+import logging
+import queue
+import socket
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Hashable, Iterable, Optional
+from urllib.parse import unquote, urlparse
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class CacheBackend:
+    """Common interface for the cache backends"""
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        raise NotImplementedError
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        tags: Iterable[str] = (),
+        ttl: Optional[float] = None,
+    ):
+        raise NotImplementedError
+
+    def invalidate(self, key: Hashable):
+        raise NotImplementedError
+
+    def invalidate_tag(self, tag: str) -> int:
+        """Drop every entry carrying ``tag``; returns how many were dropped"""
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class TagGenerations:
+    """Per-worker write counters per tag, hashed into a fixed number of slots.
+
+    Colliding tags only cost an occasional skipped store.
+    """
+
+    def __init__(self, slots: int = 4096):
+        self._counts = [0] * slots
+        self._lock = threading.Lock()
+
+    def _slot(self, tag: Hashable) -> int:
+        return hash(tag) % len(self._counts)
+
+    def bump(self, tag: Hashable):
+        with self._lock:
+            self._counts[self._slot(tag)] += 1
+
+    def bump_all(self):
+        with self._lock:
+            self._counts = [count + 1 for count in self._counts]
+
+    def snapshot(self, tags: Iterable[Hashable]) -> tuple[int, ...]:
+        with self._lock:
+            return tuple(self._counts[self._slot(tag)] for tag in tags)
+
+
+class TTLCache(CacheBackend):
+    """Thread-safe LRU cache with a per-entry time-to-live and tag invalidation"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any, tuple]] = OrderedDict()
+        self._tags: dict[str, set] = {}
+        self._generations = TagGenerations()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                return default
+            expires_at, value, _ = item
+            if expires_at < time.monotonic():
+                self._drop(key)
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        tags: Iterable[str] = (),
+        ttl: Optional[float] = None,
+    ):
+        with self._lock:
+            self._store(key, value, tuple(tags), ttl)
+
+    def generation(self, key: Hashable, tags: Iterable[str] = ()) -> tuple:
+        """Snapshot to take before loading the value for ``key``"""
+        return self._generations.snapshot((key, *tags))
+
+    def set_if_unchanged(
+        self,
+        key: Hashable,
+        value: Any,
+        generation: tuple,
+        tags: Iterable[str] = (),
+        ttl: Optional[float] = None,
+    ) -> bool:
+        """Store ``value`` unless ``key`` or a tag was invalidated since
+        ``generation`` was taken; returns whether it was stored"""
+        tags = tuple(tags)
+        with self._lock:
+            if self._generations.snapshot((key, *tags)) != generation:
+                return False
+            self._store(key, value, tags, ttl)
+            return True
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._generations.bump(key)
+            self._drop(key)
+
+    def invalidate_tag(self, tag: str) -> int:
+        with self._lock:
+            self._generations.bump(tag)
+            keys = self._tags.pop(tag, set())
+            for key in keys:
+                self._drop(key)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._generations.bump_all()
+            self._data.clear()
+            self._tags.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def _store(self, key: Hashable, value: Any, tags: tuple, ttl: Optional[float]):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        if key in self._data:
+            self._drop(key)
+        self._data[key] = (expires_at, value, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._data) > self.maxsize:
+            self._drop(next(iter(self._data)))
+
+    def _drop(self, key: Hashable):
+        item: Optional[tuple] = self._data.pop(key, None)
+        if item is None:
+            return
+        for tag in item[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class RedisError(Exception):
+    """Error reply from the server, or a malformed reply"""
+
+
+def _encode_command(*args) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode()
+        elif isinstance(arg, (int, float)):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+def _read_reply(stream):
+    line = stream.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("Connection closed by the cache server")
+    kind, payload = line[:1], line[1:-2]
+    if kind == b"+":
+        return payload.decode()
+    if kind == b"-":
+        raise RedisError(payload.decode())
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        return stream.read(length + 2)[:-2]
+    if kind == b"*":
+        length = int(payload)
+        if length < 0:
+            return None
+        return [_read_reply(stream) for _ in range(length)]
+    raise RedisError(f"Unexpected reply type {kind!r}")
+
+
+class _RedisConnection:
+    def __init__(self, host, port, db, password, timeout):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.stream = self.sock.makefile("rb")
+        if password:
+            self.execute(("AUTH", password))
+        if db:
+            self.execute(("SELECT", db))
+
+    def execute(self, *commands):
+        """Send commands in one pipeline and return their replies in order"""
+        self.sock.sendall(b"".join(_encode_command(*c) for c in commands))
+        replies = []
+        error = None
+        for _ in commands:
+            try:
+                replies.append(_read_reply(self.stream))
+            except RedisError as e:
+                # Keep reading so the connection stays in sync
+                error = error or e
+                replies.append(None)
+        if error is not None:
+            raise error
+        return replies
+
+    def close(self):
+        try:
+            self.stream.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class RedisClient:
+    """Pooled connections to a Redis-protocol server (Redis, Valkey, KeyDB, ...)"""
+
+    def __init__(self, url: str, timeout: float = 0.5, max_idle: int = 8):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.timeout = timeout
+        self._idle: queue.LifoQueue = queue.LifoQueue(maxsize=max_idle)
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for a sequence of round trips (e.g. WATCH/EXEC)"""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = _RedisConnection(
+                self.host, self.port, self.db, self.password, self.timeout
+            )
+        try:
+            yield conn
+        except BaseException:
+            # The connection may hold a half-read reply or a pending transaction
+            conn.close()
+            raise
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def execute(self, *commands):
+        """Send commands in one pipeline and return their replies in order"""
+        with self.connection() as conn:
+            return conn.execute(*commands)
+
+
+class RedisCache(CacheBackend):
+    """Cache backend on a Redis-protocol server.
+
+    Values must be bytes. Tags are server-side sets of keys, so invalidation
+    reaches every worker. Connection errors are logged and treated as misses;
+    the cache never fails a request.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        ttl: float = 300.0,
+        prefix: str = "holonote:",
+        timeout: float = 0.5,
+        max_idle: int = 8,
+    ):
+        self.ttl = ttl
+        self.prefix = prefix
+        self._client = RedisClient(url, timeout=timeout, max_idle=max_idle)
+
+    def _key(self, key: Hashable) -> str:
+        return f"{self.prefix}{key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    def _safe_execute(self, *commands):
+        try:
+            return self._client.execute(*commands)
+        except (OSError, ConnectionError, RedisError) as e:
+            logger.warning("Cache server unavailable: %s", e)
+            return None
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        replies = self._safe_execute(("GET", self._key(key)))
+        if not replies or replies[0] is None:
+            return default
+        return replies[0]
+
+    def set(
+        self,
+        key: Hashable,
+        value: bytes,
+        tags: Iterable[str] = (),
+        ttl: Optional[float] = None,
+    ):
+        ttl_ms = int((self.ttl if ttl is None else ttl) * 1000)
+        commands = [("SET", self._key(key), value, "PX", ttl_ms)]
+        for tag in tags:
+            # A tag set outlives the entries it points at, never the reverse
+            commands.append(("SADD", self._tag_key(tag), self._key(key)))
+            commands.append(("PEXPIRE", self._tag_key(tag), ttl_ms))
+        self._safe_execute(*commands)
+
+    def invalidate(self, key: Hashable):
+        self._safe_execute(("DEL", self._key(key)))
+
+    def invalidate_tag(self, tag: str) -> int:
+        replies = self._safe_execute(("SMEMBERS", self._tag_key(tag)))
+        if not replies:
+            return 0
+        keys = replies[0] or []
+        deleted = self._safe_execute(("DEL", self._tag_key(tag), *keys))
+        return len(keys) if deleted else 0
+
+    def clear(self):
+        cursor = "0"
+        while True:
+            replies = self._safe_execute(
+                ("SCAN", cursor, "MATCH", f"{self.prefix}*", "COUNT", 500)
+            )
+            if not replies:
+                return
+            cursor, keys = replies[0]
+            if keys:
+                self._safe_execute(("DEL", *keys))
+            if cursor in (b"0", "0"):
+                return
+
+
+def holo_tag(holo_id: str) -> str:
+    """Tag for anything derived from a holo's dailies"""
+    return f"holo:{holo_id}"
+
+
+def holo_config_tag(user_id: str) -> str:
+    """Tag for anything derived from a user's holo config"""
+    return f"holo-config:{user_id}"
+
+
+def entries_tag(user_id: str) -> str:
+    """Tag for anything derived from a user's journal entries"""
+    return f"entries:{user_id}"
+
+
+# Shared cache for stats computed from holo dailies; keyed per user's holo
+derived_cache = TTLCache(
+    maxsize=settings.STATS_CACHE_MAX_ENTRIES, ttl=settings.STATS_CACHE_TTL_SECONDS
+)
+
+# Immutable holo config snapshots keyed by user_id (see get_holo_config_snapshot)
+holo_config_cache = TTLCache(
+    maxsize=settings.HOLO_CONFIG_CACHE_MAX_ENTRIES,
+    ttl=settings.HOLO_CONFIG_CACHE_TTL_SECONDS,
+)
@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 from dotenv import load_dotenv
 
@@ -35,6 +36,206 @@ class Settings:
         self.DB_PASSWORD = os.getenv("DB_PASSWORD", "example")
         self.DB_NAME = os.getenv("DB_NAME", "holonote")
         self.DB_PORT = os.getenv("DB_PORT", "5432")
+        # SQLAlchemy connection pool (ignored for SQLite)
+        self.DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+        self.DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
+        # How holo daily answers are stored: "json", "both" (json + packed bits)
+        # or "bits" (packed bits only when every answer can be packed)
+        self.HOLO_ANSWER_STORAGE = os.getenv("HOLO_ANSWER_STORAGE", "json")
+
+        # Cache settings
+        self.STATS_CACHE_TTL_SECONDS = float(
+            os.getenv("STATS_CACHE_TTL_SECONDS", "300")
+        )
+        self.STATS_CACHE_MAX_ENTRIES = int(os.getenv("STATS_CACHE_MAX_ENTRIES", "4096"))
+        self.HOLO_CONFIG_CACHE_TTL_SECONDS = float(
+            os.getenv("HOLO_CONFIG_CACHE_TTL_SECONDS", "60")
+        )
+        self.HOLO_CONFIG_CACHE_MAX_ENTRIES = int(
+            os.getenv("HOLO_CONFIG_CACHE_MAX_ENTRIES", "10000")
+        )
+        # Serialized responses of read endpoints: "" (disabled), "memory"
+        # (per worker; only safe with a single worker) or "redis" (shared)
+        self.RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "")
+        self.RESPONSE_CACHE_REDIS_URL = os.getenv(
+            "RESPONSE_CACHE_REDIS_URL", "redis://localhost:6379/0"
+        )
+        self.RESPONSE_CACHE_TTL_SECONDS = float(
+            os.getenv("RESPONSE_CACHE_TTL_SECONDS", "30")
+        )
+        self.RESPONSE_CACHE_MAX_ENTRIES = int(
+            os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "10000")
+        )
+        # Share one execution between identical concurrent reads (same user,
+        # route and params); waiters run their own after the timeout
+        self.REQUEST_COALESCING = os.getenv("REQUEST_COALESCING", "true").lower() in (
+            "1",
+            "true",
+            "yes",
+        )
+        self.REQUEST_COALESCING_TIMEOUT_SECONDS = float(
+            os.getenv("REQUEST_COALESCING_TIMEOUT_SECONDS", "5")
+        )
+        # PostgreSQL NOTIFY channel used to drop cached holo configs and
+        # derived stats on every worker after a write. Empty disables
+        # cross-worker invalidation: with several workers, the others then
+        # serve stale entries until their TTL expires
+        self.HOLO_CONFIG_INVALIDATION_CHANNEL = os.getenv(
+            "HOLO_CONFIG_INVALIDATION_CHANNEL", "holonote_cache_invalidation"
+        )
+
+        # Production server (see serve.py); WEB_CONCURRENCY=0 sizes the
+        # worker count from the container's CPU and memory limits
+        self.SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+        self.SERVER_PORT = int(os.getenv("SERVER_PORT", "5000"))
+        self.WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "0"))
+        self.WEB_WORKERS_PER_CORE = float(os.getenv("WEB_WORKERS_PER_CORE", "1"))
+        self.WEB_WORKER_MEMORY_MB = int(os.getenv("WEB_WORKER_MEMORY_MB", "192"))
+        self.WEB_MAX_WORKERS = int(os.getenv("WEB_MAX_WORKERS", "16"))
+        # Keep-alive must outlast the load balancer's idle timeout (ALB: 60s)
+        self.SERVER_KEEPALIVE_SECONDS = int(os.getenv("SERVER_KEEPALIVE_SECONDS", "65"))
+        self.SERVER_BACKLOG = int(os.getenv("SERVER_BACKLOG", "2048"))
+        self.SERVER_WORKER_TIMEOUT_SECONDS = int(
+            os.getenv("SERVER_WORKER_TIMEOUT_SECONDS", "60")
+        )
+        self.SERVER_GRACEFUL_TIMEOUT_SECONDS = int(
+            os.getenv("SERVER_GRACEFUL_TIMEOUT_SECONDS", "30")
+        )
+        # Recycle workers after this many requests (0 = never)
+        self.SERVER_MAX_REQUESTS = int(os.getenv("SERVER_MAX_REQUESTS", "0"))
+        self.SERVER_FORWARDED_ALLOW_IPS = os.getenv("SERVER_FORWARDED_ALLOW_IPS", "*")
+
+        # Thread capacity per worker: AnyIO's default limiter (remaining sync
+        # handlers and dependencies), Firebase token verification, and DB
+        # handlers (0 = one thread per pooled connection incl. overflow)
+        self.THREADPOOL_TOKENS = int(os.getenv("THREADPOOL_TOKENS", "40"))
+        self.AUTH_EXECUTOR_WORKERS = int(os.getenv("AUTH_EXECUTOR_WORKERS", "8"))
+        self.DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", "0"))
+        # Admission control per worker: requests beyond the in-flight cap wait
+        # in a short queue; when it is full or the wait times out they get a
+        # 503 with Retry-After (ADMISSION_MAX_IN_FLIGHT=0 disables)
+        self.ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "64"))
+        self.ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "32"))
+        self.ADMISSION_QUEUE_TIMEOUT_SECONDS = float(
+            os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "1")
+        )
+        self.ADMISSION_RETRY_AFTER_SECONDS = int(
+            os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "1")
+        )
+
+        # Per-user token buckets: "memory" (per worker), "redis" (shared) or
+        # "" (disabled). Each budget refills at *_PER_SECOND up to *_BURST
+        self.RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+        self.RATE_LIMIT_REDIS_URL = os.getenv(
+            "RATE_LIMIT_REDIS_URL", self.RESPONSE_CACHE_REDIS_URL
+        )
+        self.RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+        self.RATE_LIMIT_READ_PER_SECOND = float(
+            os.getenv("RATE_LIMIT_READ_PER_SECOND", "10")
+        )
+        self.RATE_LIMIT_READ_BURST = int(os.getenv("RATE_LIMIT_READ_BURST", "50"))
+        self.RATE_LIMIT_WRITE_PER_SECOND = float(
+            os.getenv("RATE_LIMIT_WRITE_PER_SECOND", "2")
+        )
+        self.RATE_LIMIT_WRITE_BURST = int(os.getenv("RATE_LIMIT_WRITE_BURST", "20"))
+        self.RATE_LIMIT_EXPORT_PER_SECOND = float(
+            os.getenv("RATE_LIMIT_EXPORT_PER_SECOND", "0.2")
+        )
+        self.RATE_LIMIT_EXPORT_BURST = int(os.getenv("RATE_LIMIT_EXPORT_BURST", "10"))
+
+        # Startup warm-up (connections, certificates, statement cache) before
+        # the worker reports ready; WARMUP_DB_CONNECTIONS defaults to the pool
+        self.WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() in (
+            "1",
+            "true",
+            "yes",
+        )
+        self.WARMUP_DB_CONNECTIONS = int(
+            os.getenv("WARMUP_DB_CONNECTIONS", str(self.DB_POOL_SIZE))
+        )
+
+        # Echo per-phase timings (auth, user, db, handler, serialize) in a
+        # Server-Timing header; the histograms are recorded either way
+        self.SERVER_TIMING_HEADER = os.getenv(
+            "SERVER_TIMING_HEADER", "false"
+        ).lower() in ("1", "true", "yes")
+
+        # Remote write of this worker's metrics to AMP (disabled without an
+        # endpoint). Samples are buffered up to AMP_REMOTE_WRITE_MAX_BUFFER,
+        # dropping the oldest, and sent in batches every interval; requests
+        # are SigV4-signed by default for amazonaws.com endpoints
+        self.AMP_REMOTE_WRITE_ENDPOINT = os.getenv("AMP_REMOTE_WRITE_ENDPOINT")
+        self.AWS_REGION = os.getenv("AWS_REGION", "eu-west-1")
+        self.AMP_REMOTE_WRITE_INTERVAL_SECONDS = float(
+            os.getenv("AMP_REMOTE_WRITE_INTERVAL_SECONDS", "30")
+        )
+        self.AMP_REMOTE_WRITE_MAX_BUFFER = int(
+            os.getenv("AMP_REMOTE_WRITE_MAX_BUFFER", "50000")
+        )
+        self.AMP_REMOTE_WRITE_BATCH_SIZE = int(
+            os.getenv("AMP_REMOTE_WRITE_BATCH_SIZE", "2000")
+        )
+        self.AMP_REMOTE_WRITE_MAX_RETRIES = int(
+            os.getenv("AMP_REMOTE_WRITE_MAX_RETRIES", "4")
+        )
+        self.AMP_REMOTE_WRITE_SIGV4 = os.getenv("AMP_REMOTE_WRITE_SIGV4", "").lower()
+        self.AMP_REMOTE_WRITE_JOB = os.getenv(
+            "AMP_REMOTE_WRITE_JOB", "holonote-backend"
+        )
+
+        # Shared directory for Prometheus multiprocess metrics, used whenever
+        # serve.py runs more than one worker (cleared on startup)
+        self.PROMETHEUS_MULTIPROC_DIR = os.getenv(
+            "PROMETHEUS_MULTIPROC_DIR",
+            os.path.join(tempfile.gettempdir(), "holonote-prometheus"),
+        )
+
+        # OpenTelemetry tracing (needs opentelemetry-sdk and the OTLP/HTTP
+        # exporter). A TRACING_SAMPLE_RATIO share of traces is kept up front;
+        # every other trace is recorded and kept only when its request took at
+        # least TRACING_SLOW_REQUEST_MS or failed
+        self.TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() in (
+            "1",
+            "true",
+            "yes",
+        )
+        self.TRACING_OTLP_ENDPOINT = os.getenv(
+            "TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces"
+        )
+        self.TRACING_SERVICE_NAME = os.getenv(
+            "TRACING_SERVICE_NAME", "holonote-backend"
+        )
+        self.TRACING_SAMPLE_RATIO = float(os.getenv("TRACING_SAMPLE_RATIO", "0.01"))
+        self.TRACING_SLOW_REQUEST_MS = float(
+            os.getenv("TRACING_SLOW_REQUEST_MS", "1000")
+        )
+
+        # Admin-only /debug profiling routes (off by default). ADMIN_UIDS is a
+        # comma-separated list of Firebase uids; requests carrying
+        # X-Debug-Profile: <DEBUG_PROFILE_TOKEN> are profiled with cProfile
+        self.DEBUG_ROUTES_ENABLED = os.getenv(
+            "DEBUG_ROUTES_ENABLED", "false"
+        ).lower() in ("1", "true", "yes")
+        self.ADMIN_UIDS = {
+            uid.strip() for uid in os.getenv("ADMIN_UIDS", "").split(",") if uid.strip()
+        }
+        self.DEBUG_PROFILE_MAX_SECONDS = float(
+            os.getenv("DEBUG_PROFILE_MAX_SECONDS", "60")
+        )
+        self.DEBUG_PROFILE_TOKEN = os.getenv("DEBUG_PROFILE_TOKEN", "")
+        self.DEBUG_PROFILE_KEEP = int(os.getenv("DEBUG_PROFILE_KEEP", "20"))
+
+        # Logging: records are queued and written by a background thread as
+        # JSON lines ("json") or plain text ("text"); repeated warnings are
+        # capped at LOG_WARNING_BURST per message every period
+        self.LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+        self.LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+        self.LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+        self.LOG_WARNING_BURST = int(os.getenv("LOG_WARNING_BURST", "10"))
+        self.LOG_WARNING_PERIOD_SECONDS = float(
+            os.getenv("LOG_WARNING_PERIOD_SECONDS", "60")
+        )
 
         self._initialized = True
 
@@ -0,0 +1,128 @@
+"""Bounded thread pools for blocking work.
+
+Sync handlers and the blocking Firebase ``verify_id_token`` call would
+otherwise share AnyIO's default threadpool, so a burst of slow token checks
+can starve database work (and vice versa). Each kind of work gets its own
+executor instead: the auth pool is sized for outbound verification calls and
+does no database work, and the DB pool matches the SQLAlchemy connection
+pool, so requests queue for a thread rather than for a connection while
+holding one. Anything that checks a connection out (including the user
+upsert after token verification) runs on the DB pool.
+
+Queue depth (submitted but not yet started) and the time spent waiting for a
+thread are exported per executor.
+"""
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from fastapi.routing import APIRoute
+
+from .config import settings
+from .profiling import run_profiled
+from .timing import timed_handler
+
+try:
+    from prometheus_client import Gauge, Histogram
+
+    executor_queue_depth = Gauge(
+        "executor_queue_depth",
+        "Calls waiting for a thread, by executor",
+        ["executor"],
+        multiprocess_mode="livesum",
+    )
+    executor_wait_seconds = Histogram(
+        "executor_wait_seconds",
+        "Time between submitting a call and a thread starting it, by executor",
+        ["executor"],
+        buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+    )
+except ImportError:  # Metrics are optional
+    executor_queue_depth = executor_wait_seconds = None
+
+
+class BoundedExecutor:
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"{name}-executor"
+        )
+        self._queued = 0
+        self._lock = threading.Lock()
+
+    def queue_depth(self) -> int:
+        return self._queued
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking call on this pool and await its result.
+
+        Context variables are copied so the call sees the caller's request
+        context, as with ``run_in_threadpool``.
+        """
+        context = contextvars.copy_context()
+        submitted = time.perf_counter()
+        self._change_queued(1)
+
+        def call():
+            self._change_queued(-1)
+            if executor_wait_seconds is not None:
+                executor_wait_seconds.labels(executor=self.name).observe(
+                    time.perf_counter() - submitted
+                )
+            return context.run(run_profiled, fn, *args, **kwargs)
+
+        try:
+            future = self._pool.submit(call)
+        except BaseException:
+            self._change_queued(-1)
+            raise
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    def _change_queued(self, delta: int):
+        with self._lock:
+            self._queued += delta
+            if executor_queue_depth is not None:
+                executor_queue_depth.labels(executor=self.name).set(self._queued)
+
+
+def _db_workers() -> int:
+    if settings.DB_EXECUTOR_WORKERS > 0:
+        return settings.DB_EXECUTOR_WORKERS
+    return settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+
+
+auth_executor = BoundedExecutor("auth", settings.AUTH_EXECUTOR_WORKERS)
+db_executor = BoundedExecutor("db", _db_workers())
+
+
+def offload(fn: Callable[..., Any], executor: BoundedExecutor) -> Callable[..., Any]:
+    """Async wrapper running a sync callable on ``executor``.
+
+    ``functools.wraps`` keeps the signature visible to FastAPI, which then
+    sees a coroutine and awaits it instead of using its own threadpool.
+    """
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await executor.run(fn, *args, **kwargs)
+
+    return wrapper
+
+
+class DBRoute(APIRoute):
+    """Route class running sync endpoints on the DB executor"""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs):
+        if not inspect.iscoroutinefunction(endpoint):
+            endpoint = offload(timed_handler(endpoint), db_executor)
+        super().__init__(path, endpoint, **kwargs)
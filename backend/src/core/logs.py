@@ -0,0 +1,317 @@
+"""Non-blocking, structured logging.
+
+``configure_logging`` replaces ``logging.basicConfig``. Request threads only
+put records on a bounded queue (dropping them when it is full rather than
+blocking); a background ``QueueListener`` thread formats and writes them.
+Records are JSON lines (LOG_FORMAT=json, the default) or plain text.
+
+Before a record is queued, on the thread that logged it:
+
+- ``RequestContextFilter`` adds the request ID, method, route and latency so
+  far of the request being handled (set by ``RequestContextMiddleware``)
+- ``RateLimitFilter`` lets through at most LOG_WARNING_BURST warnings or
+  errors per message template and logger every LOG_WARNING_PERIOD_SECONDS;
+  the next one let through reports how many were suppressed. A flood of bad
+  tokens therefore costs a dictionary lookup per request, not a write.
+
+``RequestContextMiddleware`` also writes one access record per request and
+returns the request ID in ``X-Request-ID``. The server's own loggers
+(gunicorn, uvicorn) are routed through the same queue by
+``route_server_logs``; their access loggers are quietened, as they would
+duplicate that record.
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import IO, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+
+ACCESS_LOGGER = "holonote.access"
+
+# Loggers the server configures with its own synchronous stream handlers
+SERVER_LOGGERS = ("gunicorn", "gunicorn.error", "uvicorn", "uvicorn.error")
+SERVER_ACCESS_LOGGERS = ("gunicorn.access", "uvicorn.access")
+
+# LogRecord attributes that are not worth repeating in every JSON line
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class RequestContext:
+    def __init__(self, scope: Scope, request_id: str):
+        self.scope = scope
+        self.request_id = request_id
+        self.started = time.perf_counter()
+
+    @property
+    def route(self) -> Optional[str]:
+        return getattr(self.scope.get("route"), "path", None)
+
+    def latency_ms(self) -> float:
+        return round((time.perf_counter() - self.started) * 1000, 2)
+
+
+_request: contextvars.ContextVar[Optional[RequestContext]] = contextvars.ContextVar(
+    "log_request_context", default=None
+)
+
+
+def current_request_id() -> Optional[str]:
+    context = _request.get()
+    return context.request_id if context is not None else None
+
+
+class RequestContextFilter(logging.Filter):
+    """Attach the current request's ID, method, route and latency"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _request.get()
+        if context is not None and not hasattr(record, "request_id"):
+            record.request_id = context.request_id
+            record.method = context.scope.get("method")
+            record.route = context.route or context.scope.get("path")
+            record.latency_ms = context.latency_ms()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """At most ``burst`` records per (logger, template) every ``period``"""
+
+    def __init__(
+        self,
+        burst: Optional[int] = None,
+        period: Optional[float] = None,
+        level: int = logging.WARNING,
+        max_keys: int = 1024,
+    ):
+        super().__init__()
+        self.burst = settings.LOG_WARNING_BURST if burst is None else burst
+        self.period = settings.LOG_WARNING_PERIOD_SECONDS if period is None else period
+        self.level = level
+        self.max_keys = max_keys
+        # key -> [window start, records let through, records suppressed]
+        self._windows: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.level or record.levelno >= logging.CRITICAL:
+            return True
+        key = (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.period:
+                suppressed = window[2] if window is not None else 0
+                if window is None and len(self._windows) >= self.max_keys:
+                    self._windows.clear()
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if window[1] < self.burst:
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(
+                record.created, timezone.utc
+            ).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        request_id = getattr(record, "request_id", None)
+        return f"{line} [{request_id}]" if request_id else line
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks: full queue means the record is dropped"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args and render the traceback now, but keep the traceback out
+        # of the message so the JSON formatter can put it in its own field
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+class LogPipeline:
+    """Queue handler plus the background listener writing to ``stream``"""
+
+    def __init__(
+        self,
+        stream: Optional[IO] = None,
+        fmt: Optional[str] = None,
+        queue_size: Optional[int] = None,
+        rate_limit: Optional[RateLimitFilter] = None,
+    ):
+        self.queue_size = settings.LOG_QUEUE_SIZE if queue_size is None else queue_size
+        self.output = logging.StreamHandler(stream or sys.stderr)
+        fmt = fmt or settings.LOG_FORMAT
+        self.output.setFormatter(JSONFormatter() if fmt == "json" else TextFormatter())
+
+        self.handler = DroppingQueueHandler(queue.Queue(self.queue_size))
+        self.handler.addFilter(RequestContextFilter())
+        self.handler.addFilter(rate_limit or RateLimitFilter())
+        self.listener: Optional[logging.handlers.QueueListener] = None
+
+    def start(self):
+        self.listener = logging.handlers.QueueListener(
+            self.handler.queue, self.output, respect_handler_level=True
+        )
+        self.listener.start()
+
+    def stop(self):
+        """Write out everything queued and stop the listener thread"""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def _after_fork(self):
+        # The listener thread does not survive fork; workers start their own
+        self.handler.queue = queue.Queue(self.queue_size)
+        self.listener = None
+        self.start()
+
+
+_pipeline: Optional[LogPipeline] = None
+_hooks_registered = False
+
+
+def configure_logging(
+    level: Optional[str] = None, stream: Optional[IO] = None
+) -> LogPipeline:
+    """Route the root logger through a (re)started queue pipeline"""
+    global _pipeline, _hooks_registered
+    shutdown_logging()
+    _pipeline = LogPipeline(stream)
+    _pipeline.start()
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        # basicConfig's handler or an earlier pipeline; leave others alone
+        if type(handler) in (logging.StreamHandler, DroppingQueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(_pipeline.handler)
+    root.setLevel(level or settings.LOG_LEVEL)
+    route_server_logs()
+
+    if not _hooks_registered:
+        # Records logged after the lifespan ends (server shutdown) still get
+        # written: the listener is drained at interpreter exit
+        atexit.register(shutdown_logging)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(
+                after_in_child=lambda: _pipeline and _pipeline._after_fork()
+            )
+        _hooks_registered = True
+    return _pipeline
+
+
+def route_server_logs():
+    """Send gunicorn and uvicorn records to the root logger's pipeline
+
+    Gunicorn and the uvicorn worker attach their own stream handlers (and
+    turn propagation off) when the master starts and when each worker is
+    created, so this runs again in the post_fork hook.
+    """
+    for name in SERVER_LOGGERS + SERVER_ACCESS_LOGGERS:
+        logger = logging.getLogger(name)
+        for handler in logger.handlers[:]:
+            logger.removeHandler(handler)
+        logger.propagate = True
+    for name in SERVER_ACCESS_LOGGERS:
+        # RequestContextMiddleware writes the access record
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+
+def shutdown_logging():
+    if _pipeline is not None:
+        _pipeline.stop()
+
+
+class RequestContextMiddleware:
+    """Request ID and timing for log records, plus one access record"""
+
+    HEADER = b"x-request-id"
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.access = logging.getLogger(ACCESS_LOGGER)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope.get("headers", [])).get(self.HEADER, b"")
+        request_id = incoming.decode("latin-1")[:128] or uuid.uuid4().hex
+        context = RequestContext(scope, request_id)
+        token = _request.set(context)
+        status = 500
+
+        async def send_with_id(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (self.HEADER, request_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            self.access.info(
+                "%s %s %d",
+                scope["method"],
+                scope["path"],
+                status,
+                extra={"status": status},
+            )
+            _request.reset(token)
@@ -1,41 +1,142 @@
 """
 Metrics collection and remote write to Amazon Managed Service for Prometheus (AMP)
 
-Note: For production, consider using AWS Distro for OpenTelemetry (ADOT)
-or prometheus-remote-write with proper protobuf encoding.
-This module provides a placeholder structure.
+Request metrics come from prometheus-fastapi-instrumentator and the app's own
+metrics are defined here. AMPRemoteWrite pushes the registry to AMP's
+remote-write endpoint from a background thread in each worker, so no sidecar
+agent is needed (see remote_write.py for the wire format).
 """
 
 import logging
 import os
+import socket
+import threading
+import time
+from collections import deque
 from typing import Optional
+from urllib.parse import urlparse
+
+from .config import settings
+from .remote_write import encode_write_request, snappy_compress
 
 logger = logging.getLogger(__name__)
 
+try:
+    from prometheus_client import Counter, Gauge, Histogram
+
+    admission_in_flight = Gauge(
+        "admission_in_flight_requests",
+        "Requests admitted and still running",
+        multiprocess_mode="livesum",
+    )
+    admission_queue_wait_seconds = Histogram(
+        "admission_queue_wait_seconds",
+        "Time requests waited for an admission slot",
+        buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+    )
+    admission_shed = Counter(
+        "admission_shed_requests_total",
+        "Requests rejected with 503 by admission control, by reason",
+        ["reason"],
+    )
+    rate_limited = Counter(
+        "rate_limited_requests_total",
+        "Requests rejected with 429 by the per-user rate limiter, by budget",
+        ["budget"],
+    )
+    request_phase_seconds = Histogram(
+        "http_request_phase_duration_seconds",
+        "Time spent in each phase of a request (auth, user, db, handler, "
+        "serialize), by route",
+        ["handler", "phase"],
+        buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+    )
+    remote_write_samples = Counter(
+        "amp_remote_write_samples_total",
+        "Samples handled by AMP remote write, by outcome (sent, rejected "
+        "by the endpoint, dropped from a full buffer)",
+        ["outcome"],
+    )
+    remote_write_buffered = Gauge(
+        "amp_remote_write_buffered_samples",
+        "Samples waiting to be sent to AMP",
+        multiprocess_mode="livesum",
+    )
+except ImportError:  # Metrics are optional
+    admission_in_flight = admission_queue_wait_seconds = admission_shed = None
+    rate_limited = request_phase_seconds = None
+    remote_write_samples = remote_write_buffered = None
+
+# (sorted label pairs including __name__, value, timestamp in ms)
+_Sample = tuple[tuple[tuple[str, str], ...], float, int]
+
 
 class AMPRemoteWrite:
-    """
-    Placeholder for AMP remote write functionality.
+    """Batched Prometheus remote write from a background thread.
 
-    For production implementation, use one of these approaches:
-    1. AWS Distro for OpenTelemetry (ADOT) - recommended
-    2. prometheus-remote-write library with protobuf encoding
-    3. Sidecar container with prometheus remote write agent
+    Every ``interval`` the registry is snapshotted into a bounded buffer (the
+    oldest samples are dropped when it is full) and sent in batches of
+    ``batch_size`` samples. Failed sends are retried with exponential backoff;
+    4xx responses other than 429 are dropped rather than retried. A batch that
+    still fails goes back to the front of the buffer for the next round.
     """
 
     def __init__(
-        self, amp_endpoint: Optional[str] = None, region: Optional[str] = None
+        self,
+        amp_endpoint: Optional[str] = None,
+        region: Optional[str] = None,
+        *,
+        registry=None,
+        interval: Optional[float] = None,
+        max_buffer: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        backoff: float = 0.5,
+        max_backoff: float = 10.0,
+        timeout: float = 10.0,
+        sigv4: Optional[bool] = None,
+        labels: Optional[dict[str, str]] = None,
     ):
-        self.amp_endpoint = amp_endpoint or os.getenv("AMP_REMOTE_WRITE_ENDPOINT")
-        self.region = region or os.getenv("AWS_REGION", "eu-west-1")
+        self.amp_endpoint = amp_endpoint or settings.AMP_REMOTE_WRITE_ENDPOINT
+        self.region = region or settings.AWS_REGION
         self.enabled = bool(self.amp_endpoint)
+        self.registry = registry
+        self.interval = interval or settings.AMP_REMOTE_WRITE_INTERVAL_SECONDS
+        self.batch_size = batch_size or settings.AMP_REMOTE_WRITE_BATCH_SIZE
+        self.max_retries = (
+            settings.AMP_REMOTE_WRITE_MAX_RETRIES
+            if max_retries is None
+            else max_retries
+        )
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        if sigv4 is None:
+            configured = settings.AMP_REMOTE_WRITE_SIGV4
+            host = urlparse(self.amp_endpoint or "").hostname or ""
+            sigv4 = (
+                configured in ("1", "true", "yes")
+                if configured
+                else host.endswith(".amazonaws.com")
+            )
+        self.sigv4 = sigv4
+        self.labels = labels
+
+        self._buffer: deque[_Sample] = deque(
+            maxlen=max_buffer or settings.AMP_REMOTE_WRITE_MAX_BUFFER
+        )
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._session = None
+        self._credentials = None
 
         if self.enabled:
             logger.info(
-                f"AMP endpoint configured: {self.amp_endpoint}. "
-                "Note: Remote write not yet implemented. "
-                "Metrics are available at /metrics endpoint. "
-                "Consider using AWS Distro for OpenTelemetry for production."
+                "AMP remote write to %s every %ss (SigV4 %s)",
+                self.amp_endpoint,
+                self.interval,
+                "on" if self.sigv4 else "off",
             )
         else:
             logger.info(
@@ -44,6 +145,168 @@ class AMPRemoteWrite:
                 "Set AMP_REMOTE_WRITE_ENDPOINT to enable."
             )
 
+    def start(self):
+        """Start the background sender (no-op when disabled or running)"""
+        if not self.enabled or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="amp-remote-write", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the sender, then make one last attempt to send what is left"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+        try:
+            self.collect()
+            self.flush()
+        except Exception as e:
+            logger.warning("AMP remote write final flush failed: %s", e)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.collect()
+                self.flush()
+            except Exception as e:
+                logger.warning("AMP remote write round failed: %s", e)
+
+    def buffered(self) -> int:
+        return len(self._buffer)
+
+    def _record(self, outcome: str, count: int):
+        if remote_write_samples is not None and count:
+            remote_write_samples.labels(outcome=outcome).inc(count)
+        if remote_write_buffered is not None:
+            remote_write_buffered.set(len(self._buffer))
+
+    def collect(self) -> int:
+        """Snapshot the registry into the buffer; returns the samples added"""
+        registry = self.registry
+        if registry is None:
+            from prometheus_client import REGISTRY as registry
+
+        base = self.labels
+        if base is None:
+            base = {
+                "job": settings.AMP_REMOTE_WRITE_JOB,
+                "instance": f"{socket.gethostname()}:{os.getpid()}",
+            }
+        now_ms = int(time.time() * 1000)
+        samples = []
+        for metric in registry.collect():
+            for sample in metric.samples:
+                # Creation timestamps are not useful as series of their own
+                if sample.name == metric.name + "_created":
+                    continue
+                labels = {**base, **sample.labels, "__name__": sample.name}
+                timestamp = (
+                    int(sample.timestamp * 1000)
+                    if sample.timestamp is not None
+                    else now_ms
+                )
+                samples.append(
+                    (tuple(sorted(labels.items())), float(sample.value), timestamp)
+                )
+
+        with self._lock:
+            dropped = max(0, len(self._buffer) + len(samples) - self._buffer.maxlen)
+            self._buffer.extend(samples)
+        self._record("dropped", dropped)
+        return len(samples)
+
+    def flush(self) -> bool:
+        """Send everything buffered; False if a batch is still failing"""
+        while True:
+            with self._lock:
+                count = min(self.batch_size, len(self._buffer))
+                batch = [self._buffer.popleft() for _ in range(count)]
+            if not batch:
+                return True
+            if not self._send(batch):
+                self._requeue(batch)
+                return False
+
+    def _requeue(self, batch: list[_Sample]):
+        with self._lock:
+            room = self._buffer.maxlen - len(self._buffer)
+            keep = batch[max(0, len(batch) - room) :]
+            self._buffer.extendleft(reversed(keep))
+        self._record("dropped", len(batch) - len(keep))
+
+    def _send(self, batch: list[_Sample]) -> bool:
+        """POST one batch with retries; True once it is sent or rejected"""
+        series: dict[tuple, list[tuple[float, int]]] = {}
+        for labels, value, timestamp in batch:
+            series.setdefault(labels, []).append((value, timestamp))
+        body = snappy_compress(encode_write_request(series.items()))
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                delay = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+                if self._stop.wait(delay):
+                    return False  # Shutting down; keep the batch for stop()
+            try:
+                status = self._post(body)
+            except Exception as e:
+                logger.warning("AMP remote write failed: %s", e)
+                continue
+            if 200 <= status < 300:
+                self._record("sent", len(batch))
+                return True
+            if 400 <= status < 500 and status != 429:
+                logger.warning(
+                    "AMP rejected %d samples with HTTP %d; dropping them",
+                    len(batch),
+                    status,
+                )
+                self._record("rejected", len(batch))
+                return True
+            logger.warning("AMP remote write got HTTP %d", status)
+        return False
+
+    def _post(self, body: bytes) -> int:
+        import requests
+
+        headers = {
+            "Content-Encoding": "snappy",
+            "Content-Type": "application/x-protobuf",
+            "User-Agent": "holonote-backend",
+            "X-Prometheus-Remote-Write-Version": "0.1.0",
+        }
+        if self.sigv4:
+            headers = self._sign(body, headers)
+        if self._session is None:
+            self._session = requests.Session()
+        response = self._session.post(
+            self.amp_endpoint, data=body, headers=headers, timeout=self.timeout
+        )
+        return response.status_code
+
+    def _sign(self, body: bytes, headers: dict[str, str]) -> dict[str, str]:
+        """Sign the request for the ``aps`` service with the task's credentials"""
+        from botocore.auth import SigV4Auth
+        from botocore.awsrequest import AWSRequest
+
+        if self._credentials is None:
+            from botocore.session import get_session
+
+            self._credentials = get_session().get_credentials()
+            if self._credentials is None:
+                raise RuntimeError("No AWS credentials found for SigV4 signing")
+        request = AWSRequest(
+            method="POST", url=self.amp_endpoint, data=body, headers=headers
+        )
+        SigV4Auth(
+            self._credentials.get_frozen_credentials(), "aps", self.region
+        ).add_auth(request)
+        return dict(request.headers.items())
+
 
 # Global instance
 _amp_writer: Optional[AMPRemoteWrite] = None
@@ -0,0 +1,117 @@
+"""Prometheus multiprocess mode for multi-worker servers.
+
+Each worker keeps its own metric values, so without this a scrape of /metrics
+only reports the worker that happened to serve it. With PROMETHEUS_MULTIPROC_DIR
+set (serve.py sets it whenever it runs more than one worker) prometheus_client
+keeps every value in mmap-backed files in that directory, and a scrape merges
+the files of all workers. The variable must be set before prometheus_client is
+first imported, since it picks its value storage at import time.
+
+The gunicorn master cleans up after each worker that exits: its live gauges
+are removed and its counter, histogram and summary files are folded into one
+archive file per type. Totals stay monotonic while the number of files, and so
+the cost of a scrape, stays bounded as workers are recycled. Scrapes and
+clean-ups take a shared/exclusive lock on the directory so a scrape never sees
+a dead worker's values twice or not at all.
+
+Gauges must declare a ``multiprocess_mode``; the app's gauges use ``livesum``
+(the sum over live workers).
+"""
+
+import fcntl
+import glob
+import os
+from contextlib import contextmanager
+from typing import Optional
+
+ENV = "PROMETHEUS_MULTIPROC_DIR"
+LOCK_FILE = "merge.lock"
+
+# Types whose values add up across workers and can be archived
+_ARCHIVED_TYPES = ("counter", "histogram", "summary")
+
+
+def multiproc_dir() -> Optional[str]:
+    return os.environ.get(ENV) or None
+
+
+def enable_multiprocess(path: str) -> str:
+    """Use ``path`` for multiprocess metrics, clearing files of earlier runs"""
+    os.makedirs(path, exist_ok=True)
+    for stale in glob.glob(os.path.join(path, "*.db")):
+        os.remove(stale)
+    os.environ[ENV] = path
+    return path
+
+
+@contextmanager
+def _locked(path: str, exclusive: bool):
+    with open(os.path.join(path, LOCK_FILE), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _archive(source: str, target: str):
+    """Add every value in ``source`` to the same key in ``target``"""
+    from prometheus_client.mmap_dict import MmapedDict
+
+    archive = MmapedDict(target)
+    try:
+        for key, value, timestamp, _ in MmapedDict.read_all_values_from_file(source):
+            current, _ = archive.read_value(key)
+            archive.write_value(key, current + value, timestamp)
+    finally:
+        archive.close()
+
+
+def mark_process_dead(pid: int, path: Optional[str] = None):
+    """Remove a dead worker's live gauges and archive its other values"""
+    from prometheus_client import multiprocess
+
+    path = path or multiproc_dir()
+    if not path:
+        return
+    with _locked(path, exclusive=True):
+        multiprocess.mark_process_dead(pid, path)
+        for typ in _ARCHIVED_TYPES:
+            source = os.path.join(path, f"{typ}_{pid}.db")
+            if os.path.exists(source):
+                _archive(source, os.path.join(path, f"{typ}_archive.db"))
+                os.remove(source)
+
+
+class _LockedCollector:
+    """MultiProcessCollector that does not race mark_process_dead"""
+
+    def __init__(self, path: str):
+        from prometheus_client.multiprocess import MultiProcessCollector
+
+        self._path = path
+        self._collector = MultiProcessCollector(None, path)
+
+    def collect(self):
+        with _locked(self._path, exclusive=False):
+            return list(self._collector.collect())
+
+
+def scrape_registry(path: Optional[str] = None):
+    """Registry to expose: every worker's values when in multiprocess mode"""
+    from prometheus_client import REGISTRY, CollectorRegistry
+
+    path = path or multiproc_dir()
+    if not path:
+        return REGISTRY
+    registry = CollectorRegistry()
+    registry.register(_LockedCollector(path))
+    return registry
+
+
+def metrics_endpoint():
+    """/metrics handler merging all workers (replaces Instrumentator.expose)"""
+    from fastapi import Response
+    from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+    return Response(generate_latest(scrape_registry()), media_type=CONTENT_TYPE_LATEST)
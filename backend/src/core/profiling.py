@@ -0,0 +1,239 @@
+"""On-demand profiling behind the admin debug routes (api/routes/debug.py).
+
+- ``sample_stacks`` samples every thread's stack at a fixed interval (wall
+  clock, so waiting threads show up too) and ``collapsed`` renders the counts
+  as collapsed stacks, the input format of flamegraph.pl, inferno and
+  speedscope.
+- The ``tracemalloc`` helpers report the largest allocation sites and the
+  difference against a baseline snapshot.
+- ``ProfileRequestMiddleware`` runs cProfile over a single request when it
+  carries the debug profile header with the configured token. The blocking
+  parts of the request (token verification, the handler, serialization) run
+  in the bounded executors, which profile through ``run_profiled``; the
+  result is kept in memory under the id returned in ``X-Debug-Profile-Id``.
+
+Everything is per worker: profiles and snapshots only cover the process that
+served the call.
+"""
+
+import collections
+import contextvars
+import cProfile
+import hmac
+import io
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from typing import Any, Callable, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+
+# --- Sampling CPU profile ---
+
+# One sampler per worker at a time
+cpu_profile_lock = threading.Lock()
+
+
+def _thread_group(name: str) -> str:
+    """Pool threads ("db-executor_3") collapse into one root frame"""
+    return re.sub(r"_\d+$", "", name)
+
+
+def sample_stacks(seconds: float, interval: float = 0.005) -> collections.Counter:
+    """Count each thread's stack (root first) every ``interval`` seconds"""
+    own = threading.get_ident()
+    stacks: collections.Counter = collections.Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        names = {t.ident: _thread_group(t.name) for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            frames = []
+            while frame is not None:
+                module = frame.f_globals.get("__name__", "?")
+                frames.append(f"{module}:{frame.f_code.co_name}")
+                frame = frame.f_back
+            frames.append(names.get(ident, "thread"))
+            stacks[";".join(reversed(frames))] += 1
+        time.sleep(interval)
+    return stacks
+
+
+def collapsed(stacks: collections.Counter) -> str:
+    """``root;...;leaf count`` lines, one per distinct stack"""
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+
+
+# --- tracemalloc ---
+
+_baseline: Optional[tracemalloc.Snapshot] = None
+
+_NOISE = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def start_tracemalloc(frames: int = 1):
+    global _baseline
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _baseline = None
+    tracemalloc.start(frames)
+
+
+def stop_tracemalloc():
+    global _baseline
+    tracemalloc.stop()
+    _baseline = None
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    if not tracemalloc.is_tracing():
+        raise RuntimeError("tracemalloc is not running")
+    return tracemalloc.take_snapshot().filter_traces(_NOISE)
+
+
+def _location(stat) -> str:
+    return "; ".join(f"{frame.filename}:{frame.lineno}" for frame in stat.traceback)
+
+
+def top_allocations(limit: int = 25, group_by: str = "lineno") -> list[dict]:
+    """Largest live allocation sites"""
+    return [
+        {"location": _location(stat), "size_bytes": stat.size, "count": stat.count}
+        for stat in _snapshot().statistics(group_by)[:limit]
+    ]
+
+
+def take_baseline():
+    """Snapshot that ``diff_allocations`` compares against"""
+    global _baseline
+    _baseline = _snapshot()
+
+
+def diff_allocations(limit: int = 25, group_by: str = "lineno") -> list[dict]:
+    """Allocation sites that grew (or shrank) the most since the baseline"""
+    if _baseline is None:
+        raise RuntimeError("No baseline snapshot; take one first")
+    return [
+        {
+            "location": _location(stat),
+            "size_bytes": stat.size,
+            "size_diff_bytes": stat.size_diff,
+            "count": stat.count,
+            "count_diff": stat.count_diff,
+        }
+        for stat in _snapshot().compare_to(_baseline, group_by)[:limit]
+    ]
+
+
+# --- Per-request cProfile ---
+
+
+class RequestProfile:
+    """cProfile runs of one request's blocking calls, merged on render"""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self._profiles: list[cProfile.Profile] = []
+
+    def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        profile = cProfile.Profile()
+        self._profiles.append(profile)
+        profile.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile.disable()
+
+    def render(self, limit: int = 60) -> str:
+        if not self._profiles:
+            return "No blocking calls were profiled\n"
+        out = io.StringIO()
+        stats = pstats.Stats(*self._profiles, stream=out)
+        stats.sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
+
+
+_current_profile: contextvars.ContextVar[Optional[RequestProfile]] = (
+    contextvars.ContextVar("request_profile", default=None)
+)
+# cProfile cannot profile overlapping requests reliably; one at a time
+_request_lock = threading.Lock()
+_profiles: collections.OrderedDict[str, str] = collections.OrderedDict()
+
+
+def run_profiled(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Call ``fn``, under cProfile when the current request is profiled"""
+    profile = _current_profile.get()
+    if profile is None:
+        return fn(*args, **kwargs)
+    return profile.run(fn, *args, **kwargs)
+
+
+def get_profile(profile_id: str) -> Optional[str]:
+    return _profiles.get(profile_id)
+
+
+def _keep(profile: RequestProfile):
+    _profiles[profile.id] = profile.render()
+    while len(_profiles) > settings.DEBUG_PROFILE_KEEP:
+        _profiles.popitem(last=False)
+
+
+class ProfileRequestMiddleware:
+    """Profile requests sent with ``X-Debug-Profile: <DEBUG_PROFILE_TOKEN>``"""
+
+    HEADER = b"x-debug-profile"
+
+    def __init__(self, app: ASGIApp, token: Optional[str] = None):
+        self.app = app
+        self.token = (settings.DEBUG_PROFILE_TOKEN if token is None else token).encode()
+
+    def _requested(self, scope: Scope) -> bool:
+        if scope["type"] != "http" or not self.token:
+            return False
+        for key, value in scope.get("headers", []):
+            if key == self.HEADER:
+                return hmac.compare_digest(value, self.token)
+        return False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if not _request_lock.acquire(blocking=False):
+            await self.app(scope, receive, _with_header(send, b"busy"))
+            return
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        try:
+            await self.app(
+                scope,
+                receive,
+                _with_header(send, profile.id.encode(), b"x-debug-profile-id"),
+            )
+        finally:
+            _current_profile.reset(token)
+            _keep(profile)
+            _request_lock.release()
+
+
+def _with_header(send: Send, value: bytes, name: bytes = b"x-debug-profile") -> Send:
+    async def wrapped(message: Message):
+        if message["type"] == "http.response.start":
+            message["headers"] = list(message.get("headers", [])) + [(name, value)]
+        await send(message)
+
+    return wrapped
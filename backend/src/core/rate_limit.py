@@ -0,0 +1,246 @@
+"""Per-user token-bucket rate limiting.
+
+Every verified uid gets one bucket per budget: reads, writes and exports
+(whole-history reads such as analytics). A bucket holds up to ``burst``
+requests and refills at ``rate`` per second. Buckets are stored GCRA-style as
+a single timestamp, the time at which the bucket would be full again, so a
+check is one read and one conditional write.
+
+MemoryRateLimiter keeps buckets per worker; RedisRateLimiter shares them
+across workers with an optimistic WATCH/MULTI/EXEC transaction. A Redis
+outage fails open: the limiter protects the database, it must never be the
+reason a request fails.
+
+Decisions are surfaced with the IETF ``RateLimit-Limit``,
+``RateLimit-Remaining`` and ``RateLimit-Reset`` headers (plus ``Retry-After``
+on 429) by RateLimitHeadersMiddleware.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .cache import RedisClient, RedisError
+from .config import settings
+from .metrics import rate_limited
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Budget:
+    rate: float  # requests refilled per second
+    burst: int  # bucket capacity
+
+    @property
+    def interval(self) -> float:
+        return 1.0 / self.rate
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: float  # seconds until the bucket is full again
+    retry_after: float  # seconds until the next request is allowed
+
+    def headers(self) -> dict[str, str]:
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(math.ceil(self.reset)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
+def budgets() -> dict[str, Budget]:
+    return {
+        "read": Budget(
+            settings.RATE_LIMIT_READ_PER_SECOND, settings.RATE_LIMIT_READ_BURST
+        ),
+        "write": Budget(
+            settings.RATE_LIMIT_WRITE_PER_SECOND, settings.RATE_LIMIT_WRITE_BURST
+        ),
+        "export": Budget(
+            settings.RATE_LIMIT_EXPORT_PER_SECOND, settings.RATE_LIMIT_EXPORT_BURST
+        ),
+    }
+
+
+def _decide(
+    full_at: Optional[float], now: float, budget: Budget
+) -> tuple[RateLimitDecision, float]:
+    """Charge one request; returns the decision and the bucket's new full-at time"""
+    full_at = max(full_at or now, now)
+    charged = full_at + budget.interval
+    # Earliest time the bucket has room for this request
+    allowed_at = charged - budget.burst * budget.interval
+    if now < allowed_at:
+        decision = RateLimitDecision(
+            allowed=False,
+            limit=budget.burst,
+            remaining=0,
+            reset=full_at - now,
+            retry_after=allowed_at - now,
+        )
+        return decision, full_at
+    decision = RateLimitDecision(
+        allowed=True,
+        limit=budget.burst,
+        remaining=int((now - allowed_at) / budget.interval + 1e-9),
+        reset=charged - now,
+        retry_after=0.0,
+    )
+    return decision, charged
+
+
+class RateLimiter:
+    def take(self, key: str, budget: Budget) -> RateLimitDecision:
+        """Charge one request to ``key``'s bucket"""
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class MemoryRateLimiter(RateLimiter):
+    """Buckets in this worker; the least recently used are dropped (refilled)"""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, budget: Budget) -> RateLimitDecision:
+        now = time.monotonic()
+        with self._lock:
+            decision, full_at = _decide(self._buckets.get(key), now, budget)
+            self._buckets[key] = full_at
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return decision
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class RedisRateLimiter(RateLimiter):
+    """Buckets shared by all workers on a Redis-protocol server"""
+
+    def __init__(
+        self,
+        url: str,
+        prefix: str = "holonote:ratelimit:",
+        timeout: float = 0.5,
+        retries: int = 3,
+    ):
+        self.prefix = prefix
+        self.retries = retries
+        self._client = RedisClient(url, timeout=timeout)
+
+    def take(self, key: str, budget: Budget) -> RateLimitDecision:
+        key = f"{self.prefix}{key}"
+        try:
+            for _ in range(self.retries):
+                decision = self._try_take(key, budget)
+                if decision is not None:
+                    return decision
+            logger.warning("Rate limit bucket %s stayed contended; allowing", key)
+        except (OSError, ConnectionError, RedisError) as e:
+            logger.warning("Rate limit server unavailable: %s", e)
+        return _decide(None, time.time(), budget)[0]
+
+    def _try_take(self, key: str, budget: Budget) -> Optional[RateLimitDecision]:
+        """One optimistic attempt; None if another request raced us"""
+        with self._client.connection() as conn:
+            _, stored = conn.execute(("WATCH", key), ("GET", key))
+            # Wall clock: buckets are shared between hosts
+            now = time.time()
+            decision, full_at = _decide(float(stored) if stored else None, now, budget)
+            if not decision.allowed:
+                conn.execute(("UNWATCH",))
+                return decision
+            ttl_ms = max(1, math.ceil((full_at - now) * 1000))
+            replies = conn.execute(
+                ("MULTI",), ("SET", key, repr(full_at), "PX", ttl_ms), ("EXEC",)
+            )
+            return decision if replies[-1] is not None else None
+
+    def clear(self):
+        cursor = "0"
+        while True:
+            cursor, keys = self._client.execute(
+                ("SCAN", cursor, "MATCH", f"{self.prefix}*", "COUNT", 500)
+            )[0]
+            if keys:
+                self._client.execute(("DEL", *keys))
+            if cursor in (b"0", "0"):
+                return
+
+
+def create_rate_limiter() -> Optional[RateLimiter]:
+    """Build the backend selected by RATE_LIMIT_BACKEND, or None if disabled"""
+    backend = settings.RATE_LIMIT_BACKEND
+    if backend == "memory":
+        return MemoryRateLimiter(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+    if backend == "redis":
+        return RedisRateLimiter(settings.RATE_LIMIT_REDIS_URL)
+    if backend:
+        logger.warning("Unknown RATE_LIMIT_BACKEND '%s'; rate limiting off", backend)
+    return None
+
+
+rate_limiter = create_rate_limiter()
+
+
+def check_rate_limit(user_id: str, budget_name: str) -> Optional[RateLimitDecision]:
+    """Charge one request to the user's bucket for ``budget_name``.
+
+    Returns None when rate limiting is disabled.
+    """
+    if rate_limiter is None:
+        return None
+    decision = rate_limiter.take(f"{budget_name}:{user_id}", budgets()[budget_name])
+    if not decision.allowed and rate_limited is not None:
+        rate_limited.labels(budget=budget_name).inc()
+    return decision
+
+
+class RateLimitHeadersMiddleware:
+    """Add the rate-limit headers of an admitted request to its response.
+
+    The decision is made in a route dependency and left on ``request.state``;
+    it is applied here so it also reaches responses the handler builds itself
+    (e.g. cached bodies), which bypass FastAPI's dependency response headers.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message):
+            decision = scope.get("state", {}).get("rate_limit")
+            if message["type"] == "http.response.start" and decision is not None:
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (name.lower().encode(), value.encode())
+                    for name, value in decision.headers().items()
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
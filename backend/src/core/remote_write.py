@@ -0,0 +1,121 @@
+"""Prometheus remote-write wire format.
+
+A remote-write request body is a snappy-compressed (block format, not framed)
+protobuf ``prometheus.WriteRequest``. The message is small enough to encode by
+hand, which avoids generated protobuf code and a compiled snappy dependency:
+
+    WriteRequest { repeated TimeSeries timeseries = 1; }
+    TimeSeries   { repeated Label labels = 1; repeated Sample samples = 2; }
+    Label        { string name = 1; string value = 2; }
+    Sample       { double value = 1; int64 timestamp = 2; }  // ms since epoch
+
+python-snappy is used for compression when installed.
+"""
+
+import struct
+from typing import Iterable, Sequence
+
+try:
+    import snappy as _snappy
+except ImportError:  # Pure-Python fallback below
+    _snappy = None
+
+# (sorted (name, value) label pairs, [(value, timestamp_ms), ...])
+Series = tuple[Sequence[tuple[str, str]], Sequence[tuple[float, int]]]
+
+_VARINT, _I64, _LEN = 0, 1, 2
+
+
+def _varint(value: int) -> bytes:
+    value &= (1 << 64) - 1  # int64 two's complement
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _field(number: int, wire_type: int, payload: bytes) -> bytes:
+    key = _varint(number << 3 | wire_type)
+    if wire_type == _LEN:
+        return key + _varint(len(payload)) + payload
+    return key + payload
+
+
+def encode_write_request(series: Iterable[Series]) -> bytes:
+    """Serialize time series into a WriteRequest protobuf"""
+    out = bytearray()
+    for labels, samples in series:
+        body = bytearray()
+        for name, value in labels:
+            label = _field(1, _LEN, name.encode()) + _field(2, _LEN, value.encode())
+            body += _field(1, _LEN, label)
+        for value, timestamp_ms in samples:
+            sample = _field(1, _I64, struct.pack("<d", value)) + _field(
+                2, _VARINT, _varint(timestamp_ms)
+            )
+            body += _field(2, _LEN, sample)
+        out += _field(1, _LEN, bytes(body))
+    return bytes(out)
+
+
+# Snappy block format: varint uncompressed length, then literal and copy
+# elements. Matches are found with a hash of the next four bytes, within
+# independent 64 KiB blocks so every offset fits a two-byte copy.
+_BLOCK = 1 << 16
+_MIN_MATCH = 4
+
+
+def _literal(data: bytes) -> bytes:
+    n = len(data) - 1
+    if n < 60:
+        return bytes([n << 2]) + data
+    size = (n.bit_length() + 7) // 8
+    return bytes([(59 + size) << 2]) + n.to_bytes(size, "little") + data
+
+
+def _copy(offset: int, length: int) -> bytes:
+    out = bytearray()
+    while length > 0:
+        chunk = min(length, 64)
+        out += bytes([(chunk - 1) << 2 | 2]) + offset.to_bytes(2, "little")
+        length -= chunk
+    return bytes(out)
+
+
+def _compress_block(block: bytes) -> bytes:
+    out = bytearray()
+    table: dict[bytes, int] = {}
+    literal_start = i = 0
+    end = len(block) - _MIN_MATCH
+    while i <= end:
+        key = block[i : i + _MIN_MATCH]
+        candidate = table.get(key)
+        table[key] = i
+        if candidate is None:
+            i += 1
+            continue
+        length = _MIN_MATCH
+        while (
+            i + length < len(block) and block[candidate + length] == block[i + length]
+        ):
+            length += 1
+        if literal_start < i:
+            out += _literal(block[literal_start:i])
+        out += _copy(i - candidate, length)
+        i += length
+        literal_start = i
+    if literal_start < len(block):
+        out += _literal(block[literal_start:])
+    return bytes(out)
+
+
+def snappy_compress(data: bytes) -> bytes:
+    """Compress ``data`` in snappy block format"""
+    if _snappy is not None:
+        return _snappy.compress(data)
+    out = bytearray(_varint(len(data)))
+    for start in range(0, len(data), _BLOCK):
+        out += _compress_block(data[start : start + _BLOCK])
+    return bytes(out)
@@ -0,0 +1,158 @@
+"""Cache and coalesce serialized responses of read endpoints.
+
+A decorated handler's response is stored as JSON bytes under a key scoped to
+the user, the route and its query parameters, so a hit skips both the SQL and
+the Pydantic serialization. Entries are tagged and dropped by the db-layer
+write functions (see invalidate_response_tag). Hits and misses are counted
+per route; the hit ratio is hits / (hits + misses).
+
+Misses (or every call, with the cache disabled) go through a per-worker
+single-flight: identical concurrent requests share one handler execution and
+its serialized bytes, which flattens retry storms and reconnect herds.
+
+Writes that land while a miss is being computed are tracked with per-tag
+generation counters, bumped by invalidate_response_tag. A result whose tags
+moved during the handler call is returned to its own caller but not stored,
+and requests arriving after the write never join a flight started before it.
+"""
+
+import functools
+import logging
+from typing import Any, Callable, Iterable, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from .cache import CacheBackend, RedisCache, TagGenerations, TTLCache
+from .config import settings
+from .single_flight import SingleFlight
+from .timing import phase
+
+logger = logging.getLogger(__name__)
+
+try:
+    from prometheus_client import Counter
+
+    cache_requests = Counter(
+        "response_cache_requests_total",
+        "Response cache lookups by route and result (hit or miss)",
+        ["route", "result"],
+    )
+    coalesced_requests = Counter(
+        "coalesced_requests_total",
+        "Read executions by route and single-flight outcome (leader, shared, timeout)",
+        ["route", "outcome"],
+    )
+except ImportError:  # Metrics are optional
+    cache_requests = coalesced_requests = None
+
+# Handler arguments that are dependencies rather than part of the request
+_NOT_KEYED = ("db", "user")
+
+
+def create_response_cache() -> Optional[CacheBackend]:
+    """Build the backend selected by RESPONSE_CACHE_BACKEND, or None if disabled"""
+    backend = settings.RESPONSE_CACHE_BACKEND
+    if backend == "memory":
+        return TTLCache(
+            maxsize=settings.RESPONSE_CACHE_MAX_ENTRIES,
+            ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+        )
+    if backend == "redis":
+        return RedisCache(
+            settings.RESPONSE_CACHE_REDIS_URL,
+            ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+        )
+    if backend:
+        logger.warning("Unknown RESPONSE_CACHE_BACKEND '%s'; caching disabled", backend)
+    return None
+
+
+response_cache = create_response_cache()
+in_flight = SingleFlight()
+generations = TagGenerations()
+
+
+def invalidate_response_tag(tag: str):
+    """Drop cached responses carrying ``tag``; call after committing a write"""
+    generations.bump(tag)
+    if response_cache is not None:
+        response_cache.invalidate_tag(tag)
+
+
+def _record(route: str, result: str):
+    if cache_requests is not None:
+        cache_requests.labels(route=route, result=result).inc()
+
+
+def _execute(route: str, key: str, compute: Callable[[], bytes]) -> bytes:
+    if not settings.REQUEST_COALESCING:
+        return compute()
+    body, outcome = in_flight.do(
+        key, compute, timeout=settings.REQUEST_COALESCING_TIMEOUT_SECONDS
+    )
+    if coalesced_requests is not None:
+        coalesced_requests.labels(route=route, outcome=outcome).inc()
+    return body
+
+
+def cached_response(
+    route: str,
+    response_model: Any = Any,
+    tags: Callable[[str, Any], Iterable[str]] = lambda user_id, db: (),
+):
+    """Cache and coalesce a read handler's serialized response per user.
+
+    ``tags(user_id, db)`` is called on a miss to tag the stored response and
+    to detect writes during the handler call.
+    Handlers must take ``user`` (and usually ``db``) as keyword arguments, as
+    FastAPI passes them. Exceptions, including HTTPException, are not cached;
+    coalesced waiters receive the same exception as the leader.
+    """
+    adapter = TypeAdapter(response_model)
+
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(**kwargs):
+            cache = response_cache
+            if cache is None and not settings.REQUEST_COALESCING:
+                return handler(**kwargs)
+
+            user_id = kwargs["user"]["uid"]
+            params = sorted(
+                (name, str(value))
+                for name, value in kwargs.items()
+                if name not in _NOT_KEYED and value is not None
+            )
+            key = f"response:{route}:{user_id}:{params}"
+            if cache is not None:
+                body = cache.get(key)
+                if body is not None:
+                    _record(route, "hit")
+                    return Response(content=body, media_type="application/json")
+                _record(route, "miss")
+
+            response_tags = list(tags(user_id, kwargs.get("db")))
+            generation = generations.snapshot(response_tags)
+
+            def compute() -> bytes:
+                result = handler(**kwargs)
+                with phase("serialize"):
+                    body = adapter.dump_json(
+                        adapter.validate_python(result, from_attributes=True)
+                    )
+                # Not stored if a write to one of its tags landed meanwhile
+                if (
+                    cache is not None
+                    and generations.snapshot(response_tags) == generation
+                ):
+                    cache.set(key, body, tags=response_tags)
+                return body
+
+            # Requests after a write start their own flight
+            body = _execute(route, f"{key}:{generation}", compute)
+            return Response(content=body, media_type="application/json")
+
+        return wrapper
+
+    return decorator
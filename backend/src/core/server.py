@@ -0,0 +1,119 @@
+"""Production server configuration: worker sizing and process-manager options.
+
+Workers are sized from the container's CPU and memory limits (cgroup v2 or
+v1, falling back to the host) unless WEB_CONCURRENCY pins the count. Each
+worker is a uvicorn event loop (uvloop/httptools when installed) managed by
+gunicorn, which preloads the app so imported modules are shared copy-on-write.
+"""
+
+import math
+import os
+from pathlib import Path
+from typing import Optional
+
+from .config import settings
+from .logs import route_server_logs
+from .multiprocess import mark_process_dead
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+
+def _read(path: Path) -> Optional[str]:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def cpu_limit(cgroup_root: Path = CGROUP_ROOT) -> float:
+    """CPUs available to this container (fractional under a CFS quota)"""
+    quota = period = None
+    cpu_max = _read(cgroup_root / "cpu.max")  # cgroup v2: "<quota> <period>"
+    if cpu_max:
+        raw_quota, _, raw_period = cpu_max.partition(" ")
+        if raw_quota != "max":
+            quota, period = int(raw_quota), int(raw_period or 100000)
+    else:
+        raw_quota = _read(cgroup_root / "cpu" / "cpu.cfs_quota_us")
+        raw_period = _read(cgroup_root / "cpu" / "cpu.cfs_period_us")
+        if raw_quota and raw_period and int(raw_quota) > 0:
+            quota, period = int(raw_quota), int(raw_period)
+
+    try:
+        available = len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on macOS
+        available = os.cpu_count() or 1
+    if quota and period:
+        return min(available, quota / period)
+    return float(available)
+
+
+def memory_limit(cgroup_root: Path = CGROUP_ROOT) -> Optional[int]:
+    """Memory limit in bytes, or None when unlimited/unknown"""
+    for path in (
+        cgroup_root / "memory.max",  # cgroup v2
+        cgroup_root / "memory" / "memory.limit_in_bytes",  # cgroup v1
+    ):
+        raw = _read(path)
+        if raw and raw != "max":
+            limit = int(raw)
+            # cgroup v1 reports "unlimited" as a huge page-aligned number
+            if limit < 1 << 60:
+                return limit
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def worker_count(
+    cpus: Optional[float] = None, memory_bytes: Optional[int] = None
+) -> int:
+    """Workers to run: WEB_CONCURRENCY if set, else bounded by CPU and memory"""
+    if settings.WEB_CONCURRENCY > 0:
+        return settings.WEB_CONCURRENCY
+    cpus = cpu_limit() if cpus is None else cpus
+    memory_bytes = memory_limit() if memory_bytes is None else memory_bytes
+
+    workers = math.ceil(cpus * settings.WEB_WORKERS_PER_CORE)
+    if memory_bytes:
+        workers = min(workers, memory_bytes // (settings.WEB_WORKER_MEMORY_MB << 20))
+    return max(1, min(workers, settings.WEB_MAX_WORKERS))
+
+
+def gunicorn_options(workers: Optional[int] = None) -> dict:
+    """Gunicorn settings for the production server"""
+    return {
+        "bind": f"{settings.SERVER_HOST}:{settings.SERVER_PORT}",
+        "workers": workers or worker_count(),
+        "worker_class": "uvicorn_worker.UvicornWorker",
+        "preload_app": True,
+        "keepalive": settings.SERVER_KEEPALIVE_SECONDS,
+        "backlog": settings.SERVER_BACKLOG,
+        "timeout": settings.SERVER_WORKER_TIMEOUT_SECONDS,
+        "graceful_timeout": settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+        "max_requests": settings.SERVER_MAX_REQUESTS,
+        "max_requests_jitter": settings.SERVER_MAX_REQUESTS // 10,
+        "forwarded_allow_ips": settings.SERVER_FORWARDED_ALLOW_IPS,
+        # Access records come from RequestContextMiddleware; gunicorn's and
+        # uvicorn's own records go through the logging queue (post_fork)
+        "accesslog": None,
+        "errorlog": "-",
+        "post_fork": _post_fork,
+        "child_exit": _child_exit,
+    }
+
+
+def _post_fork(server, worker):
+    # Connections must not be shared with the parent; dropping the inherited
+    # pool without closing leaves the parent's sockets alone
+    from src.db.session import dispose_engine
+
+    dispose_engine(close=False)
+    # The uvicorn worker has just given its loggers gunicorn's stream handlers
+    route_server_logs()
+
+
+def _child_exit(server, worker):
+    # Runs in the master; folds the worker's metrics into the shared archive
+    mark_process_dead(worker.pid)
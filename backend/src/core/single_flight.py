@@ -0,0 +1,62 @@
+"""Coalesce identical concurrent calls within a worker.
+
+The first caller for a key (the leader) runs the function; callers arriving
+while it is in flight wait for its result instead of running it again. Waiters
+give up after a timeout and run the function themselves, so a slow leader
+never blocks them indefinitely.
+"""
+
+import threading
+from typing import Any, Callable, Hashable, Optional
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(
+        self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None
+    ) -> tuple[Any, str]:
+        """Run ``fn`` once per in-flight ``key``.
+
+        Returns (result, outcome) where outcome is "leader", "shared" or
+        "timeout". The leader's exception is re-raised in every waiter.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if leader:
+            try:
+                call.result = fn()
+                return call.result, "leader"
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if not call.done.wait(timeout):
+            return fn(), "timeout"
+        if call.error is not None:
+            raise call.error
+        return call.result, "shared"
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
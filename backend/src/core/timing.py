@@ -0,0 +1,156 @@
+"""Per-request phase timings.
+
+Spans are cheap ``phase(name)`` blocks recorded into a per-request dict held
+in a context variable, so they follow the request into the auth and DB
+executors. Phases:
+
+- ``auth``: Firebase ``verify_id_token``
+- ``user``: ``ensure_user_exists``
+- ``db``: time spent executing SQL anywhere in the request
+- ``handler``: the route handler body (DB routes), including its SQL
+- ``serialize``: turning the handler's result into response bytes
+
+Every phase is observed in the ``request_phase_seconds`` histogram, labelled
+by route template like the Instrumentator's ``handler`` label, and with
+SERVER_TIMING_HEADER enabled also echoed in a ``Server-Timing`` header.
+"""
+
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+from .metrics import request_phase_seconds
+
+
+class RequestTiming:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.handler_done: Optional[float] = None
+
+    def add(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def header(self) -> str:
+        """Server-Timing value; durations in milliseconds"""
+        entries = [
+            f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.phases.items()
+        ]
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(entries)
+
+
+_current: ContextVar[Optional[RequestTiming]] = ContextVar(
+    "request_timing", default=None
+)
+
+
+def current_timing() -> Optional[RequestTiming]:
+    return _current.get()
+
+
+@contextmanager
+def phase(name: str):
+    """Time the block as ``name`` in the current request (no-op outside one)"""
+    timing = _current.get()
+    if timing is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add(name, time.perf_counter() - started)
+
+
+def timed_handler(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a sync route handler in the ``handler`` phase.
+
+    Its end also marks where FastAPI's own response serialization starts.
+    """
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        timing = _current.get()
+        try:
+            with phase("handler"):
+                return fn(*args, **kwargs)
+        finally:
+            if timing is not None:
+                timing.handler_done = time.perf_counter()
+
+    return wrapper
+
+
+# SQL time, for every engine (including the tests' in-memory ones)
+_STARTS = "request_timing_starts"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    if _current.get() is not None:
+        conn.info.setdefault(_STARTS, []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    starts = conn.info.get(_STARTS)
+    timing = _current.get()
+    if starts and timing is not None:
+        timing.add("db", time.perf_counter() - starts.pop())
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    starts = conn.info.get(_STARTS) if conn is not None else None
+    if starts:
+        starts.pop()
+
+
+class ServerTimingMiddleware:
+    def __init__(self, app: ASGIApp, header: Optional[bool] = None):
+        self.app = app
+        self.header = settings.SERVER_TIMING_HEADER if header is None else header
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming()
+        token = _current.set(timing)
+
+        async def send_with_timing(message: Message):
+            if message["type"] == "http.response.start":
+                # Everything between the handler returning and the response
+                # starting is FastAPI validating and serializing its result
+                if timing.handler_done is not None:
+                    timing.add("serialize", time.perf_counter() - timing.handler_done)
+                if self.header:
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", timing.header().encode())
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            self._observe(scope, timing)
+
+    @staticmethod
+    def _observe(scope: Scope, timing: RequestTiming):
+        if request_phase_seconds is None:
+            return
+        route = scope.get("route")
+        handler = getattr(route, "path", None) or "none"
+        for name, seconds in timing.phases.items():
+            request_phase_seconds.labels(handler=handler, phase=name).observe(seconds)
@@ -0,0 +1,305 @@
+"""Optional OpenTelemetry tracing.
+
+With TRACING_ENABLED each worker exports spans over OTLP/HTTP in batches:
+
+- one server span per request (TracingMiddleware), named after the route
+  template and continuing any incoming ``traceparent``
+- ``traced(name)`` spans around Firebase token verification and
+  ``ensure_user_exists``
+- one client span per SQL statement run inside a traced request
+
+Sampling is two-staged. A TRACING_SAMPLE_RATIO share of traces is sampled at
+the head and exported as usual. Every other trace is still recorded and held
+in memory until its local root span ends; it is exported only when the
+request took at least TRACING_SLOW_REQUEST_MS or failed, so slow requests can
+be followed end to end without exporting every fast one.
+
+Without the SDK installed, or with tracing disabled, ``traced`` and the SQL
+hooks are no-ops and the middleware is not added.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    from opentelemetry import propagate, trace
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+except ImportError:  # Tracing is optional
+    trace = None
+
+# Set by configure_tracing; None while tracing is off
+_tracer = None
+_provider = None
+
+# Longest SQL statement text recorded on a span
+MAX_STATEMENT_LENGTH = 2048
+
+
+@contextmanager
+def traced(name: str, **attributes):
+    """Run the block in a child span of the current trace (no-op when off)"""
+    if _tracer is None:
+        yield None
+        return
+    with _tracer.start_as_current_span(name, attributes=attributes) as span:
+        yield span
+
+
+def _tail_sampling_types():
+    """SDK classes for two-stage sampling, built only when tracing is on"""
+    from opentelemetry.sdk.trace import ReadableSpan, SpanProcessor
+    from opentelemetry.sdk.trace.sampling import Decision, Sampler, SamplingResult
+    from opentelemetry.trace import SpanContext, TraceFlags
+
+    class RecordUnsampled(Sampler):
+        """Head sampler whose dropped spans are still recorded (not sampled)"""
+
+        def __init__(self, head: Sampler):
+            self._head = head
+
+        def should_sample(
+            self,
+            parent_context,
+            trace_id,
+            name,
+            kind=None,
+            attributes=None,
+            links=None,
+            trace_state=None,
+        ):
+            result = self._head.should_sample(
+                parent_context, trace_id, name, kind, attributes, links, trace_state
+            )
+            if result.decision == Decision.DROP:
+                # A dropping sampler also drops the span's attributes
+                return SamplingResult(
+                    Decision.RECORD_ONLY, attributes, result.trace_state
+                )
+            return result
+
+        def get_description(self) -> str:
+            return f"RecordUnsampled{{{self._head.get_description()}}}"
+
+    class TailLatencyProcessor(SpanProcessor):
+        """Forwards head-sampled spans; keeps other traces only when slow.
+
+        Unsampled spans are buffered per trace until the trace's local root
+        ends. At most ``max_traces`` traces of ``max_spans`` spans are held;
+        the oldest trace is dropped first.
+        """
+
+        def __init__(
+            self,
+            processor: SpanProcessor,
+            slow_seconds: float,
+            max_traces: int = 1024,
+            max_spans: int = 512,
+        ):
+            self._processor = processor
+            self._slow_ns = int(slow_seconds * 1e9)
+            self._max_traces = max_traces
+            self._max_spans = max_spans
+            self._pending: OrderedDict[int, list] = OrderedDict()
+            self._lock = threading.Lock()
+
+        def on_start(self, span, parent_context=None):
+            pass
+
+        def on_end(self, span: ReadableSpan):
+            if span.context.trace_flags.sampled:
+                self._processor.on_end(span)
+                return
+
+            trace_id = span.context.trace_id
+            local_root = span.parent is None or span.parent.is_remote
+            with self._lock:
+                spans = self._pending.setdefault(trace_id, [])
+                if len(spans) < self._max_spans:
+                    spans.append(span)
+                if local_root:
+                    del self._pending[trace_id]
+                elif len(self._pending) > self._max_traces:
+                    self._pending.popitem(last=False)
+            if not local_root:
+                return
+
+            slow = span.end_time - span.start_time >= self._slow_ns
+            if slow or span.status.status_code == StatusCode.ERROR:
+                for pending in spans:
+                    self._processor.on_end(_as_sampled(pending))
+
+        def shutdown(self):
+            self._processor.shutdown()
+
+        def force_flush(self, timeout_millis: int = 30000) -> bool:
+            return self._processor.force_flush(timeout_millis)
+
+    def _as_sampled(span: ReadableSpan) -> ReadableSpan:
+        """Copy of ``span`` flagged as sampled, as the exporters require"""
+        context = SpanContext(
+            span.context.trace_id,
+            span.context.span_id,
+            span.context.is_remote,
+            TraceFlags(TraceFlags.SAMPLED),
+            span.context.trace_state,
+        )
+        return ReadableSpan(
+            name=span.name,
+            context=context,
+            parent=span.parent,
+            resource=span.resource,
+            attributes=span.attributes,
+            events=span.events,
+            links=span.links,
+            kind=span.kind,
+            status=span.status,
+            start_time=span.start_time,
+            end_time=span.end_time,
+            instrumentation_scope=span.instrumentation_scope,
+        )
+
+    return RecordUnsampled, TailLatencyProcessor
+
+
+def configure_tracing(
+    endpoint: Optional[str] = None,
+    sample_ratio: Optional[float] = None,
+    slow_ms: Optional[float] = None,
+    exporter=None,
+) -> bool:
+    """Start exporting spans; returns False when the SDK is not installed"""
+    global _tracer, _provider
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+        if exporter is None:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+                OTLPSpanExporter,
+            )
+
+            exporter = OTLPSpanExporter(
+                endpoint=endpoint or settings.TRACING_OTLP_ENDPOINT
+            )
+    except ImportError as e:
+        logger.warning("Tracing not enabled: %s", e)
+        return False
+
+    shutdown_tracing()
+    RecordUnsampled, TailLatencyProcessor = _tail_sampling_types()
+    ratio = settings.TRACING_SAMPLE_RATIO if sample_ratio is None else sample_ratio
+    slow_ms = settings.TRACING_SLOW_REQUEST_MS if slow_ms is None else slow_ms
+
+    _provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.TRACING_SERVICE_NAME}),
+        sampler=RecordUnsampled(ParentBased(TraceIdRatioBased(ratio))),
+    )
+    _provider.add_span_processor(
+        TailLatencyProcessor(BatchSpanProcessor(exporter), slow_ms / 1000)
+    )
+    _tracer = _provider.get_tracer(__name__)
+    logger.info(
+        "Tracing enabled: %.0f%% of traces plus those slower than %.0fms",
+        ratio * 100,
+        slow_ms,
+    )
+    return True
+
+
+def shutdown_tracing():
+    """Flush pending spans and stop exporting"""
+    global _tracer, _provider
+    if _provider is not None:
+        _provider.shutdown()
+    _tracer = _provider = None
+
+
+# SQL statements, as children of the current span
+_SPANS = "tracing_spans"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    if _tracer is None or not trace.get_current_span().is_recording():
+        return
+    operation = statement.split(None, 1)[0].upper() if statement.strip() else "SQL"
+    span = _tracer.start_span(
+        operation,
+        kind=SpanKind.CLIENT,
+        attributes={
+            "db.system": conn.dialect.name,
+            "db.statement": statement[:MAX_STATEMENT_LENGTH],
+        },
+    )
+    conn.info.setdefault(_SPANS, []).append(span)
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    spans = conn.info.get(_SPANS)
+    if spans:
+        spans.pop().end()
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    spans = conn.info.get(_SPANS) if conn is not None else None
+    if spans:
+        span = spans.pop()
+        span.record_exception(exception_context.original_exception)
+        span.set_status(Status(StatusCode.ERROR))
+        span.end()
+
+
+class TracingMiddleware:
+    """Server span per request; a no-op until configure_tracing has run"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or _tracer is None:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        carrier = {
+            key.decode("latin-1"): value.decode("latin-1")
+            for key, value in scope.get("headers", [])
+        }
+        with _tracer.start_as_current_span(
+            method,
+            context=propagate.extract(carrier),
+            kind=SpanKind.SERVER,
+            attributes={"http.request.method": method, "url.path": scope["path"]},
+        ) as span:
+
+            async def send_traced(message: Message):
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    span.set_attribute("http.response.status_code", status)
+                    if status >= 500:
+                        span.set_status(Status(StatusCode.ERROR))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_traced)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    span.update_name(f"{method} {route}")
+                    span.set_attribute("http.route", route)
@@ -3,6 +3,8 @@ from typing import Optional
 from uuid import uuid4
 
 from sqlalchemy.orm import Session
+from src.core.cache import entries_tag
+from src.core.response_cache import invalidate_response_tag
 from src.models.entries import EntryCreate, EntryDelete, EntryTable, EntryUpdate
 
 
@@ -27,6 +29,7 @@ def create_entry(entry: EntryCreate, db: Session):
     )
     db.add(db_entry)
     db.commit()
+    invalidate_response_tag(entries_tag(entry.user_id))
     db.refresh(db_entry)
     return db_entry
 
@@ -47,8 +50,10 @@ def update_entry(
     db_entry.title = entry.title
     db_entry.content = entry.content
     db_entry.updated_at = datetime.utcnow()
+    owner = db_entry.user_id
 
     db.commit()
+    invalidate_response_tag(entries_tag(owner))
     db.refresh(db_entry)
     return db_entry
 
@@ -65,5 +70,7 @@ def delete_entry(entry_id: str, db: Session, user_id: Optional[str] = None):
         return None
 
     db_entry.deleted_at = datetime.utcnow()
+    owner = db_entry.user_id
     db.commit()
+    invalidate_response_tag(entries_tag(owner))
     return db_entry
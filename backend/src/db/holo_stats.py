@@ -0,0 +1,298 @@
+from datetime import date, datetime, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import Integer, cast, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from src.models.holos import HoloDailiesTable, HoloStatsTable, HoloStreak
+
+# (entry_date, previous score or None when the day is new, new score)
+ScoreChange = tuple[date, Optional[int], int]
+
+
+def _dialect_insert(db: Session):
+    """Return the dialect-specific INSERT construct that supports ON CONFLICT"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    raise NotImplementedError(f"Upsert is not supported for dialect '{dialect}'")
+
+
+def get_holo_stats(holo_id: str, db: Session) -> Optional[HoloStatsTable]:
+    """Get the score aggregate row for a holo (primary-key read)"""
+    return db.get(HoloStatsTable, holo_id)
+
+
+def _compute_scores(db: Session, holo_ids: Optional[list[str]] = None):
+    """Aggregate holo_dailies scores from scratch, keyed by holo_id"""
+    query = db.query(
+        HoloDailiesTable.holo_id,
+        func.coalesce(func.sum(HoloDailiesTable.score), 0),
+        func.count(HoloDailiesTable.holo_daily_id),
+        func.min(HoloDailiesTable.score),
+        func.max(HoloDailiesTable.score),
+        func.max(HoloDailiesTable.entry_date),
+    ).group_by(HoloDailiesTable.holo_id)
+    if holo_ids is not None:
+        query = query.filter(HoloDailiesTable.holo_id.in_(holo_ids))
+    return {
+        holo_id: {
+            "score_sum": int(score_sum),
+            "score_count": score_count,
+            "score_min": score_min,
+            "score_max": score_max,
+            "last_entry_date": last_entry_date,
+        }
+        for holo_id, score_sum, score_count, score_min, score_max, last_entry_date in query
+    }
+
+
+def _streak_islands(db: Session, holo_ids: Optional[list[str]] = None):
+    """Runs of consecutive days per holo via a gaps-and-islands query.
+
+    Subtracting each row's position from its date gives a value that is constant
+    within a run of consecutive days, so grouping on it yields one row per run.
+    """
+    position = func.row_number().over(
+        partition_by=HoloDailiesTable.holo_id, order_by=HoloDailiesTable.entry_date
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        group_key = HoloDailiesTable.entry_date - cast(position, Integer)
+    else:
+        group_key = func.julianday(HoloDailiesTable.entry_date) - position
+
+    numbered = select(
+        HoloDailiesTable.holo_id,
+        HoloDailiesTable.entry_date,
+        group_key.label("island"),
+    )
+    if holo_ids is not None:
+        numbered = numbered.where(HoloDailiesTable.holo_id.in_(holo_ids))
+    numbered = numbered.subquery()
+
+    return db.execute(
+        select(
+            numbered.c.holo_id,
+            func.min(numbered.c.entry_date).label("start"),
+            func.max(numbered.c.entry_date).label("end"),
+            func.count().label("length"),
+        ).group_by(numbered.c.holo_id, numbered.c.island)
+    ).all()
+
+
+def _compute_streaks(db: Session, holo_ids: Optional[list[str]] = None):
+    """Trailing and longest streak per holo, keyed by holo_id"""
+    streaks: dict[str, dict] = {}
+    for holo_id, start, end, length in _streak_islands(db, holo_ids):
+        current = streaks.setdefault(
+            holo_id,
+            {
+                "streak_start": None,
+                "streak_length": 0,
+                "longest_streak": 0,
+                "_end": None,
+            },
+        )
+        current["longest_streak"] = max(current["longest_streak"], length)
+        if current["_end"] is None or end > current["_end"]:
+            current.update(streak_start=start, streak_length=length, _end=end)
+    for current in streaks.values():
+        del current["_end"]
+    return streaks
+
+
+def _compute_aggregates(db: Session, holo_ids: Optional[Iterable[str]] = None):
+    holo_ids = list(holo_ids) if holo_ids is not None else None
+    aggregates = _compute_scores(db, holo_ids)
+    for holo_id, streak in _compute_streaks(db, holo_ids).items():
+        aggregates[holo_id].update(streak)
+    return aggregates
+
+
+def _empty_aggregate():
+    return {
+        "score_sum": 0,
+        "score_count": 0,
+        "score_min": None,
+        "score_max": None,
+        "last_entry_date": None,
+        "streak_start": None,
+        "streak_length": 0,
+        "longest_streak": 0,
+    }
+
+
+def _lock_holo_stats(holo_id: str, db: Session) -> HoloStatsTable:
+    """Create the aggregate row if missing and hold its row lock.
+
+    INSERT ... ON CONFLICT DO UPDATE never fails on a concurrent first write:
+    it waits for the other transaction's insert and then locks that row.
+    """
+    insert = _dialect_insert(db)
+    stmt = insert(HoloStatsTable).values(holo_id=holo_id, **_empty_aggregate())
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[HoloStatsTable.holo_id],
+            set_={"updated_at": datetime.utcnow()},
+        )
+    )
+    return db.get(HoloStatsTable, holo_id, populate_existing=True)
+
+
+def rebuild_holo_stats(holo_id: str, db: Session) -> HoloStatsTable:
+    """Recompute one holo's aggregate from its dailies without committing"""
+    stats = _lock_holo_stats(holo_id, db)
+    # Aggregated after taking the lock, so (under READ COMMITTED) this sees
+    # the dailies of any transaction that held it before us
+    values = _compute_aggregates(db, [holo_id]).get(holo_id, _empty_aggregate())
+    for column, value in values.items():
+        setattr(stats, column, value)
+    db.flush()
+    return stats
+
+
+def lock_holo_stats(holo_id: str, db: Session) -> HoloStatsTable:
+    """Serialize daily writers for one holo on its aggregate row.
+
+    Taken before reading the scores a write replaces: SELECT ... FOR UPDATE
+    on the dailies cannot lock a day that does not exist yet, so without it
+    two writers of the same new day would both count it. A row without any
+    day recorded is rebuilt, in case the holo's history predates it.
+    """
+    stats = _lock_holo_stats(holo_id, db)
+    if stats.last_entry_date is None:
+        stats = rebuild_holo_stats(holo_id, db)
+    return stats
+
+
+def _extend_streak(stats: HoloStatsTable, new_dates: list[date]) -> bool:
+    """Append new days to the trailing streak; False if a rebuild is needed"""
+    last = stats.last_entry_date
+    start, length = stats.streak_start, stats.streak_length or 0
+    longest = stats.longest_streak or 0
+    for entry_date in sorted(new_dates):
+        if last is not None and entry_date <= last:
+            # Backfilled day inside the history may join two runs
+            return False
+        if last is not None and entry_date == last + timedelta(days=1):
+            length += 1
+        else:
+            start, length = entry_date, 1
+        longest = max(longest, length)
+        last = entry_date
+    stats.streak_start, stats.streak_length = start, length
+    stats.longest_streak = longest
+    return True
+
+
+def apply_score_changes(holo_id: str, changes: list[ScoreChange], db: Session):
+    """Fold daily writes into the holo's aggregate without committing.
+
+    Must be called after the daily rows are flushed and before the caller
+    commits, so the aggregate and the dailies land in the same transaction.
+    The aggregate row is read with a row lock and updated in place; a missing
+    row, a replaced min/max score or a backfilled day inside the history fall
+    back to recomputing from holo_dailies.
+    """
+    if not changes:
+        return
+
+    stats = (
+        db.query(HoloStatsTable)
+        .filter(HoloStatsTable.holo_id == holo_id)
+        .with_for_update()
+        .populate_existing()
+        .one_or_none()
+    )
+    if stats is None:
+        # First write for this holo (or history predating the aggregate table)
+        rebuild_holo_stats(holo_id, db)
+        return
+
+    # A replaced score that was the min/max may no longer exist in the history
+    replaced = {old for _, old, new in changes if old is not None and old != new}
+    if replaced & {stats.score_min, stats.score_max}:
+        rebuild_holo_stats(holo_id, db)
+        return
+
+    new_dates = [entry_date for entry_date, old, _ in changes if old is None]
+    if not _extend_streak(stats, new_dates):
+        rebuild_holo_stats(holo_id, db)
+        return
+
+    batch_min = min(new for _, _, new in changes)
+    batch_max = max(new for _, _, new in changes)
+    stats.score_sum += sum(new - (old or 0) for _, old, new in changes)
+    stats.score_count += len(new_dates)
+    stats.score_min = (
+        batch_min if stats.score_min is None else min(stats.score_min, batch_min)
+    )
+    stats.score_max = (
+        batch_max if stats.score_max is None else max(stats.score_max, batch_max)
+    )
+    if new_dates:
+        # _extend_streak guarantees new days all come after the previous last day
+        stats.last_entry_date = max(new_dates)
+    db.flush()
+
+
+def get_holo_streak(
+    holo_id: str, db: Session, today: Optional[date] = None
+) -> HoloStreak:
+    """Current and longest streak of consecutive daily submissions.
+
+    The current streak stays alive until the end of the day after the last
+    submission, so a user who has not submitted yet today keeps their streak.
+    """
+    stats = get_holo_stats(holo_id, db)
+    if stats is None:
+        # No aggregate row yet; computed but not stored, so reads never write
+        values = _compute_aggregates(db, [holo_id]).get(holo_id, _empty_aggregate())
+        stats = HoloStatsTable(holo_id=holo_id, **values)
+
+    today = today or date.today()
+    alive = (
+        stats.last_entry_date is not None
+        and stats.last_entry_date >= today - timedelta(days=1)
+    )
+    return HoloStreak(
+        current_streak=stats.streak_length if alive else 0,
+        longest_streak=stats.longest_streak,
+        current_streak_start=stats.streak_start if alive else None,
+        last_entry_date=stats.last_entry_date,
+    )
+
+
+def reconcile_holo_stats(
+    db: Session, holo_ids: Optional[Iterable[str]] = None
+) -> list[str]:
+    """Verify aggregates against holo_dailies and repair any drift.
+
+    Returns the holo_ids whose aggregate row was missing or wrong.
+    """
+    holo_ids = list(holo_ids) if holo_ids is not None else None
+    expected = _compute_aggregates(db, holo_ids)
+    stored_query = db.query(HoloStatsTable)
+    if holo_ids is not None:
+        stored_query = stored_query.filter(HoloStatsTable.holo_id.in_(holo_ids))
+    stored = {row.holo_id: row for row in stored_query}
+
+    corrected = []
+    for holo_id in sorted(set(expected) | set(stored)):
+        values = expected.get(holo_id, _empty_aggregate())
+        row = stored.get(holo_id)
+        if row is not None and all(
+            getattr(row, column) == value for column, value in values.items()
+        ):
+            continue
+        if row is None:
+            row = HoloStatsTable(holo_id=holo_id)
+            db.add(row)
+        for column, value in values.items():
+            setattr(row, column, value)
+        corrected.append(holo_id)
+
+    db.commit()
+    return corrected
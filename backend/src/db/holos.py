@@ -1,26 +1,208 @@
-from datetime import date
+import json
+from datetime import date, datetime
+from typing import Optional
+from uuid import uuid4
 
-from sqlalchemy import func
+from sqlalchemy import func, text, update
 from sqlalchemy.orm import Session
+from src.core.cache import (
+    derived_cache,
+    holo_config_cache,
+    holo_config_tag,
+    holo_tag,
+)
+from src.core.config import settings
+from src.core.response_cache import invalidate_response_tag
+from src.db.holo_stats import (
+    _dialect_insert,
+    apply_score_changes,
+    get_holo_stats,
+    lock_holo_stats,
+    rebuild_holo_stats,
+)
 from src.models.holos import (
+    HoloConfigSnapshot,
     HoloCreate,
     HoloDailiesTable,
     HoloDaily,
+    HoloDailyBatchItemResult,
+    HoloDailyBatchResult,
     HoloDailyCreate,
+    HoloDailyUpdate,
+    HoloQuestionsRename,
+    HoloRescoreResult,
     HoloTable,
     HoloUpdate,
 )
+from src.services.answer_bits import extend_question_index, pack_answers, unpack_answers
+from src.services.scoring import (
+    compute_scores,
+    score_answers,
+    validate_weights,
+    yes_matrix,
+)
+
+
+def _invalidate_derived(holo_id: str):
+    """Drop cached stats derived from a holo's dailies; call after committing"""
+    derived_cache.invalidate_tag(holo_tag(holo_id))
+    invalidate_response_tag(holo_tag(holo_id))
+
+
+def _invalidate_holo_config(user_id: str):
+    """Drop this worker's cached config for a user; call after committing"""
+    holo_config_cache.invalidate(user_id)
+    invalidate_response_tag(holo_config_tag(user_id))
+
+
+def _publish_invalidation(payload: str, db: Session):
+    """Tell other workers to drop cached data; call before committing.
+
+    NOTIFY is transactional, so listeners only hear about committed writes.
+    """
+    channel = settings.HOLO_CONFIG_INVALIDATION_CHANNEL
+    if channel and db.get_bind().dialect.name == "postgresql":
+        db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": channel, "payload": payload},
+        )
+
+
+def _publish_holo_config_change(user_id: str, db: Session):
+    """Other workers drop their cached config for the user"""
+    _publish_invalidation(user_id, db)
+
+
+def _publish_holo_change(holo_id: str, db: Session):
+    """Other workers drop stats derived from the holo's dailies"""
+    _publish_invalidation(holo_tag(holo_id), db)
+
+
+def apply_invalidation(payload: str):
+    """Drop what another worker's committed write made stale (NOTIFY callback).
+
+    Payloads are holo tags for daily writes and bare user_ids for config writes.
+    """
+    prefix = holo_tag("")
+    if payload.startswith(prefix):
+        _invalidate_derived(payload[len(prefix) :])
+    else:
+        _invalidate_holo_config(payload)
+
+
+def _answer_columns(holo_id: str, answers: dict, db: Session) -> dict:
+    """Column values for storing answers under the configured storage mode"""
+    columns = {
+        "answers": answers,
+        "answer_bits": None,
+        "answer_mask": None,
+        "answers_version": None,
+    }
+    if settings.HOLO_ANSWER_STORAGE not in ("both", "bits"):
+        return columns
+    # Primary-key read; shared with _daily_score through the identity map
+    holo = db.get(HoloTable, holo_id)
+    if holo is None:
+        return columns
+    if holo.question_index is None:
+        # Holo created before answers could be packed; index it on first write
+        holo.question_index = extend_question_index(holo.questions, None)[0]
+    packed = pack_answers(answers, holo.question_index)
+    if packed is None:
+        return columns
+    columns["answer_bits"], columns["answer_mask"] = packed
+    columns["answers_version"] = holo.questions_version
+    if settings.HOLO_ANSWER_STORAGE == "bits":
+        columns["answers"] = {}
+    return columns
+
+
+def _daily_score(holo_id: str, score: int, answers: dict, db: Session) -> int:
+    """Score computed from the holo's question weights, or the client's score"""
+    holo = db.get(HoloTable, holo_id)
+    if holo is None or not holo.question_weights:
+        return score
+    return score_answers(answers, holo.question_weights)
+
+
+def _checked_weights(
+    weights: Optional[dict[str, float]], questions: list[str]
+) -> Optional[dict[str, float]]:
+    if not weights:
+        return None
+    validate_weights(weights, questions)
+    return weights
+
+
+def _to_holo_daily(row: HoloDailiesTable, db: Session) -> HoloDaily:
+    """Build the API model, expanding packed answers back into a dict"""
+    result = HoloDaily.from_orm(row)
+    if not result.answers and row.answer_mask is not None:
+        holo = db.get(HoloTable, row.holo_id)
+        result.answers = unpack_answers(
+            row.answer_bits, row.answer_mask, holo.question_index or {}
+        )
+    return result
 
 
 # Holo config
 def get_holo_config(user_id: str, db: Session):
     """Get the holo questions config for a user"""
-    result = db.query(HoloTable).filter(HoloTable.user_id == user_id).first()
-    if result and result.questions:
-        # Handle the case where questions are stored as {"questions": [...]}
-        if isinstance(result.questions, dict) and "questions" in result.questions:
-            result.questions = result.questions["questions"]
-    return result
+    return db.query(HoloTable).filter(HoloTable.user_id == user_id).first()
+
+
+def get_holo_config_snapshot(user_id: str, db: Session) -> Optional[HoloConfigSnapshot]:
+    """Get the user's holo config from the per-worker cache, loading it on a miss.
+
+    Config writes in this module invalidate the entry; other workers drop it
+    via the optional NOTIFY channel or when the TTL expires. Missing configs
+    are not cached.
+    """
+    snapshot = holo_config_cache.get(user_id)
+    if snapshot is not None:
+        return snapshot
+    generation = holo_config_cache.generation(user_id)
+    holo = get_holo_config(user_id, db)
+    if holo is None:
+        return None
+    snapshot = HoloConfigSnapshot.model_validate(holo)
+    # Not cached if a config write was invalidated while we read it
+    holo_config_cache.set_if_unchanged(user_id, snapshot, generation)
+    return snapshot
+
+
+def normalize_holo_questions(db: Session) -> int:
+    """One-time migration of legacy {"questions": [...]} configs to a plain list.
+
+    Returns the number of holo configs rewritten.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        result = db.execute(
+            text("""
+            UPDATE holo
+            SET questions = questions -> 'questions', updated_at = :now
+            WHERE jsonb_typeof(questions) = 'object'
+                AND jsonb_exists(questions, 'questions')
+            RETURNING user_id
+            """),
+            {"now": datetime.utcnow()},
+        )
+        user_ids = result.scalars().all()
+    else:
+        legacy = [
+            holo
+            for holo in db.query(HoloTable)
+            if isinstance(holo.questions, dict) and "questions" in holo.questions
+        ]
+        for holo in legacy:
+            holo.questions = holo.questions["questions"]
+        user_ids = [holo.user_id for holo in legacy]
+    for user_id in user_ids:
+        _publish_holo_config_change(user_id, db)
+    db.commit()
+    for user_id in user_ids:
+        _invalidate_holo_config(user_id)
+    return len(user_ids)
 
 
 def update_holo_config(user_id: str, holo: HoloUpdate, db: Session):
@@ -28,8 +210,26 @@ def update_holo_config(user_id: str, holo: HoloUpdate, db: Session):
     db_holo = db.query(HoloTable).filter(HoloTable.user_id == user_id).first()
     if not db_holo:
         return None
+    if "question_weights" in holo.model_fields_set:
+        db_holo.question_weights = _checked_weights(
+            holo.question_weights, holo.questions
+        )
+    elif db_holo.question_weights:
+        # Removed questions stop counting towards the score
+        db_holo.question_weights = {
+            question: weight
+            for question, weight in db_holo.question_weights.items()
+            if question in holo.questions
+        } or None
     db_holo.questions = holo.questions
+    db_holo.question_index, changed = extend_question_index(
+        holo.questions, db_holo.question_index
+    )
+    if changed:
+        db_holo.questions_version = (db_holo.questions_version or 1) + 1
+    _publish_holo_config_change(user_id, db)
     db.commit()
+    _invalidate_holo_config(user_id)
     db.refresh(db_holo)
     return db_holo
 
@@ -38,9 +238,13 @@ def create_holo_config(user_id: str, holo: HoloCreate, db: Session):
     db_holo = HoloTable(
         user_id=user_id,
         questions=holo.questions,
+        question_index=extend_question_index(holo.questions, None)[0],
+        question_weights=_checked_weights(holo.question_weights, holo.questions),
     )
     db.add(db_holo)
+    _publish_holo_config_change(user_id, db)
     db.commit()
+    _invalidate_holo_config(user_id)
     db.refresh(db_holo)
     return db_holo
 
@@ -50,13 +254,148 @@ def create_holo_config_in_transaction(user_id: str, holo: HoloCreate, db: Sessio
     db_holo = HoloTable(
         user_id=user_id,
         questions=holo.questions,
+        question_index=extend_question_index(holo.questions, None)[0],
+        question_weights=_checked_weights(holo.question_weights, holo.questions),
     )
     db.add(db_holo)
     db.flush()
+    _publish_holo_config_change(user_id, db)
+    # Dropped before the caller commits; misses are never cached, so a reader
+    # cannot re-cache anything older than this row
+    _invalidate_holo_config(user_id)
     db.refresh(db_holo)
     return db_holo
 
 
+# Rows rewritten per round trip when renaming answer keys outside PostgreSQL
+ANSWER_REWRITE_CHUNK = 500
+
+_PG_RENAME_ANSWER_KEYS_SQL = text("""
+    UPDATE holo_dailies AS d
+    SET answers = (
+            SELECT jsonb_object_agg(COALESCE(m.value, a.key), a.value)
+            FROM jsonb_each(CAST(d.answers AS jsonb)) AS a
+            LEFT JOIN jsonb_each_text(CAST(:mapping AS jsonb)) AS m ON m.key = a.key
+        ),
+        updated_at = :now
+    WHERE d.holo_id = :holo_id
+        AND jsonb_exists_any(CAST(d.answers AS jsonb), :old_keys)
+    """)
+
+
+def _renamed_questions(questions: list[str], rename: HoloQuestionsRename):
+    """Apply renames and the optional reorder, validating the result"""
+    unknown = [old for old in rename.renames if old not in questions]
+    if unknown:
+        raise ValueError(f"Unknown questions: {unknown}")
+    if any(not new.strip() for new in rename.renames.values()):
+        raise ValueError("Question text must not be empty")
+
+    renamed = [rename.renames.get(question, question) for question in questions]
+    if len(set(renamed)) != len(renamed):
+        raise ValueError("Renamed questions must be unique")
+    if rename.order is None:
+        return renamed
+    if sorted(rename.order) != sorted(renamed):
+        raise ValueError("order must list exactly the (renamed) questions")
+    return list(rename.order)
+
+
+def _rename_answer_keys(
+    holo_id: str, renames: dict[str, str], now: datetime, db: Session
+) -> int:
+    """Rename keys in every stored answers object of a holo; returns rows touched"""
+    if db.get_bind().dialect.name == "postgresql":
+        result = db.execute(
+            _PG_RENAME_ANSWER_KEYS_SQL,
+            {
+                "holo_id": holo_id,
+                "mapping": json.dumps(renames),
+                "old_keys": list(renames),
+                "now": now,
+            },
+        )
+        return result.rowcount
+
+    touched = 0
+    last_id = ""
+    while True:
+        chunk = (
+            db.query(HoloDailiesTable.holo_daily_id, HoloDailiesTable.answers)
+            .filter(
+                HoloDailiesTable.holo_id == holo_id,
+                HoloDailiesTable.holo_daily_id > last_id,
+            )
+            .order_by(HoloDailiesTable.holo_daily_id)
+            .limit(ANSWER_REWRITE_CHUNK)
+            .all()
+        )
+        if not chunk:
+            return touched
+        last_id = chunk[-1].holo_daily_id
+        changed = [
+            {
+                "holo_daily_id": holo_daily_id,
+                "answers": {renames.get(k, k): v for k, v in answers.items()},
+                "updated_at": now,
+            }
+            for holo_daily_id, answers in chunk
+            if answers and not renames.keys().isdisjoint(answers)
+        ]
+        if changed:
+            # ORM bulk UPDATE by primary key: one executemany per chunk
+            db.execute(update(HoloDailiesTable), changed)
+            touched += len(changed)
+
+
+def rename_holo_questions(user_id: str, rename: HoloQuestionsRename, db: Session):
+    """Rename and/or reorder holo questions and rewrite the answer history.
+
+    The config, the question bit index and every affected answers row are
+    updated in one transaction. Packed answers keep their bits, so only JSON
+    answers are rewritten. Returns (holo, rows_touched), or None without a holo.
+    """
+    db_holo = get_holo_config(user_id, db)
+    if not db_holo:
+        return None
+
+    renames = {old: new for old, new in rename.renames.items() if old != new}
+    questions = _renamed_questions(list(db_holo.questions), rename)
+    # Removed questions keep their text in the index and in old answers
+    retired = set(db_holo.question_index or {}) - set(db_holo.questions)
+    if retired & set(renames.values()):
+        raise ValueError(
+            f"Cannot reuse the text of removed questions: {sorted(retired & set(renames.values()))}"
+        )
+    now = datetime.utcnow()
+    try:
+        rows_touched = (
+            _rename_answer_keys(db_holo.holo_id, renames, now, db) if renames else 0
+        )
+        if renames and db_holo.question_index is not None:
+            db_holo.question_index = {
+                renames.get(question, question): bit
+                for question, bit in db_holo.question_index.items()
+            }
+            db_holo.questions_version = (db_holo.questions_version or 1) + 1
+        if renames and db_holo.question_weights:
+            db_holo.question_weights = {
+                renames.get(question, question): weight
+                for question, weight in db_holo.question_weights.items()
+            }
+        db_holo.questions = questions
+        _publish_holo_config_change(user_id, db)
+        _publish_holo_change(db_holo.holo_id, db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    _invalidate_holo_config(user_id)
+    _invalidate_derived(db_holo.holo_id)
+    db.refresh(db_holo)
+    return db_holo, rows_touched
+
+
 # Holo daily
 def get_holo_daily_by_date(holo_id: str, entry_date: date, db: Session):
     """Get the holo daily for a user"""
@@ -69,7 +408,7 @@ def get_holo_daily_by_date(holo_id: str, entry_date: date, db: Session):
         .first()
     )
     if result:
-        return HoloDaily.from_orm(result)
+        return _to_holo_daily(result, db)
     return None
 
 
@@ -82,7 +421,7 @@ def get_latest_holo_daily(holo_id: str, db: Session):
         .first()
     )
     if result:
-        return HoloDaily.from_orm(result)
+        return _to_holo_daily(result, db)
     return None
 
 
@@ -91,28 +430,268 @@ def create_holo_daily(holo_id: str, holo_daily: HoloDailyCreate, db: Session):
     try:
         # Convert string date to date object
         entry_date = date.fromisoformat(holo_daily.entry_date)
+    except ValueError:
+        raise ValueError(
+            f"Invalid date format: {holo_daily.entry_date}. Expected YYYY-MM-DD format."
+        )
 
+    try:
+        score = _daily_score(holo_id, holo_daily.score, holo_daily.answers, db)
         db_holo_daily = HoloDailiesTable(
             holo_id=holo_id,
             entry_date=entry_date,
-            score=holo_daily.score,
-            answers=holo_daily.answers,
+            score=score,
+            **_answer_columns(holo_id, holo_daily.answers, db),
         )
         db.add(db_holo_daily)
+        db.flush()
+        apply_score_changes(holo_id, [(entry_date, None, score)], db)
+        _publish_holo_change(holo_id, db)
         db.commit()
-        db.refresh(db_holo_daily)
-        return HoloDaily.from_orm(db_holo_daily)
-    except ValueError as e:
-        raise ValueError(
-            f"Invalid date format: {holo_daily.entry_date}. Expected YYYY-MM-DD format."
+    except Exception:
+        # Scoring errors keep their own message (the route returns them as 422)
+        db.rollback()
+        raise
+    _invalidate_derived(holo_id)
+    db.refresh(db_holo_daily)
+    return _to_holo_daily(db_holo_daily, db)
+
+
+def _holo_daily_upsert(db: Session, rows: list[dict]):
+    """Build an INSERT ... ON CONFLICT (holo_id, entry_date) DO UPDATE for daily rows"""
+    insert = _dialect_insert(db)
+    stmt = insert(HoloDailiesTable).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[HoloDailiesTable.holo_id, HoloDailiesTable.entry_date],
+        set_={
+            "score": stmt.excluded.score,
+            "answers": stmt.excluded.answers,
+            "answer_bits": stmt.excluded.answer_bits,
+            "answer_mask": stmt.excluded.answer_mask,
+            "answers_version": stmt.excluded.answers_version,
+            "updated_at": stmt.excluded.updated_at,
+            "deleted_at": None,
+        },
+    )
+
+
+def _existing_scores(holo_id: str, entry_dates: list[date], db: Session):
+    """Current scores for the given days, locked for the rest of the transaction"""
+    rows = (
+        db.query(HoloDailiesTable.entry_date, HoloDailiesTable.score)
+        .filter(
+            HoloDailiesTable.holo_id == holo_id,
+            HoloDailiesTable.entry_date.in_(entry_dates),
+        )
+        .with_for_update()
+    )
+    return {entry_date: score for entry_date, score in rows}
+
+
+def _holo_daily_row(
+    holo_id: str, entry_date: date, score: int, answers: dict, now, db: Session
+):
+    return {
+        "holo_daily_id": str(uuid4()),
+        "holo_id": holo_id,
+        "entry_date": entry_date,
+        "score": _daily_score(holo_id, score, answers, db),
+        **_answer_columns(holo_id, answers, db),
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def upsert_holo_daily(
+    holo_id: str, entry_date: date, holo_daily: HoloDailyUpdate, db: Session
+):
+    """Create or replace the holo daily for a given date.
+
+    The row is written with a single INSERT ... ON CONFLICT (holo_id, entry_date)
+    DO UPDATE ... RETURNING statement, so re-submitting a day never hits the
+    unique constraint.
+    """
+    row = _holo_daily_row(
+        holo_id,
+        entry_date,
+        holo_daily.score,
+        holo_daily.answers,
+        datetime.utcnow(),
+        db,
+    )
+    stmt = (
+        _holo_daily_upsert(db, [row])
+        .returning(HoloDailiesTable)
+        .execution_options(populate_existing=True)
+    )
+    try:
+        lock_holo_stats(holo_id, db)
+        previous = _existing_scores(holo_id, [entry_date], db).get(entry_date)
+        # Build the response before committing so the expired row is not reloaded
+        result = _to_holo_daily(db.scalars(stmt).one(), db)
+        apply_score_changes(holo_id, [(entry_date, previous, row["score"])], db)
+        _publish_holo_change(holo_id, db)
+        db.commit()
+        _invalidate_derived(holo_id)
+        return result
+    except Exception:
+        db.rollback()
+        raise
+
+
+def upsert_holo_dailies(
+    holo_id: str, holo_dailies: list[HoloDailyCreate], db: Session
+) -> HoloDailyBatchResult:
+    """Create or replace many holo dailies with one multi-row upsert.
+
+    Dates are validated up front; invalid items are reported and skipped. When a
+    date appears more than once the last item wins. Every valid row is written
+    in a single statement and transaction, and each day gets its own status.
+    """
+    now = datetime.utcnow()
+    results: list[HoloDailyBatchItemResult] = []
+    rows_by_date: dict[date, dict] = {}
+    result_by_date: dict[date, HoloDailyBatchItemResult] = {}
+
+    for holo_daily in holo_dailies:
+        try:
+            entry_date = date.fromisoformat(holo_daily.entry_date)
+        except ValueError:
+            results.append(
+                HoloDailyBatchItemResult(
+                    entry_date=holo_daily.entry_date,
+                    status="invalid",
+                    detail="Invalid date format. Expected YYYY-MM-DD format.",
+                )
+            )
+            continue
+
+        item = HoloDailyBatchItemResult(
+            entry_date=entry_date.isoformat(), status="created"
         )
-    except Exception as e:
-        # Preserve original exception type and traceback
+        previous = result_by_date.get(entry_date)
+        if previous is not None:
+            previous.status = "skipped"
+            previous.detail = "Superseded by a later item for the same date"
+        rows_by_date[entry_date] = _holo_daily_row(
+            holo_id, entry_date, holo_daily.score, holo_daily.answers, now, db
+        )
+        result_by_date[entry_date] = item
+        results.append(item)
+
+    if rows_by_date:
+        rows = list(rows_by_date.values())
+        stmt = _holo_daily_upsert(db, rows).returning(
+            HoloDailiesTable.holo_daily_id, HoloDailiesTable.entry_date
+        )
+        try:
+            lock_holo_stats(holo_id, db)
+            previous = _existing_scores(holo_id, list(rows_by_date), db)
+            for holo_daily_id, entry_date in db.execute(stmt):
+                item = result_by_date[entry_date]
+                item.holo_daily_id = holo_daily_id
+                # A conflicting row keeps its id, so a foreign id means an update
+                if holo_daily_id != rows_by_date[entry_date]["holo_daily_id"]:
+                    item.status = "updated"
+            apply_score_changes(
+                holo_id,
+                [
+                    (entry_date, previous.get(entry_date), row["score"])
+                    for entry_date, row in rows_by_date.items()
+                ],
+                db,
+            )
+            _publish_holo_change(holo_id, db)
+            db.commit()
+            _invalidate_derived(holo_id)
+        except Exception:
+            db.rollback()
+            raise
+
+    return HoloDailyBatchResult(
+        created=sum(r.status == "created" for r in results),
+        updated=sum(r.status == "updated" for r in results),
+        failed=sum(r.status == "invalid" for r in results),
+        results=results,
+    )
+
+
+def rescore_holo_dailies(user_id: str, db: Session) -> Optional[HoloRescoreResult]:
+    """Recompute every daily score of a user's holo from its question weights.
+
+    The history is loaded once as a days x questions matrix, scored in one
+    vectorized pass and the changed scores are written back with a single
+    bulk UPDATE, in the same transaction as the rebuilt score aggregate.
+    Returns None without a holo; raises ValueError if no weights are set.
+    """
+    db_holo = get_holo_config(user_id, db)
+    if not db_holo:
+        return None
+    if not db_holo.question_weights:
+        raise ValueError("Holo has no question weights to score with")
+
+    rows = (
+        db.query(
+            HoloDailiesTable.holo_daily_id,
+            HoloDailiesTable.score,
+            HoloDailiesTable.answers,
+            HoloDailiesTable.answer_bits,
+            HoloDailiesTable.answer_mask,
+        )
+        .filter(HoloDailiesTable.holo_id == db_holo.holo_id)
+        .all()
+    )
+    if not rows:
+        return HoloRescoreResult(dailies=0, rescored=0)
+
+    import numpy as np
+
+    questions = list(db_holo.question_weights)
+    weights = np.array(
+        [db_holo.question_weights[q] for q in questions], dtype=np.float64
+    )
+    yes = yes_matrix(
+        [(row.answers, row.answer_bits, row.answer_mask) for row in rows],
+        questions,
+        db_holo.question_index,
+    )
+    scores = compute_scores(yes, weights)
+    changed = np.flatnonzero(scores != np.array([row.score for row in rows]))
+
+    now = datetime.utcnow()
+    try:
+        if len(changed):
+            # ORM bulk UPDATE by primary key: one executemany for the history
+            db.execute(
+                update(HoloDailiesTable),
+                [
+                    {
+                        "holo_daily_id": rows[i].holo_daily_id,
+                        "score": int(scores[i]),
+                        "updated_at": now,
+                    }
+                    for i in changed
+                ],
+            )
+            rebuild_holo_stats(db_holo.holo_id, db)
+            _publish_holo_change(db_holo.holo_id, db)
+        db.commit()
+    except Exception:
+        db.rollback()
         raise
+    _invalidate_derived(db_holo.holo_id)
+    return HoloRescoreResult(dailies=len(rows), rescored=len(changed))
 
 
 def get_avg_score(holo_id: str, db: Session):
     """Get the average score from all holo dailies for a user"""
+    stats = get_holo_stats(holo_id, db)
+    if stats is not None:
+        if not stats.score_count:
+            return None
+        return round(stats.score_sum / stats.score_count, 2)
+
+    # No aggregate yet (no writes since it was introduced); fall back to a scan
     result = (
         db.query(func.avg(HoloDailiesTable.score))
         .filter(HoloDailiesTable.holo_id == holo_id)
@@ -0,0 +1,61 @@
+"""Idempotent schema changes for databases created before the current models.
+
+``Base.metadata.create_all`` (run at startup) creates missing tables but never
+adds columns to existing ones, and startup carries on if it fails. Run
+``migrate_schema`` before deploying a release that adds tables or columns
+(see src/scripts/migrate_schema.py); it is safe to run any number of times.
+It also rewrites data the read path no longer accepts, such as legacy
+``{"questions": [...]}`` holo configs.
+"""
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from src.db.holos import normalize_holo_questions
+from src.db.session import Base
+from src.models import entries, holos, users  # noqa: F401 (registers the tables)
+
+# Columns added to tables that already existed in production, in order:
+# (table, column, type and constraints as in db/init.sql)
+ADDED_COLUMNS: list[tuple[str, str, str]] = [
+    # Packed yes/no answers (src/services/answer_bits.py)
+    ("holo", "question_index", "JSONB NULL"),
+    ("holo", "questions_version", "INTEGER NOT NULL DEFAULT 1"),
+    ("holo_dailies", "answer_bits", "BIGINT NULL"),
+    ("holo_dailies", "answer_mask", "BIGINT NULL"),
+    ("holo_dailies", "answers_version", "INTEGER NULL"),
+    # Server-side scoring (src/services/scoring.py)
+    ("holo", "question_weights", "JSONB NULL"),
+]
+
+
+def migrate_schema(engine: Engine) -> list[str]:
+    """Create missing tables, add missing columns and normalize legacy rows.
+
+    Returns what was changed; empty when the database was already up to date.
+    """
+    added = []
+    with engine.begin() as conn:
+        existing = set(inspect(conn).get_table_names())
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing:
+                table.create(conn)
+                added.append(table.name)
+
+        inspector = inspect(conn)
+        if_not_exists = "IF NOT EXISTS " if conn.dialect.name == "postgresql" else ""
+        for table, column, ddl in ADDED_COLUMNS:
+            if table not in existing:
+                continue  # just created with every column
+            if column in {c["name"] for c in inspector.get_columns(table)}:
+                continue
+            conn.execute(
+                text(f"ALTER TABLE {table} ADD COLUMN {if_not_exists}{column} {ddl}")
+            )
+            added.append(f"{table}.{column}")
+
+    with Session(engine) as db:
+        normalized = normalize_holo_questions(db)
+    if normalized:
+        added.append(f"holo.questions ({normalized} legacy config(s) normalized)")
+    return added
@@ -0,0 +1,61 @@
+import logging
+import select
+import threading
+from typing import Callable
+
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+
+class PgNotifyListener(threading.Thread):
+    """Background thread that LISTENs on a PostgreSQL channel.
+
+    Every notification payload is passed to ``callback``. The listener opens
+    its own DBAPI connection from the engine's URL rather than checking one
+    out of the pool, so the pool (and the DB executor sized to it) keeps all
+    its connections for requests. It reconnects after connection errors.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        channel: str,
+        callback: Callable[[str], object],
+        poll_interval: float = 5.0,
+    ):
+        super().__init__(name=f"pg-listen-{channel}", daemon=True)
+        self.engine = engine
+        self.channel = channel
+        self.callback = callback
+        self.poll_interval = poll_interval
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                self._listen()
+            except Exception as e:
+                logger.warning("LISTEN %s failed, retrying: %s", self.channel, e)
+                self._stop_event.wait(self.poll_interval)
+
+    def _listen(self):
+        dialect = self.engine.dialect
+        cargs, cparams = dialect.create_connect_args(self.engine.url)
+        conn = dialect.connect(*cargs, **cparams)
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.channel}"')
+            while not self._stop_event.is_set():
+                if select.select([conn], [], [], self.poll_interval) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    self.callback(notify.payload)
+        finally:
+            conn.close()
@@ -1,20 +1,81 @@
+from functools import lru_cache
 from typing import Generator
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
 from src.core.config import settings
 
 # Use environment-based database URL
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# SQLite uses its own pool classes, which take no sizing arguments
+pool_options = (
+    {}
+    if SQLALCHEMY_DATABASE_URL.startswith("sqlite")
+    else {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+    }
+)
+
+
+@lru_cache(maxsize=None)
+def get_engine() -> Engine:
+    """The app's engine, created on first use.
+
+    Creating it imports the DB driver, which importing models, scripts and
+    tests does not need.
+    """
+    return create_engine(SQLALCHEMY_DATABASE_URL, **pool_options)
+
+
+def dispose_engine(close: bool = True):
+    """Drop the engine's pool, if the engine has been created at all"""
+    if get_engine.cache_info().currsize:
+        get_engine().dispose(close=close)
+
+
+def __getattr__(name: str):
+    # Keeps `from src.db.session import engine` working without creating the
+    # engine at import
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+_session_factory = sessionmaker(autocommit=False, autoflush=False)
+
 
 # Each request gets its own SessionLocal instance
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def SessionLocal() -> Session:
+    return _session_factory(bind=get_engine())
+
 
 Base = declarative_base()
 
 
+def prewarm_pool(connections: int) -> int:
+    """Open ``connections`` pooled connections up front; returns how many opened.
+
+    They are checked out together (so each is a distinct connection) and then
+    returned, leaving them idle in the pool for the first requests. More than
+    the pool size is pointless: overflow connections are closed on return.
+    """
+    engine = get_engine()
+    size = getattr(engine.pool, "size", lambda: connections)()
+    opened = []
+    try:
+        for _ in range(min(connections, size)):
+            conn = engine.connect()
+            opened.append(conn)
+            conn.execute(text("SELECT 1"))
+    finally:
+        for conn in opened:
+            conn.close()
+    return len(opened)
+
+
 # Dependency for FastAPI routes
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
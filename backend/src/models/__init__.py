@@ -1,4 +1,4 @@
 # Import all models to ensure they are registered with SQLAlchemy
 from .entries import EntryTable
-from .holos import HoloDailiesTable, HoloTable
+from .holos import HoloDailiesTable, HoloStatsTable, HoloTable
 from .users import UserTable
@@ -0,0 +1,14 @@
+from typing import Optional
+
+from pydantic import BaseModel
+from src.models.entries import Entry
+from src.models.holos import Holo, HoloDaily
+
+
+class Dashboard(BaseModel):
+    """Everything the home screen needs, in one payload"""
+
+    holo: Optional[Holo] = None  # None until the user has a holo config
+    latest_daily: Optional[HoloDaily] = None
+    avg_score: Optional[float] = None
+    entries: list[Entry]
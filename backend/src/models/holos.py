@@ -1,10 +1,11 @@
 from datetime import date, datetime
-from typing import Optional
+from typing import Literal, Optional
 from uuid import uuid4
 
-from pydantic import BaseModel, ConfigDict, field_serializer
+from pydantic import BaseModel, ConfigDict, Field, field_serializer
 from sqlalchemy import (
     JSON,
+    BigInteger,
     Column,
     Date,
     DateTime,
@@ -30,6 +31,11 @@ class HoloTable(Base):
         index=True,
     )  # FK to users.user_id in DB
     questions = Column(JSON, nullable=False)
+    # Append-only {question: bit} mapping used to pack yes/no answers
+    question_index = Column(JSON, nullable=True)
+    # {question: weight}; when set, daily scores are computed server-side
+    question_weights = Column(JSON, nullable=True)
+    questions_version = Column(Integer, nullable=False, default=1)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     deleted_at = Column(DateTime, nullable=True)
@@ -53,24 +59,80 @@ class HoloDailiesTable(Base):
     entry_date = Column(Date, nullable=False)  # just date, not timestamp
     score = Column(Integer, nullable=False)
     answers = Column(JSON, nullable=False)
+    # Optional packed answers (see src/services/answer_bits.py)
+    answer_bits = Column(BigInteger, nullable=True)
+    answer_mask = Column(BigInteger, nullable=True)
+    answers_version = Column(Integer, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     deleted_at = Column(DateTime, nullable=True)
 
 
+class HoloStatsTable(Base):
+    """Running score aggregate per holo, maintained alongside holo_dailies writes"""
+
+    __tablename__ = "holo_stats"
+
+    holo_id = Column(
+        String,
+        ForeignKey("holo.holo_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    score_sum = Column(Integer, nullable=False, default=0)
+    score_count = Column(Integer, nullable=False, default=0)
+    score_min = Column(Integer, nullable=True)
+    score_max = Column(Integer, nullable=True)
+    last_entry_date = Column(Date, nullable=True)
+    # Trailing run of consecutive days ending at last_entry_date
+    streak_start = Column(Date, nullable=True)
+    streak_length = Column(Integer, nullable=False, default=0)
+    longest_streak = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 class Holo(BaseModel):
     holo_id: str
     user_id: str
     questions: list[str]
+    question_weights: Optional[dict[str, float]] = None
+
+
+class HoloConfigSnapshot(BaseModel):
+    """Read-only view of a holo config, shared across requests via the cache"""
+
+    model_config = ConfigDict(frozen=True, from_attributes=True)
+
+    holo_id: str
+    user_id: str
+    questions: tuple[str, ...]
+    question_weights: Optional[dict[str, float]] = None
 
 
 class HoloCreate(BaseModel):
     user_id: str
     questions: list[str]
+    question_weights: Optional[dict[str, float]] = None
 
 
 class HoloUpdate(BaseModel):
     questions: list[str]
+    # Omit to keep the current weights; send null to go back to client scores
+    question_weights: Optional[dict[str, float]] = None
+
+
+class HoloQuestionsRename(BaseModel):
+    renames: dict[str, str] = {}  # {old question text: new question text}
+    order: Optional[list[str]] = None  # final question order, after renames
+
+
+class HoloQuestionsRenameResult(BaseModel):
+    holo: Holo
+    rows_touched: int
+
+
+class HoloRescoreResult(BaseModel):
+    dailies: int  # dailies scored
+    rescored: int  # dailies whose score changed
 
 
 class HoloDaily(BaseModel):
@@ -89,5 +151,87 @@ class HoloDaily(BaseModel):
 
 class HoloDailyCreate(BaseModel):
     entry_date: str  # Accept ISO date string from frontend
-    score: int
+    score: int  # ignored when the holo has question weights
+    answers: dict[str, str | int | bool]
+
+
+class HoloDailyUpdate(BaseModel):
+    """Body for PUT /holos/daily/{entry_date}; the date comes from the path"""
+
+    score: int  # ignored when the holo has question weights
     answers: dict[str, str | int | bool]
+
+
+# Upper bound keeps a single multi-row upsert well below driver parameter limits
+MAX_HOLO_DAILY_BATCH = 1000
+
+
+class HoloDailyBatchCreate(BaseModel):
+    dailies: list[HoloDailyCreate] = Field(
+        ..., min_length=1, max_length=MAX_HOLO_DAILY_BATCH
+    )
+
+
+class HoloDailyBatchItemResult(BaseModel):
+    entry_date: str
+    status: Literal["created", "updated", "invalid", "skipped"]
+    holo_daily_id: Optional[str] = None
+    detail: Optional[str] = None
+
+
+class HoloDailyBatchResult(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    results: list[HoloDailyBatchItemResult]
+
+
+class HoloScorePoint(BaseModel):
+    entry_date: date
+    score: int
+    ma_7: float
+    ma_30: float
+    ma_90: float
+
+
+class HoloScorePeriodMean(BaseModel):
+    period_start: date
+    avg_score: float
+    count: int
+
+
+class HoloWeekdayMean(BaseModel):
+    weekday: int  # 0 = Monday ... 6 = Sunday
+    avg_score: float
+    count: int
+
+
+class HoloScoreTimeseries(BaseModel):
+    daily: list[HoloScorePoint]
+    weekly: list[HoloScorePeriodMean]
+    monthly: list[HoloScorePeriodMean]
+    weekdays: list[HoloWeekdayMean]
+
+
+class HoloStreak(BaseModel):
+    current_streak: int
+    longest_streak: int
+    current_streak_start: Optional[date] = None
+    last_entry_date: Optional[date] = None
+
+
+class HoloQuestionAnalytics(BaseModel):
+    question: str
+    answered: int
+    yes_count: int
+    completion_rate: Optional[float] = None
+    current_streak: int
+    longest_streak: int
+    score_correlation: Optional[float] = None
+
+
+class HoloAnswerAnalytics(BaseModel):
+    start: Optional[date] = None
+    end: date
+    dailies: int
+    questions: list[HoloQuestionAnalytics]
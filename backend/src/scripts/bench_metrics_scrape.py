@@ -0,0 +1,104 @@
+"""Benchmark the cost of a multiprocess /metrics scrape as workers recycle.
+
+Each generation runs ``--workers`` short-lived processes that record request
+metrics for ``--routes`` routes into a multiprocess directory, then exit. The
+merged scrape is timed with the dead workers' files left in place and with
+them archived the way the gunicorn master does (see core/multiprocess.py):
+
+    python -m src.scripts.bench_metrics_scrape
+    python -m src.scripts.bench_metrics_scrape --workers 8 --generations 20
+
+Run from the backend directory.
+"""
+
+import argparse
+import glob
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Optional
+
+from src.core.multiprocess import ENV, mark_process_dead, scrape_registry
+
+# The shape of the Instrumentator's metrics plus a livesum gauge
+_WORKER = """
+import os, sys
+from prometheus_client import Counter, Gauge, Histogram
+
+routes, requests = int(sys.argv[1]), int(sys.argv[2])
+total = Counter("http_requests", "Requests", ["handler", "method", "status"])
+latency = Histogram("http_request_duration_seconds", "Latency", ["handler", "method"])
+in_flight = Gauge("in_flight", "In flight", multiprocess_mode="livesum")
+for route in range(routes):
+    for _ in range(requests):
+        total.labels(f"/route/{route}", "GET", "2xx").inc()
+        latency.labels(f"/route/{route}", "GET").observe(0.01)
+in_flight.inc()
+print(os.getpid())
+"""
+
+
+def run_worker(path: str, routes: int = 20, requests: int = 1) -> int:
+    """Record metrics from a separate process writing to ``path``; its pid"""
+    result = subprocess.run(
+        [sys.executable, "-c", _WORKER, str(routes), str(requests)],
+        env={**os.environ, ENV: path},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return int(result.stdout)
+
+
+def time_scrape(path: str, scrapes: int = 5) -> float:
+    """Median seconds to collect and render every worker's values"""
+    from prometheus_client import generate_latest
+
+    timings = []
+    for _ in range(scrapes):
+        started = time.perf_counter()
+        generate_latest(scrape_registry(path))
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def _files(path: str) -> int:
+    return len(glob.glob(os.path.join(path, "*.db")))
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--generations", type=int, default=10)
+    parser.add_argument("--routes", type=int, default=20)
+    parser.add_argument("--scrapes", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    kept, archived = tempfile.mkdtemp(), tempfile.mkdtemp()
+    try:
+        print(
+            f"{'generation':>10} {'files':>6} {'kept ms':>8} {'files':>6} {'archived ms':>12}"
+        )
+        for generation in range(1, args.generations + 1):
+            pids = [run_worker(kept, args.routes) for _ in range(args.workers)]
+            for pid in pids:
+                for f in glob.glob(os.path.join(kept, f"*_{pid}.db")):
+                    shutil.copy(f, archived)
+                mark_process_dead(pid, archived)
+            print(
+                f"{generation:>10} {_files(kept):>6} "
+                f"{time_scrape(kept, args.scrapes) * 1000:>8.1f} "
+                f"{_files(archived):>6} "
+                f"{time_scrape(archived, args.scrapes) * 1000:>12.1f}"
+            )
+    finally:
+        shutil.rmtree(kept)
+        shutil.rmtree(archived)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""Bring an existing database's schema up to date with the models.
+
+Creates missing tables (e.g. holo_stats), adds missing columns and rewrites
+legacy holo question lists. Run it before deploying a release with schema
+changes, then backfill new tables:
+
+    python -m src.scripts.migrate_schema
+    python -m src.scripts.reconcile_holo_stats
+"""
+
+import logging
+
+from src.db.migrations import migrate_schema
+from src.db.session import get_engine
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    added = migrate_schema(get_engine())
+    if added:
+        logger.info("Schema migrated: %s", ", ".join(added))
+    else:
+        logger.info("Schema already up to date")
+    return added
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
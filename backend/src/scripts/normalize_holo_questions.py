@@ -0,0 +1,29 @@
+"""Rewrite legacy holo configs stored as {"questions": [...]} to a plain list.
+
+The read path no longer normalizes this shape. src.scripts.migrate_schema runs
+this as part of the deploy migration; it can also be run on its own:
+
+    python -m src.scripts.normalize_holo_questions
+"""
+
+import logging
+
+from src.db.holos import normalize_holo_questions
+from src.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    db = SessionLocal()
+    try:
+        rewritten = normalize_holo_questions(db)
+        logger.info("Normalized questions for %d holo config(s)", rewritten)
+        return rewritten
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,80 @@
+"""Report per-module import time for the app (or any module).
+
+Imports the target in a fresh interpreter with ``-X importtime`` and lists the
+slowest modules by cumulative and by self time:
+
+    python -m src.scripts.profile_imports            # import main
+    python -m src.scripts.profile_imports --top 40 src.db.holos
+
+Run from the backend directory. tests/unit/test_import_budget.py uses the same
+measurement to fail on cold-start regressions.
+"""
+
+import argparse
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def profile_imports(
+    module: str = "main", cwd: Optional[str] = None
+) -> list[ImportTiming]:
+    """Import ``module`` in a subprocess and parse the -X importtime report"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=cwd,
+    )
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        timings.append(
+            ImportTiming(
+                module=name.strip(),
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                depth=(len(name) - len(name.lstrip()) - 1) // 2,
+            )
+        )
+    return timings
+
+
+def total_seconds(timings: list[ImportTiming], module: str = "main") -> float:
+    """Cumulative import time of ``module`` itself"""
+    top = [t for t in timings if t.module == module and t.depth == 0]
+    return top[-1].cumulative_us / 1e6 if top else 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("module", nargs="?", default="main")
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args(argv)
+
+    timings = profile_imports(args.module)
+    print(f"import {args.module}: {total_seconds(timings, args.module):.3f}s\n")
+    for title, key in (
+        ("cumulative", lambda t: t.cumulative_us),
+        ("self", lambda t: t.self_us),
+    ):
+        print(f"Slowest by {title} time (ms):")
+        for timing in sorted(timings, key=key, reverse=True)[: args.top]:
+            print(f"  {key(timing) / 1000:9.1f}  {timing.module}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""Verify holo_stats aggregates against holo_dailies and repair any drift.
+
+Run periodically (e.g. as a scheduled task) and once after deploying the
+holo_stats table to backfill existing history:
+
+    python -m src.scripts.reconcile_holo_stats
+"""
+
+import logging
+
+from src.db.holo_stats import reconcile_holo_stats
+from src.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    db = SessionLocal()
+    try:
+        corrected = reconcile_holo_stats(db)
+        logger.info("Reconciled holo_stats: %d holo(s) corrected", len(corrected))
+        return corrected
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,60 @@
+"""Compact bitset encoding for yes/no holo answers.
+
+Each holo keeps an append-only ``question_index`` mapping question text to a
+bit position. A daily whose answers are all booleans for indexed questions can
+be stored as two integers instead of a JSON object that repeats every question:
+
+* ``answer_mask`` - bit set when the question was answered
+* ``answer_bits`` - bit set when the answer was "yes"
+
+Bits are never reassigned, so rows packed under an older index version still
+decode correctly after questions are added, removed or renamed.
+"""
+
+from typing import Optional
+
+# Stored in a signed 64-bit column, so the sign bit is left unused
+MAX_PACKED_QUESTIONS = 63
+
+
+def extend_question_index(
+    questions: list[str], question_index: Optional[dict[str, int]]
+) -> tuple[dict[str, int], bool]:
+    """Add any new questions to the index; returns (index, changed)"""
+    index = dict(question_index or {})
+    next_bit = max(index.values(), default=-1) + 1
+    changed = question_index is None
+    for question in questions:
+        if question not in index:
+            index[question] = next_bit
+            next_bit += 1
+            changed = True
+    return index, changed
+
+
+def pack_answers(
+    answers: dict, question_index: Optional[dict[str, int]]
+) -> Optional[tuple[int, int]]:
+    """Encode answers as (bits, mask), or None if they cannot be packed losslessly"""
+    if not answers or not question_index:
+        return None
+    bits = mask = 0
+    for question, value in answers.items():
+        bit = question_index.get(question)
+        if bit is None or bit >= MAX_PACKED_QUESTIONS or not isinstance(value, bool):
+            return None
+        mask |= 1 << bit
+        if value:
+            bits |= 1 << bit
+    return bits, mask
+
+
+def unpack_answers(
+    bits: int, mask: int, question_index: dict[str, int]
+) -> dict[str, bool]:
+    """Decode (bits, mask) back into the answers dict, in bit order"""
+    return {
+        question: bool(bits >> bit & 1)
+        for question, bit in sorted(question_index.items(), key=lambda item: item[1])
+        if mask >> bit & 1
+    }
@@ -0,0 +1,46 @@
+"""Composite home-screen payload.
+
+The home screen used to make four authenticated calls (holo config, latest
+daily, average score, entries), each re-verifying the token, re-running
+ensure_user_exists and, for the holo calls, looking the config up again.
+Here the user and holo are resolved once (the config usually from the holo
+config cache) and the rest is three small queries: the latest daily, the
+holo_stats row and the entries list.
+"""
+
+from sqlalchemy.orm import Session
+from src.db.entries import get_entries
+from src.db.holos import (
+    get_avg_score,
+    get_holo_config_snapshot,
+    get_latest_holo_daily,
+)
+from src.models.dashboard import Dashboard
+from src.models.entries import Entry
+from src.models.holos import Holo
+
+
+def get_dashboard(user_id: str, db: Session) -> Dashboard:
+    """Holo config, latest daily, average score and entries for a user.
+
+    Everything runs on the request's session. A second connection per request
+    would let a burst of dashboards hold the whole pool while each waits for
+    its sibling query, so the queries stay sequential.
+    """
+    holo = get_holo_config_snapshot(user_id, db)
+    latest_daily = avg_score = None
+    if holo:
+        latest_daily = get_latest_holo_daily(holo.holo_id, db)
+        avg_score = get_avg_score(holo.holo_id, db)
+
+    entries = [
+        Entry.model_validate(entry, from_attributes=True)
+        for entry in get_entries(user_id, db)
+    ]
+
+    return Dashboard(
+        holo=Holo.model_validate(holo, from_attributes=True) if holo else None,
+        latest_daily=latest_daily,
+        avg_score=avg_score,
+        entries=entries,
+    )
@@ -0,0 +1,315 @@
+"""Per-question answer analytics for a holo.
+
+For every question: how often it was answered "yes", the current and longest
+run of consecutive "yes" days, and the correlation between answering "yes"
+and the daily score. On PostgreSQL the aggregation runs over the JSONB
+answers in a single query; other backends pack the answers into a compact
+days x questions matrix and aggregate it with NumPy. Rows stored as packed
+bits (see src/services/answer_bits.py) are expanded with bit operations.
+"""
+
+import json
+import math
+from datetime import date
+from typing import TYPE_CHECKING, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from src.core.cache import derived_cache, holo_tag
+from src.models.holos import (
+    HoloAnswerAnalytics,
+    HoloDailiesTable,
+    HoloQuestionAnalytics,
+    HoloTable,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+
+YES_STRINGS = ("yes", "y", "true", "1")
+
+_PG_ANALYTICS_SQL = """
+    WITH answers AS (
+        SELECT d.entry_date, d.score, a.key AS question,
+            CASE jsonb_typeof(a.value)
+                WHEN 'boolean' THEN a.value = CAST('true' AS jsonb)
+                WHEN 'number' THEN CAST(a.value #>> '{{}}' AS numeric) <> 0
+                WHEN 'string' THEN lower(a.value #>> '{{}}') IN ({yes_strings})
+                ELSE false
+            END AS yes
+        FROM holo_dailies AS d
+        CROSS JOIN LATERAL jsonb_each(CAST(d.answers AS jsonb)) AS a
+        WHERE d.holo_id = :holo_id AND d.entry_date <= :end {start_clause}
+        UNION ALL
+        -- Rows stored only as packed bits: test each indexed question's bit
+        SELECT d.entry_date, d.score, q.key AS question,
+            ((d.answer_bits >> CAST(q.value AS INTEGER)) & 1) = 1 AS yes
+        FROM holo_dailies AS d
+        CROSS JOIN LATERAL jsonb_each_text(CAST(:question_index AS jsonb)) AS q
+        WHERE d.holo_id = :holo_id AND d.entry_date <= :end {start_clause}
+            AND d.answer_mask IS NOT NULL
+            AND CAST(d.answers AS jsonb) = CAST('{{}}' AS jsonb)
+            AND ((d.answer_mask >> CAST(q.value AS INTEGER)) & 1) = 1
+    ),
+    totals AS (
+        SELECT question,
+            COUNT(*) AS answered,
+            SUM(CASE WHEN yes THEN 1 ELSE 0 END) AS yes_count,
+            corr(
+                CAST(CASE WHEN yes THEN 1 ELSE 0 END AS DOUBLE PRECISION),
+                CAST(score AS DOUBLE PRECISION)
+            ) AS score_correlation
+        FROM answers
+        GROUP BY question
+    ),
+    islands AS (
+        SELECT question, MAX(entry_date) AS run_end, COUNT(*) AS run_length
+        FROM (
+            SELECT question, entry_date,
+                entry_date - CAST(ROW_NUMBER() OVER (
+                    PARTITION BY question ORDER BY entry_date
+                ) AS INTEGER) AS island
+            FROM answers
+            WHERE yes
+        ) AS yes_days
+        GROUP BY question, island
+    ),
+    streaks AS (
+        SELECT question,
+            MAX(run_length) AS longest_streak,
+            MAX(CASE WHEN run_end >= CAST(:end AS DATE) - 1
+                THEN run_length ELSE 0 END) AS current_streak
+        FROM islands
+        GROUP BY question
+    )
+    SELECT t.question, t.answered, t.yes_count, t.score_correlation,
+        COALESCE(s.current_streak, 0) AS current_streak,
+        COALESCE(s.longest_streak, 0) AS longest_streak
+    FROM totals AS t
+    LEFT JOIN streaks AS s ON s.question = t.question
+"""
+
+
+def is_yes(value) -> bool:
+    """Whether a stored answer counts as "yes" (same rules as the SQL path)"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return value != 0
+    if isinstance(value, str):
+        return value.strip().lower() in YES_STRINGS
+    return False
+
+
+def _rate(yes_count: int, answered: int) -> Optional[float]:
+    return round(yes_count / answered, 4) if answered else None
+
+
+def _correlation(value) -> Optional[float]:
+    if value is None or not math.isfinite(value):
+        return None
+    return round(float(value), 4)
+
+
+def _period_filter(query, start: Optional[date], end: date):
+    query = query.filter(HoloDailiesTable.entry_date <= end)
+    if start is not None:
+        query = query.filter(HoloDailiesTable.entry_date >= start)
+    return query
+
+
+def _question_index(holo_id: str, db: Session) -> dict[str, int]:
+    holo = db.get(HoloTable, holo_id)
+    return (holo.question_index if holo else None) or {}
+
+
+def _analytics_sql(holo_id: str, start: Optional[date], end: date, db: Session):
+    stmt = text(
+        _PG_ANALYTICS_SQL.format(
+            yes_strings=", ".join(f"'{value}'" for value in YES_STRINGS),
+            start_clause="AND d.entry_date >= :start" if start is not None else "",
+        )
+    )
+    params = {
+        "holo_id": holo_id,
+        "end": end,
+        "question_index": json.dumps(_question_index(holo_id, db)),
+    }
+    if start is not None:
+        params["start"] = start
+    return {
+        row.question: HoloQuestionAnalytics(
+            question=row.question,
+            answered=row.answered,
+            yes_count=row.yes_count,
+            completion_rate=_rate(row.yes_count, row.answered),
+            current_streak=row.current_streak,
+            longest_streak=row.longest_streak,
+            score_correlation=_correlation(row.score_correlation),
+        )
+        for row in db.execute(stmt, params)
+    }
+
+
+def _run_lengths(grid: "np.ndarray") -> "np.ndarray":
+    """Length of the run of True values ending at each row, per column"""
+    import numpy as np
+
+    positions = np.arange(grid.shape[0])[:, None]
+    last_false = np.maximum.accumulate(np.where(grid, -1, positions), axis=0)
+    return np.where(grid, positions - last_false, 0)
+
+
+def _analytics_numpy(holo_id: str, start: Optional[date], end: date, db: Session):
+    import numpy as np
+
+    rows = _period_filter(
+        db.query(
+            HoloDailiesTable.entry_date,
+            HoloDailiesTable.score,
+            HoloDailiesTable.answers,
+            HoloDailiesTable.answer_bits,
+            HoloDailiesTable.answer_mask,
+        ).filter(HoloDailiesTable.holo_id == holo_id),
+        start,
+        end,
+    ).all()
+
+    # Compact matrix: one row per daily, one column per question seen
+    columns: dict[str, int] = {}
+    cells_row, cells_col, cells_yes = [], [], []
+    packed_rows, packed_union = [], 0
+    for i, (_, _, answers, _, mask) in enumerate(rows):
+        if not answers and mask is not None:
+            packed_rows.append(i)
+            packed_union |= mask
+            continue
+        for question, value in (answers or {}).items():
+            cells_row.append(i)
+            cells_col.append(columns.setdefault(question, len(columns)))
+            cells_yes.append(is_yes(value))
+
+    packed_questions = [
+        (question, bit)
+        for question, bit in sorted(
+            _question_index(holo_id, db).items() if packed_rows else (),
+            key=lambda item: item[1],
+        )
+        if packed_union >> bit & 1
+    ]
+    for question, _ in packed_questions:
+        columns.setdefault(question, len(columns))
+    if not columns:
+        return {}
+
+    shape = (len(rows), len(columns))
+    answered = np.zeros(shape, dtype=bool)
+    yes = np.zeros(shape, dtype=bool)
+    answered[cells_row, cells_col] = True
+    yes[cells_row, cells_col] = cells_yes
+
+    if packed_questions:
+        # Expand the packed rows with one shift-and-mask per question bit
+        bit_positions = np.array([bit for _, bit in packed_questions], dtype=np.int64)
+        target = np.ix_(
+            packed_rows, [columns[question] for question, _ in packed_questions]
+        )
+        masks = np.array([rows[i].answer_mask for i in packed_rows], dtype=np.int64)
+        bits = np.array([rows[i].answer_bits for i in packed_rows], dtype=np.int64)
+        answered[target] = (masks[:, None] >> bit_positions) & 1
+        yes[target] = (bits[:, None] >> bit_positions) & 1
+
+    answered_count = answered.sum(axis=0)
+    yes_count = yes.sum(axis=0)
+
+    # Pearson correlation over the days each question was answered
+    scores = np.array([row.score for row in rows], dtype=np.float64)[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        n = answered_count
+        mean_x = yes_count / n
+        mean_y = (answered * scores).sum(axis=0) / n
+        cov = (yes * scores).sum(axis=0) / n - mean_x * mean_y
+        var_x = mean_x - mean_x**2
+        var_y = (answered * scores**2).sum(axis=0) / n - mean_y**2
+        correlation = cov / np.sqrt(var_x * var_y)
+
+    # Calendar grid from the first daily to the end of the period, stopping two
+    # days after the last daily: past that every run is over either way
+    ordinals = np.array([row.entry_date.toordinal() for row in rows])
+    first = int(ordinals.min())
+    last = min(end.toordinal(), int(ordinals.max()) + 2)
+    grid = np.zeros((last - first + 1, len(columns)), dtype=bool)
+    grid[ordinals - first] = yes
+    runs = _run_lengths(grid)
+    longest = runs.max(axis=0)
+    # A run stays current until the end of the day after its last "yes"
+    current = runs[-1] if len(runs) < 2 else np.where(grid[-1], runs[-1], runs[-2])
+
+    return {
+        question: HoloQuestionAnalytics(
+            question=question,
+            answered=int(answered_count[j]),
+            yes_count=int(yes_count[j]),
+            completion_rate=_rate(int(yes_count[j]), int(answered_count[j])),
+            current_streak=int(current[j]),
+            longest_streak=int(longest[j]),
+            score_correlation=_correlation(correlation[j]),
+        )
+        for question, j in columns.items()
+    }
+
+
+def get_answer_analytics(
+    holo_id: str,
+    questions: list[str],
+    db: Session,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> HoloAnswerAnalytics:
+    """Per-question completion rates, streaks and score correlation.
+
+    Configured questions are listed first (with zeros when never answered),
+    followed by any other keys found in the stored answers. Results are cached
+    per holo and period until the next daily write or rename for the holo on
+    any worker (see apply_invalidation in src/db/holos.py).
+    """
+    # Later days cannot have been answered yet; a far-off end would only grow
+    # the calendar grid of the non-PostgreSQL path
+    end = min(end or date.today(), date.today())
+    key = ("analytics", holo_id, tuple(questions), start, end)
+    cached = derived_cache.get(key)
+    if cached is not None:
+        return cached
+
+    tags = [holo_tag(holo_id)]
+    generation = derived_cache.generation(key, tags)
+    if db.get_bind().dialect.name == "postgresql":
+        by_question = _analytics_sql(holo_id, start, end, db)
+    else:
+        by_question = _analytics_numpy(holo_id, start, end, db)
+
+    ordered = [
+        by_question.pop(question, None)
+        or HoloQuestionAnalytics(
+            question=question,
+            answered=0,
+            yes_count=0,
+            current_streak=0,
+            longest_streak=0,
+        )
+        for question in questions
+    ]
+    ordered.extend(by_question[question] for question in sorted(by_question))
+
+    dailies = _period_filter(
+        db.query(HoloDailiesTable).filter(HoloDailiesTable.holo_id == holo_id),
+        start,
+        end,
+    ).count()
+
+    result = HoloAnswerAnalytics(
+        start=start, end=end, dailies=dailies, questions=ordered
+    )
+    # Not cached if a daily write or rename was invalidated while we computed it
+    derived_cache.set_if_unchanged(key, result, generation, tags=tags)
+    return result
@@ -0,0 +1,193 @@
+"""Rolling score statistics for a holo.
+
+On PostgreSQL everything is computed in SQL (window functions for the moving
+averages, GROUPING SETS for the period means). Other backends load the
+(entry_date, score) series once and compute the same figures with NumPy,
+imported on first use since the PostgreSQL path never needs it.
+"""
+
+from datetime import date
+from typing import TYPE_CHECKING
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from src.core.cache import derived_cache, holo_tag
+from src.models.holos import (
+    HoloDailiesTable,
+    HoloScorePeriodMean,
+    HoloScorePoint,
+    HoloScoreTimeseries,
+    HoloWeekdayMean,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+
+MOVING_AVERAGE_WINDOWS = (7, 30, 90)
+
+_PG_DAILY_SQL = text("""
+    SELECT entry_date, score,
+        AVG(score) OVER (ORDER BY entry_date
+            RANGE BETWEEN INTERVAL '6 days' PRECEDING AND CURRENT ROW) AS ma_7,
+        AVG(score) OVER (ORDER BY entry_date
+            RANGE BETWEEN INTERVAL '29 days' PRECEDING AND CURRENT ROW) AS ma_30,
+        AVG(score) OVER (ORDER BY entry_date
+            RANGE BETWEEN INTERVAL '89 days' PRECEDING AND CURRENT ROW) AS ma_90
+    FROM holo_dailies
+    WHERE holo_id = :holo_id
+    ORDER BY entry_date
+    """)
+
+_PG_PERIODS_SQL = text("""
+    SELECT week, month, weekday, AVG(score) AS avg_score, COUNT(*) AS count
+    FROM (
+        SELECT CAST(date_trunc('week', entry_date) AS DATE) AS week,
+            CAST(date_trunc('month', entry_date) AS DATE) AS month,
+            CAST(EXTRACT(ISODOW FROM entry_date) AS INTEGER) - 1 AS weekday,
+            score
+        FROM holo_dailies
+        WHERE holo_id = :holo_id
+    ) AS d
+    GROUP BY GROUPING SETS ((week), (month), (weekday))
+    ORDER BY week, month, weekday
+    """)
+
+
+def _round(value) -> float:
+    return round(float(value), 2)
+
+
+def _timeseries_sql(holo_id: str, db: Session) -> HoloScoreTimeseries:
+    params = {"holo_id": holo_id}
+    daily = [
+        HoloScorePoint(
+            entry_date=row.entry_date,
+            score=row.score,
+            ma_7=_round(row.ma_7),
+            ma_30=_round(row.ma_30),
+            ma_90=_round(row.ma_90),
+        )
+        for row in db.execute(_PG_DAILY_SQL, params)
+    ]
+
+    weekly, monthly, weekdays = [], [], []
+    for row in db.execute(_PG_PERIODS_SQL, params):
+        avg_score, count = _round(row.avg_score), row.count
+        if row.week is not None:
+            weekly.append(
+                HoloScorePeriodMean(
+                    period_start=row.week, avg_score=avg_score, count=count
+                )
+            )
+        elif row.month is not None:
+            monthly.append(
+                HoloScorePeriodMean(
+                    period_start=row.month, avg_score=avg_score, count=count
+                )
+            )
+        else:
+            weekdays.append(
+                HoloWeekdayMean(weekday=row.weekday, avg_score=avg_score, count=count)
+            )
+    return HoloScoreTimeseries(
+        daily=daily, weekly=weekly, monthly=monthly, weekdays=weekdays
+    )
+
+
+def _group_means(keys: "np.ndarray", scores: "np.ndarray"):
+    """Mean and count of ``scores`` per distinct key, in key order"""
+    import numpy as np
+
+    unique, inverse = np.unique(keys, return_inverse=True)
+    counts = np.bincount(inverse)
+    sums = np.bincount(inverse, weights=scores)
+    return unique, sums / counts, counts
+
+
+def _timeseries_numpy(holo_id: str, db: Session) -> HoloScoreTimeseries:
+    import numpy as np
+
+    rows = (
+        db.query(HoloDailiesTable.entry_date, HoloDailiesTable.score)
+        .filter(HoloDailiesTable.holo_id == holo_id)
+        .order_by(HoloDailiesTable.entry_date)
+        .all()
+    )
+    if not rows:
+        return HoloScoreTimeseries(daily=[], weekly=[], monthly=[], weekdays=[])
+
+    dates = np.array([entry_date for entry_date, _ in rows], dtype="datetime64[D]")
+    scores = np.array([score for _, score in rows], dtype=np.float64)
+    days = dates.astype(np.int64)
+    positions = np.arange(1, len(days) + 1)
+    cumulative = np.concatenate(([0.0], np.cumsum(scores)))
+
+    # Calendar windows: each day averages every entry in the trailing N days
+    moving = {}
+    for window in MOVING_AVERAGE_WINDOWS:
+        start = np.searchsorted(days, days - (window - 1), side="left")
+        moving[window] = (cumulative[positions] - cumulative[start]) / (
+            positions - start
+        )
+
+    # 1970-01-01 was a Thursday, so shift by 3 to make Monday == 0
+    weekday = (days + 3) % 7
+    week_keys, week_means, week_counts = _group_means(days - weekday, scores)
+    month_keys, month_means, month_counts = _group_means(
+        dates.astype("datetime64[M]").astype("datetime64[D]").astype(np.int64), scores
+    )
+    weekday_keys, weekday_means, weekday_counts = _group_means(weekday, scores)
+
+    def to_date(day: "np.int64") -> date:
+        return np.datetime64(int(day), "D").astype(date)
+
+    return HoloScoreTimeseries(
+        daily=[
+            HoloScorePoint(
+                entry_date=entry_date,
+                score=score,
+                ma_7=_round(moving[7][i]),
+                ma_30=_round(moving[30][i]),
+                ma_90=_round(moving[90][i]),
+            )
+            for i, (entry_date, score) in enumerate(rows)
+        ],
+        weekly=[
+            HoloScorePeriodMean(
+                period_start=to_date(key), avg_score=_round(mean), count=int(count)
+            )
+            for key, mean, count in zip(week_keys, week_means, week_counts)
+        ],
+        monthly=[
+            HoloScorePeriodMean(
+                period_start=to_date(key), avg_score=_round(mean), count=int(count)
+            )
+            for key, mean, count in zip(month_keys, month_means, month_counts)
+        ],
+        weekdays=[
+            HoloWeekdayMean(weekday=int(key), avg_score=_round(mean), count=int(count))
+            for key, mean, count in zip(weekday_keys, weekday_means, weekday_counts)
+        ],
+    )
+
+
+def get_score_timeseries(holo_id: str, db: Session) -> HoloScoreTimeseries:
+    """Moving averages, weekly/monthly means and weekday means for a holo.
+
+    Results are cached per holo until the next daily write to it on any
+    worker (see apply_invalidation in src/db/holos.py).
+    """
+    key = ("timeseries", holo_id)
+    cached = derived_cache.get(key)
+    if cached is not None:
+        return cached
+
+    tags = [holo_tag(holo_id)]
+    generation = derived_cache.generation(key, tags)
+    if db.get_bind().dialect.name == "postgresql":
+        result = _timeseries_sql(holo_id, db)
+    else:
+        result = _timeseries_numpy(holo_id, db)
+    # Not cached if a daily write was invalidated while we computed it
+    derived_cache.set_if_unchanged(key, result, generation, tags=tags)
+    return result
@@ -0,0 +1,96 @@
+"""Server-side daily scores from per-question weights.
+
+A holo with ``question_weights`` gets its daily score computed from the
+answers instead of trusting the client: the weighted share of "yes" answers
+scaled to 0-MAX_SCORE. Questions without a weight do not count. Scoring a
+whole history is one matrix-vector product, so a year of dailies rescoring is
+a single NumPy pass. NumPy is imported on first use to keep it off the
+import path of the app.
+"""
+
+import math
+from typing import TYPE_CHECKING, Optional, Sequence
+
+from src.services.holo_analytics import is_yes
+
+if TYPE_CHECKING:
+    import numpy as np
+
+MAX_SCORE = 10
+
+# (answers, answer_bits, answer_mask) as stored on a holo_dailies row
+AnswerRow = tuple[Optional[dict], Optional[int], Optional[int]]
+
+
+def validate_weights(weights: dict[str, float], questions: list[str]):
+    """Raise ValueError unless every weight is non-negative for a known question"""
+    unknown = [question for question in weights if question not in questions]
+    if unknown:
+        raise ValueError(f"Weights given for unknown questions: {unknown}")
+    if any(not math.isfinite(weight) or weight < 0 for weight in weights.values()):
+        raise ValueError("Question weights must be finite and non-negative")
+
+
+def yes_matrix(
+    rows: Sequence[AnswerRow],
+    questions: list[str],
+    question_index: Optional[dict[str, int]] = None,
+) -> "np.ndarray":
+    """Days x questions boolean matrix of "yes" answers.
+
+    JSON answers are filled cell by cell; rows stored only as packed bits are
+    expanded with one shift-and-mask per question bit.
+    """
+    import numpy as np
+
+    yes = np.zeros((len(rows), len(questions)), dtype=bool)
+    column = {question: j for j, question in enumerate(questions)}
+    packed = []
+    for i, (answers, _, mask) in enumerate(rows):
+        if not answers:
+            if mask is not None:
+                packed.append(i)
+            continue
+        for question, value in answers.items():
+            j = column.get(question)
+            if j is not None:
+                yes[i, j] = is_yes(value)
+
+    indexed = [
+        (j, question_index[question])
+        for j, question in enumerate(questions)
+        if question in (question_index or {})
+    ]
+    if packed and indexed:
+        shifts = np.array([bit for _, bit in indexed], dtype=np.int64)
+        bits = np.array([rows[i][1] for i in packed], dtype=np.int64)
+        yes[np.ix_(packed, [j for j, _ in indexed])] = (bits[:, None] >> shifts) & 1
+    return yes
+
+
+def compute_scores(yes: "np.ndarray", weights: "np.ndarray") -> "np.ndarray":
+    """Score every row of a yes-matrix against a weight vector"""
+    import numpy as np
+
+    total = weights.sum()
+    if total <= 0:
+        return np.zeros(yes.shape[0], dtype=np.int64)
+    share = (yes @ weights) / total
+    # Round half up rather than NumPy's round-half-to-even
+    return np.floor(share * MAX_SCORE + 0.5).astype(np.int64)
+
+
+def score_answers(
+    answers: dict,
+    question_weights: dict[str, float],
+    answer_bits: Optional[int] = None,
+    answer_mask: Optional[int] = None,
+    question_index: Optional[dict[str, int]] = None,
+) -> int:
+    """Score a single daily; same arithmetic as a bulk rescore"""
+    import numpy as np
+
+    questions = list(question_weights)
+    yes = yes_matrix([(answers, answer_bits, answer_mask)], questions, question_index)
+    weights = np.array([question_weights[q] for q in questions], dtype=np.float64)
+    return int(compute_scores(yes, weights)[0])
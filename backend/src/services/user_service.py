@@ -1,3 +1,4 @@
+import logging
 from typing import Optional
 
 from sqlalchemy.orm import Session
@@ -6,6 +7,8 @@ from src.db.users import create_user_in_transaction, get_user_by_id
 from src.models.holos import HoloCreate
 from src.models.users import UserCreate
 
+logger = logging.getLogger(__name__)
+
 # Default holo questions for new users (binary yes/no questions)
 DEFAULT_HOLO_QUESTIONS = [
     "Have you slept +8h?",
@@ -71,5 +74,5 @@ def ensure_user_exists(firebase_user_data: dict, db: Session) -> Optional[dict]:
 
     except Exception as e:
         db.rollback()
-        print(f"Error creating user and holo: {str(e)}")
+        logger.error("Error creating user and holo: %s", e)
         return None
@@ -0,0 +1,95 @@
+"""Startup warm-up, run by the app's lifespan before the worker takes traffic.
+
+The first requests on a fresh task otherwise pay for everything at once:
+opening DB connections, fetching Firebase's signing certificates and
+compiling every SQL statement. Warm-up does that up front: it opens pooled
+connections, prefetches the certificates and runs each read route's queries
+for a user that does not exist, which compiles and caches the same
+statements without touching real data. ``ready`` is set once it is done and
+backs the readiness endpoint.
+"""
+
+import logging
+import threading
+import time
+from datetime import date
+from typing import Callable
+
+from sqlalchemy.orm import Session
+from src.core.auth import prefetch_certificates
+from src.core.cache import derived_cache, holo_tag
+from src.core.config import settings
+from src.db.entries import get_entries
+from src.db.holo_stats import get_holo_stats
+from src.db.holos import (
+    get_avg_score,
+    get_holo_config_snapshot,
+    get_holo_daily_by_date,
+    get_latest_holo_daily,
+)
+from src.db.session import SessionLocal, prewarm_pool
+from src.db.users import get_user_by_id
+from src.services.holo_analytics import get_answer_analytics
+from src.services.holo_timeseries import get_score_timeseries
+
+logger = logging.getLogger(__name__)
+
+ready = threading.Event()
+
+# Never a Firebase uid or a holo_id (both are alphanumeric / uuid)
+WARMUP_ID = "__warmup__"
+
+
+def _representative_reads() -> list[tuple[str, Callable[[Session], object]]]:
+    """The queries behind each read route, for a user with no data"""
+    today = date.today()
+    return [
+        ("auth.user", lambda db: get_user_by_id(WARMUP_ID, db)),
+        ("entries.list", lambda db: get_entries(WARMUP_ID, db)),
+        ("holos.config", lambda db: get_holo_config_snapshot(WARMUP_ID, db)),
+        ("holos.daily", lambda db: get_holo_daily_by_date(WARMUP_ID, today, db)),
+        ("holos.daily_latest", lambda db: get_latest_holo_daily(WARMUP_ID, db)),
+        ("holos.avg_score", lambda db: get_avg_score(WARMUP_ID, db)),
+        ("holos.streak", lambda db: get_holo_stats(WARMUP_ID, db)),
+        ("holos.timeseries", lambda db: get_score_timeseries(WARMUP_ID, db)),
+        (
+            "holos.analytics",
+            lambda db: get_answer_analytics(WARMUP_ID, [], db, end=today),
+        ),
+    ]
+
+
+def warm_statement_cache(db: Session) -> list[str]:
+    """Run every representative read; returns the names of those that failed"""
+    failed = []
+    for name, read in _representative_reads():
+        try:
+            read(db)
+        except Exception as e:
+            logger.warning("Warm-up read %s failed: %s", name, e)
+            failed.append(name)
+        finally:
+            db.rollback()
+    # Empty results for the warm-up holo are not worth a cache slot
+    derived_cache.invalidate_tag(holo_tag(WARMUP_ID))
+    return failed
+
+
+def warm_up():
+    """Prepare this worker for traffic; failures are logged, never raised"""
+    started = time.perf_counter()
+    try:
+        opened = prewarm_pool(settings.WARMUP_DB_CONNECTIONS)
+        logger.info("Warm-up opened %d database connections", opened)
+    except Exception as e:
+        logger.warning("Warm-up could not open database connections: %s", e)
+
+    if prefetch_certificates():
+        logger.info("Warm-up fetched Firebase signing certificates")
+
+    db = SessionLocal()
+    try:
+        warm_statement_cache(db)
+    finally:
+        db.close()
+    logger.info("Warm-up finished in %.2fs", time.perf_counter() - started)
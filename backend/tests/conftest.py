@@ -0,0 +1,13 @@
+import pytest
+from src.core import rate_limit
+from src.core.cache import derived_cache, holo_config_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Per-process caches and rate-limit buckets outlive each test"""
+    holo_config_cache.clear()
+    derived_cache.clear()
+    if rate_limit.rate_limiter is not None:
+        rate_limit.rate_limiter.clear()
+    yield
@@ -13,7 +13,7 @@ if str(BACKEND_DIR) not in sys.path:
     sys.path.insert(0, str(BACKEND_DIR))
 
 from main import app
-from src.api.routes.auth import get_current_user
+from src.api.routes.auth import get_current_user, get_verified_token
 from src.db.session import Base, get_db
 from src.models.users import UserTable
 
@@ -47,6 +47,9 @@ def client():
         "email": TEST_USER["user_email"],
         "name": TEST_USER["user_name"],
     }
+    app.dependency_overrides[get_verified_token] = app.dependency_overrides[
+        get_current_user
+    ]
 
     session = TestingSessionLocal()
     try:
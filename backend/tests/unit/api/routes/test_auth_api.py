@@ -1,3 +1,4 @@
+import threading
 from unittest.mock import patch
 
 import pytest
@@ -36,7 +37,9 @@ def client():
 class TestAuthAPI:
     def test_protected_route_success(self, client):
         """Test accessing protected route with valid token"""
-        with patch("src.api.routes.auth.verify_token_and_ensure_user") as mock_verify:
+        with patch("src.api.routes.auth.verify_token") as mock_verify, patch(
+            "src.api.routes.auth.ensure_token_user", side_effect=lambda claims: claims
+        ):
             mock_verify.return_value = {"uid": "test-user", "email": "test@example.com"}
 
             response = client.get(
@@ -62,7 +65,9 @@ class TestAuthAPI:
 
     def test_protected_route_invalid_token(self, client):
         """Test accessing protected route with invalid token"""
-        with patch("src.api.routes.auth.verify_token_and_ensure_user") as mock_verify:
+        with patch("src.api.routes.auth.verify_token") as mock_verify, patch(
+            "src.api.routes.auth.ensure_token_user", side_effect=lambda claims: claims
+        ):
             mock_verify.return_value = None
 
             response = client.get(
@@ -73,7 +78,9 @@ class TestAuthAPI:
 
     def test_protected_route_exception(self, client):
         """Test accessing protected route when token verification raises exception"""
-        with patch("src.api.routes.auth.verify_token_and_ensure_user") as mock_verify:
+        with patch("src.api.routes.auth.verify_token") as mock_verify, patch(
+            "src.api.routes.auth.ensure_token_user", side_effect=lambda claims: claims
+        ):
             mock_verify.side_effect = Exception("Token verification failed")
 
             response = client.get(
@@ -82,9 +89,66 @@ class TestAuthAPI:
             assert response.status_code == 401
             assert "Invalid or expired token" in response.json()["detail"]
 
+    def test_user_not_created(self, client):
+        """Test that a valid token whose user cannot be created is rejected"""
+        with patch("src.api.routes.auth.verify_token") as mock_verify, patch(
+            "src.api.routes.auth.ensure_token_user", return_value=None
+        ):
+            mock_verify.return_value = {"uid": "test-user"}
+
+            response = client.get(
+                "/auth/protected", headers={"Authorization": "Bearer valid-token"}
+            )
+            assert response.status_code == 401
+
+    def test_user_upsert_runs_on_db_executor(self, client):
+        """Test that the user upsert shares the DB executor's bound"""
+        threads = []
+
+        def ensure(claims):
+            threads.append(threading.current_thread().name)
+            return claims
+
+        with patch("src.api.routes.auth.verify_token") as mock_verify, patch(
+            "src.api.routes.auth.ensure_token_user", side_effect=ensure
+        ):
+            mock_verify.return_value = {"uid": "test-user"}
+
+            response = client.get(
+                "/auth/protected", headers={"Authorization": "Bearer valid-token"}
+            )
+            assert response.status_code == 200
+        assert len(threads) == 1
+        assert threads[0].startswith("db-executor")
+
+    def test_rate_limited_before_user_upsert(self, client):
+        """Test that a throttled request never reaches ensure_user_exists"""
+        from src.core import rate_limit
+        from src.core.rate_limit import Budget, MemoryRateLimiter
+
+        budgets = {"read": Budget(rate=0.01, burst=1)}
+        with patch("src.api.routes.auth.verify_token") as mock_verify, patch(
+            "src.api.routes.auth.ensure_token_user", side_effect=lambda claims: claims
+        ) as mock_ensure, patch.object(
+            rate_limit, "rate_limiter", MemoryRateLimiter()
+        ), patch.object(
+            rate_limit, "budgets", return_value=budgets
+        ):
+            mock_verify.return_value = {"uid": "test-user"}
+            headers = {"Authorization": "Bearer valid-token"}
+            first = client.get("/auth/protected", headers=headers)
+            second = client.get("/auth/protected", headers=headers)
+
+        assert first.status_code == 200
+        assert second.status_code == 429
+        assert mock_verify.call_count == 2
+        assert mock_ensure.call_count == 1
+
     def test_get_user_info_success(self, client):
         """Test getting user info with valid token"""
-        with patch("src.api.routes.auth.verify_token_and_ensure_user") as mock_verify:
+        with patch("src.api.routes.auth.verify_token") as mock_verify, patch(
+            "src.api.routes.auth.ensure_token_user", side_effect=lambda claims: claims
+        ):
             mock_verify.return_value = {
                 "uid": "test-user",
                 "email": "test@example.com",
@@ -101,7 +165,9 @@ class TestAuthAPI:
 
     def test_get_user_info_no_user_data(self, client):
         """Test getting user info when no user_data is present"""
-        with patch("src.api.routes.auth.verify_token_and_ensure_user") as mock_verify:
+        with patch("src.api.routes.auth.verify_token") as mock_verify, patch(
+            "src.api.routes.auth.ensure_token_user", side_effect=lambda claims: claims
+        ):
             mock_verify.return_value = {"uid": "test-user", "email": "test@example.com"}
 
             response = client.get(
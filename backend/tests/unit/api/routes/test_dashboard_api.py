@@ -0,0 +1,136 @@
+import pytest
+from fastapi.testclient import TestClient
+
+# Import the modules
+from main import app
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from src.core.cache import holo_config_cache
+from src.db.session import Base, get_db
+from src.db.users import create_user
+from src.models.users import UserCreate
+
+
+@pytest.fixture()
+def engine():
+    # Use a shared in-memory SQLite so schema persists across connections in tests
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+@pytest.fixture()
+def client(engine):
+    """Create a test client with in-memory SQLite database"""
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    # Bypass auth dependency for tests
+    from src.api.routes.auth import get_current_user, get_verified_token
+
+    app.dependency_overrides[get_verified_token] = lambda: {"uid": "test-user"}
+    app.dependency_overrides[get_current_user] = lambda: {"uid": "test-user"}
+    with TestClient(app) as c:
+        yield c
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture(autouse=True)
+def test_user(client):
+    """Create a test user in the database"""
+    db = next(app.dependency_overrides[get_db]())
+    try:
+        create_user(
+            UserCreate(
+                user_id="test-user",
+                user_name="Test User",
+                user_email="test@example.com",
+            ),
+            db,
+        )
+        yield
+    finally:
+        db.close()
+
+
+def test_dashboard_without_holo(client):
+    """Test the dashboard for a user with no holo config or entries"""
+    response = client.get("/dashboard")
+    assert response.status_code == 200
+    assert response.json() == {
+        "holo": None,
+        "latest_daily": None,
+        "avg_score": None,
+        "entries": [],
+    }
+
+
+def test_dashboard_payload(client):
+    """Test the dashboard combines holo, latest daily, avg score and entries"""
+    client.post("/holos/holo", json={"user_id": "test-user", "questions": ["q1"]})
+    for entry_date, score in (("2024-01-14", 6), ("2024-01-15", 8)):
+        client.post(
+            "/holos/daily",
+            json={"entry_date": entry_date, "score": score, "answers": {"q1": True}},
+        )
+    client.post(
+        "/entries/",
+        json={
+            "entry_date": "2024-01-15T10:00:00",
+            "title": "Hello",
+            "content": "World",
+        },
+    )
+
+    response = client.get("/dashboard")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["holo"]["questions"] == ["q1"]
+    assert data["latest_daily"]["entry_date"] == "2024-01-15"
+    assert data["latest_daily"]["score"] == 8
+    assert data["avg_score"] == 7.0
+    assert [entry["title"] for entry in data["entries"]] == ["Hello"]
+
+
+def test_dashboard_query_count(client, engine):
+    """Test the dashboard needs one query per section"""
+    client.post("/holos/holo", json={"user_id": "test-user", "questions": ["q1"]})
+    client.post(
+        "/holos/daily",
+        json={"entry_date": "2024-01-15", "score": 8, "answers": {"q1": True}},
+    )
+
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        assert client.get("/dashboard").status_code == 200
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    # latest daily, holo_stats row, entries; the config comes from the cache
+    assert len(statements) == 3
+
+    holo_config_cache.clear()
+    statements.clear()
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        assert client.get("/dashboard").status_code == 200
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    assert len(statements) == 4
@@ -0,0 +1,126 @@
+import threading
+from unittest.mock import patch
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from main import app as main_app
+from src.api.router import Router
+from src.api.routes import debug
+from src.api.routes.auth import get_current_user
+from src.core.executors import DBRoute
+from src.core.profiling import ProfileRequestMiddleware, stop_tracemalloc
+
+ADMIN = "admin-uid"
+
+
+def _spin_until(event):
+    while not event.is_set():
+        sum(range(1000))
+
+
+_retained = []
+
+
+def _allocate_blocks():
+    _retained.extend(bytearray(1024) for _ in range(2000))
+
+
+@pytest.fixture()
+def client():
+    app = FastAPI()
+    app.include_router(debug.router)
+
+    router = APIRouter(route_class=DBRoute)
+
+    @router.get("/work")
+    def work():
+        return {"total": sum(range(10000))}
+
+    app.include_router(router)
+    app.add_middleware(ProfileRequestMiddleware, token="secret")
+    app.dependency_overrides[get_current_user] = lambda: {"uid": ADMIN}
+    with patch.object(debug.settings, "ADMIN_UIDS", {ADMIN}):
+        yield TestClient(app)
+    stop_tracemalloc()
+    _retained.clear()
+
+
+def test_loaded_only_when_enabled():
+    """Test that Router.load_routers skips the debug router unless enabled"""
+    assert not debug.ENABLED
+    assert TestClient(main_app).get("/debug/tracemalloc/top").status_code == 404
+
+    app = FastAPI()
+    with patch.object(debug, "ENABLED", True):
+        Router(app).load_routers()
+    # Present, and guarded by authentication
+    assert TestClient(app).get("/debug/tracemalloc/top").status_code == 422
+
+
+def test_admin_only(client):
+    """Test that other users are refused"""
+    client.app.dependency_overrides[get_current_user] = lambda: {"uid": "someone"}
+    assert client.get("/debug/tracemalloc/top").status_code == 403
+
+
+def test_cpu_profile_collapsed_stacks(client):
+    """Test that a busy thread shows up in the collapsed stacks"""
+    stop = threading.Event()
+    busy = threading.Thread(target=_spin_until, args=(stop,), name="busy")
+    busy.start()
+    try:
+        response = client.get("/debug/profile/cpu", params={"seconds": 0.2})
+    finally:
+        stop.set()
+        busy.join()
+
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert any(
+        line.startswith("busy;") and f"{__name__}:_spin_until" in line for line in lines
+    )
+
+
+def test_cpu_profile_bounded(client):
+    """Test that the sampling window is capped"""
+    response = client.get("/debug/profile/cpu", params={"seconds": 10_000})
+    assert response.status_code == 422
+
+
+def test_tracemalloc_top_and_diff(client):
+    """Test that allocation sites are reported and diffed against a baseline"""
+    assert client.get("/debug/tracemalloc/top").status_code == 409
+    assert client.post("/debug/tracemalloc/start").json()["tracing"]
+    assert client.post("/debug/tracemalloc/snapshot").status_code == 200
+
+    _allocate_blocks()
+
+    top = client.get("/debug/tracemalloc/top", params={"limit": 500}).json()
+    assert any(__file__ in entry["location"] for entry in top)
+    diff = client.get("/debug/tracemalloc/diff").json()
+    assert __file__ in diff[0]["location"]
+    assert diff[0]["size_diff_bytes"] >= 2000 * 1024
+
+    client.post("/debug/tracemalloc/stop")
+    assert client.get("/debug/tracemalloc/diff").status_code == 409
+
+
+def test_request_profile(client):
+    """Test that a request with the profile header gets a cProfile report"""
+    response = client.get("/work", headers={"X-Debug-Profile": "secret"})
+    profile_id = response.headers["x-debug-profile-id"]
+
+    report = client.get(f"/debug/profiles/{profile_id}")
+    assert report.status_code == 200
+    assert "work" in report.text
+    assert "function calls" in report.text
+
+
+def test_request_profile_needs_token(client):
+    """Test that the header without the right token is ignored"""
+    response = client.get("/work", headers={"X-Debug-Profile": "wrong"})
+    assert "x-debug-profile-id" not in response.headers
+    assert client.get("/debug/profiles/unknown").status_code == 404
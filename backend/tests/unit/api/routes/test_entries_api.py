@@ -9,6 +9,8 @@ from sqlalchemy import create_engine
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
+from src.core import response_cache as response_cache_module
+from src.core.cache import TTLCache
 from src.db.session import Base, get_db
 
 
@@ -33,8 +35,9 @@ def client():
 
     app.dependency_overrides[get_db] = override_get_db
     # Bypass auth dependency for tests
-    from src.api.routes.auth import get_current_user
+    from src.api.routes.auth import get_current_user, get_verified_token
 
+    app.dependency_overrides[get_verified_token] = lambda: {"uid": "test-user"}
     app.dependency_overrides[get_current_user] = lambda: {"uid": "test-user"}
     with TestClient(app) as c:
         yield c
@@ -82,6 +85,31 @@ def test_entries_crud_flow(client: TestClient):
     assert resp.json() == []
 
 
+def test_entries_response_cache(client, monkeypatch):
+    """Test cached entry lists are served until a write invalidates them"""
+    monkeypatch.setattr(
+        response_cache_module, "response_cache", TTLCache(maxsize=16, ttl=60)
+    )
+    payload = {
+        "entry_date": datetime.utcnow().isoformat(),
+        "title": "Entry 1",
+        "content": "Content 1",
+    }
+    entry_id = client.post("/entries/", json=payload).json()["entry_id"]
+    assert len(client.get("/entries/").json()) == 1
+
+    with patch("src.api.routes.entries.get_entries") as mock_get_entries:
+        # A hit never reaches the db layer
+        assert client.get("/entries/").json()[0]["entry_id"] == entry_id
+        mock_get_entries.assert_not_called()
+
+    client.put(f"/entries/{entry_id}", json={"title": "Updated", "content": "x"})
+    assert client.get("/entries/").json()[0]["title"] == "Updated"
+
+    client.delete(f"/entries/{entry_id}")
+    assert client.get("/entries/").json() == []
+
+
 def test_get_entries_database_error(client):
     """Test get entries with database error"""
     with patch("src.api.routes.entries.get_entries") as mock_get_entries:
@@ -230,3 +258,25 @@ def test_delete_entry_unexpected_error(client):
         response = client.delete("/entries/test-id")
         assert response.status_code == 500
         assert "Unexpected error while deleting entry" in response.json()["detail"]
+
+
+def test_entries_rate_limited_per_user(client: TestClient):
+    """Test rate-limit headers and that a 429 happens before any DB work"""
+    from src.core import rate_limit
+    from src.core.rate_limit import Budget, MemoryRateLimiter
+
+    budgets = {name: Budget(rate=0.01, burst=2) for name in ("read", "write")}
+    with patch.object(rate_limit, "rate_limiter", MemoryRateLimiter()), patch.object(
+        rate_limit, "budgets", return_value=budgets
+    ), patch("src.api.routes.entries.get_entries", return_value=[]) as mock_get:
+        first = client.get("/entries/")
+        second = client.get("/entries/")
+        third = client.get("/entries/")
+
+    assert first.status_code == 200
+    assert first.headers["RateLimit-Limit"] == "2"
+    assert first.headers["RateLimit-Remaining"] == "1"
+    assert second.headers["RateLimit-Remaining"] == "0"
+    assert third.status_code == 429
+    assert int(third.headers["Retry-After"]) > 0
+    assert mock_get.call_count == 2
@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 import pytest
 from fastapi.testclient import TestClient
 
@@ -32,8 +34,9 @@ def client():
 
     app.dependency_overrides[get_db] = override_get_db
     # Bypass auth dependency for tests
-    from src.api.routes.auth import get_current_user
+    from src.api.routes.auth import get_current_user, get_verified_token
 
+    app.dependency_overrides[get_verified_token] = lambda: {"uid": "test-user"}
     app.dependency_overrides[get_current_user] = lambda: {"uid": "test-user"}
     with TestClient(app) as c:
         yield c
@@ -177,6 +180,155 @@ class TestHoloConfigAPI:
         assert response.status_code == 422
 
 
+class TestHoloQuestionRenameAPI:
+    @pytest.fixture(autouse=True)
+    def setup_test_data(self, client, test_user, clean_holo_config):
+        """Automatically set up test data for all tests in this class"""
+        pass
+
+    def test_rename_not_found(self, client):
+        """Test renaming questions when no holo config exists"""
+        response = client.patch("/holos/holo/questions", json={"renames": {"a": "b"}})
+        assert response.status_code == 404
+
+    def test_rename_success(self, client, sample_holo_config):
+        """Test renaming a question carries its answers along"""
+        client.post("/holos/holo", json=sample_holo_config)
+        old = sample_holo_config["questions"][0]
+        client.post(
+            "/holos/daily",
+            json={"entry_date": "2024-01-15", "score": 5, "answers": {old: True}},
+        )
+
+        response = client.patch(
+            "/holos/holo/questions", json={"renames": {old: "How do you feel?"}}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["rows_touched"] == 1
+        assert data["holo"]["questions"][0] == "How do you feel?"
+
+        daily = client.get("/holos/daily?entry_date=2024-01-15").json()
+        assert daily["answers"] == {"How do you feel?": True}
+
+    def test_rename_validation_error(self, client, sample_holo_config):
+        """Test renaming an unknown question is rejected"""
+        client.post("/holos/holo", json=sample_holo_config)
+        response = client.patch(
+            "/holos/holo/questions", json={"renames": {"missing": "x"}}
+        )
+        assert response.status_code == 422
+
+
+class TestHoloRescoreAPI:
+    @pytest.fixture(autouse=True)
+    def setup_test_data(self, client, test_user, clean_holo_config):
+        """Automatically set up test data for all tests in this class"""
+        pass
+
+    def test_rescore_not_found(self, client):
+        """Test rescoring when no holo config exists"""
+        response = client.post("/holos/holo/rescore")
+        assert response.status_code == 404
+
+    def test_rescore_without_weights(self, client, sample_holo_config):
+        """Test rescoring a holo that has no question weights"""
+        client.post("/holos/holo", json=sample_holo_config)
+        response = client.post("/holos/holo/rescore")
+        assert response.status_code == 422
+
+    def test_weighted_scoring_and_rescore(self, client, sample_holo_config):
+        """Test server-side scoring on submit and rescoring after a weight change"""
+        questions = sample_holo_config["questions"]
+        client.post(
+            "/holos/holo",
+            json={**sample_holo_config, "question_weights": {questions[0]: 1.0}},
+        )
+        response = client.post(
+            "/holos/daily",
+            json={
+                "entry_date": "2024-01-15",
+                "score": 2,
+                "answers": {questions[0]: True, questions[1]: True},
+            },
+        )
+        assert response.json()["score"] == 10
+
+        client.put(
+            "/holos/holo",
+            json={
+                "questions": questions,
+                "question_weights": {questions[0]: 1.0, questions[1]: 3.0},
+            },
+        )
+        response = client.post("/holos/holo/rescore")
+        assert response.status_code == 200
+        assert response.json() == {"dailies": 1, "rescored": 0}
+
+        client.put(
+            "/holos/holo",
+            json={"questions": questions, "question_weights": {questions[2]: 1.0}},
+        )
+        response = client.post("/holos/holo/rescore")
+        assert response.json() == {"dailies": 1, "rescored": 1}
+        daily = client.get("/holos/daily?entry_date=2024-01-15").json()
+        assert daily["score"] == 0
+
+    def test_invalid_weights(self, client, sample_holo_config):
+        """Test weights for unknown questions are rejected"""
+        response = client.post(
+            "/holos/holo",
+            json={**sample_holo_config, "question_weights": {"unknown": 1.0}},
+        )
+        assert response.status_code == 422
+
+
+class TestHoloResponseCacheAPI:
+    @pytest.fixture(autouse=True)
+    def setup_test_data(self, client, test_user, clean_holo_config, monkeypatch):
+        """Enable an in-process response cache for every test in this class"""
+        from src.core import response_cache as response_cache_module
+        from src.core.cache import TTLCache
+
+        monkeypatch.setattr(
+            response_cache_module, "response_cache", TTLCache(maxsize=64, ttl=60)
+        )
+
+    def test_daily_writes_invalidate_cached_reads(self, client, sample_holo_config):
+        """Test cached holo reads reflect daily writes immediately"""
+        client.post("/holos/holo", json=sample_holo_config)
+        daily = {"entry_date": "2024-01-15", "score": 4, "answers": {"q": True}}
+        client.post("/holos/daily", json=daily)
+
+        assert client.get("/holos/avg-score").json() == {"avg_score": 4.0}
+        assert client.get("/holos/daily/latest").json()["score"] == 4
+
+        with patch("src.api.routes.holos.get_avg_score") as mock_avg:
+            assert client.get("/holos/avg-score").json() == {"avg_score": 4.0}
+            mock_avg.assert_not_called()
+
+        client.put("/holos/daily/2024-01-15", json={"score": 8, "answers": {}})
+        assert client.get("/holos/avg-score").json() == {"avg_score": 8.0}
+        assert client.get("/holos/daily/latest").json()["score"] == 8
+
+    def test_config_writes_invalidate_cached_reads(self, client, sample_holo_config):
+        """Test the cached config reflects updates immediately"""
+        client.post("/holos/holo", json=sample_holo_config)
+        assert (
+            client.get("/holos/holo").json()["questions"]
+            == sample_holo_config["questions"]
+        )
+
+        client.put("/holos/holo", json={"questions": ["New question"]})
+        assert client.get("/holos/holo").json()["questions"] == ["New question"]
+
+    def test_not_found_is_not_cached(self, client, sample_holo_config):
+        """Test a 404 is not cached once the holo exists"""
+        assert client.get("/holos/holo").status_code == 404
+        client.post("/holos/holo", json=sample_holo_config)
+        assert client.get("/holos/holo").status_code == 200
+
+
 class TestHoloDailyAPI:
     @pytest.fixture(autouse=True)
     def setup_test_data(self, client, test_user, clean_holo_config):
@@ -312,6 +464,112 @@ class TestHoloDailyAPI:
         assert response.status_code == 422
 
 
+class TestHoloDailyUpsertAPI:
+    @pytest.fixture(autouse=True)
+    def setup_test_data(self, client, test_user, clean_holo_config):
+        """Automatically set up test data for all tests in this class"""
+        pass
+
+    def test_upsert_holo_daily_no_config(self, client):
+        """Test upserting holo daily when no holo config exists"""
+        response = client.put(
+            "/holos/daily/2024-01-15", json={"score": 5, "answers": {"q1": True}}
+        )
+        assert response.status_code == 404
+        assert "No holo config found" in response.json()["detail"]
+
+    def test_upsert_holo_daily_creates_then_updates(
+        self, client, sample_holo_config, sample_holo_daily
+    ):
+        """Test that PUT creates a day and a second PUT edits it in place"""
+        client.post("/holos/holo", json=sample_holo_config)
+
+        created = client.post("/holos/daily", json=sample_holo_daily)
+        assert created.status_code == 200
+
+        updated = client.put(
+            "/holos/daily/2024-01-15", json={"score": 2, "answers": {"q1": False}}
+        )
+        assert updated.status_code == 200
+        data = updated.json()
+        assert data["holo_daily_id"] == created.json()["holo_daily_id"]
+        assert data["entry_date"] == "2024-01-15"
+        assert data["score"] == 2
+        assert data["answers"] == {"q1": False}
+
+        fetched = client.get("/holos/daily?entry_date=2024-01-15")
+        assert fetched.json()["score"] == 2
+
+    def test_upsert_holo_daily_is_idempotent(self, client, sample_holo_config):
+        """Test that re-submitting the same day does not fail"""
+        client.post("/holos/holo", json=sample_holo_config)
+        body = {"score": 7, "answers": {"q1": True}}
+
+        first = client.put("/holos/daily/2024-01-16", json=body)
+        second = client.put("/holos/daily/2024-01-16", json=body)
+
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert first.json()["holo_daily_id"] == second.json()["holo_daily_id"]
+
+    def test_upsert_holo_daily_invalid_date(self, client, sample_holo_config):
+        """Test upserting holo daily with an invalid date in the path"""
+        client.post("/holos/holo", json=sample_holo_config)
+        response = client.put(
+            "/holos/daily/not-a-date", json={"score": 5, "answers": {"q1": True}}
+        )
+        assert response.status_code == 422
+
+
+class TestHoloDailyBatchAPI:
+    @pytest.fixture(autouse=True)
+    def setup_test_data(self, client, test_user, clean_holo_config):
+        """Automatically set up test data for all tests in this class"""
+        pass
+
+    def test_batch_no_config(self, client, sample_holo_daily):
+        """Test batch upsert when no holo config exists"""
+        response = client.post(
+            "/holos/daily/batch", json={"dailies": [sample_holo_daily]}
+        )
+        assert response.status_code == 404
+
+    def test_batch_empty(self, client, sample_holo_config):
+        """Test that an empty batch is rejected"""
+        client.post("/holos/holo", json=sample_holo_config)
+        response = client.post("/holos/daily/batch", json={"dailies": []})
+        assert response.status_code == 422
+
+    def test_batch_backfill(self, client, sample_holo_config, sample_holo_daily):
+        """Test backfilling several days with per-day status"""
+        client.post("/holos/holo", json=sample_holo_config)
+        client.post("/holos/daily", json=sample_holo_daily)
+
+        dailies = [
+            {"entry_date": "2024-01-13", "score": 4, "answers": {"q1": True}},
+            {"entry_date": "2024-01-14", "score": 6, "answers": {"q1": False}},
+            {"entry_date": "2024-01-15", "score": 3, "answers": {"q1": True}},
+            {"entry_date": "2024-13-40", "score": 3, "answers": {"q1": True}},
+        ]
+        response = client.post("/holos/daily/batch", json={"dailies": dailies})
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["created"] == 2
+        assert data["updated"] == 1
+        assert data["failed"] == 1
+        assert [r["status"] for r in data["results"]] == [
+            "created",
+            "created",
+            "updated",
+            "invalid",
+        ]
+
+        fetched = client.get("/holos/daily?entry_date=2024-01-15")
+        assert fetched.json()["score"] == 3
+        assert client.get("/holos/avg-score").json()["avg_score"] == 4.33
+
+
 class TestHoloAvgScoreAPI:
     @pytest.fixture(autouse=True)
     def setup_test_data(self, client, test_user, clean_holo_config):
@@ -428,3 +686,109 @@ class TestHoloCRUDFlow:
         assert (
             avg_response.json()["avg_score"] == 6.67
         )  # (5+8+7)/3 rounded to 2 decimals
+
+
+class TestHoloTimeseriesAPI:
+    @pytest.fixture(autouse=True)
+    def setup_test_data(self, client, test_user, clean_holo_config):
+        """Automatically set up test data for all tests in this class"""
+        from src.core.cache import derived_cache
+
+        derived_cache.clear()
+
+    def test_timeseries_no_config(self, client):
+        """Test getting timeseries when no holo config exists"""
+        response = client.get("/holos/timeseries")
+        assert response.status_code == 404
+
+    def test_timeseries_success(self, client, sample_holo_config):
+        """Test getting rolling statistics for the current user"""
+        client.post("/holos/holo", json=sample_holo_config)
+        dailies = [
+            {"entry_date": "2024-01-01", "score": 4, "answers": {"q1": True}},
+            {"entry_date": "2024-01-02", "score": 8, "answers": {"q1": True}},
+        ]
+        client.post("/holos/daily/batch", json={"dailies": dailies})
+
+        response = client.get("/holos/timeseries")
+        assert response.status_code == 200
+
+        data = response.json()
+        assert [d["ma_7"] for d in data["daily"]] == [4.0, 6.0]
+        assert data["weekly"] == [
+            {"period_start": "2024-01-01", "avg_score": 6.0, "count": 2}
+        ]
+        assert [w["weekday"] for w in data["weekdays"]] == [0, 1]
+
+
+class TestHoloStreakAPI:
+    @pytest.fixture(autouse=True)
+    def setup_test_data(self, client, test_user, clean_holo_config):
+        """Automatically set up test data for all tests in this class"""
+        pass
+
+    def test_streak_no_config(self, client):
+        """Test getting the streak when no holo config exists"""
+        response = client.get("/holos/streak")
+        assert response.status_code == 404
+
+    def test_streak_success(self, client, sample_holo_config):
+        """Test getting the current and longest streak"""
+        client.post("/holos/holo", json=sample_holo_config)
+        for entry_date in ["2024-01-01", "2024-01-02", "2024-01-04"]:
+            client.post(
+                "/holos/daily",
+                json={"entry_date": entry_date, "score": 5, "answers": {"q1": True}},
+            )
+
+        response = client.get("/holos/streak?today=2024-01-05")
+        assert response.status_code == 200
+        assert response.json() == {
+            "current_streak": 1,
+            "longest_streak": 2,
+            "current_streak_start": "2024-01-04",
+            "last_entry_date": "2024-01-04",
+        }
+
+
+class TestHoloAnalyticsAPI:
+    @pytest.fixture(autouse=True)
+    def setup_test_data(self, client, test_user, clean_holo_config):
+        """Automatically set up test data for all tests in this class"""
+        from src.core.cache import derived_cache
+
+        derived_cache.clear()
+
+    def test_analytics_no_config(self, client):
+        """Test getting analytics when no holo config exists"""
+        response = client.get("/holos/analytics")
+        assert response.status_code == 404
+
+    def test_analytics_invalid_period(self, client, sample_holo_config):
+        """Test that an inverted period is rejected"""
+        client.post("/holos/holo", json=sample_holo_config)
+        response = client.get("/holos/analytics?start=2024-02-01&end=2024-01-01")
+        assert response.status_code == 422
+
+    def test_analytics_success(self, client, sample_holo_config):
+        """Test per-question analytics for the configured questions"""
+        client.post("/holos/holo", json=sample_holo_config)
+        question = sample_holo_config["questions"][0]
+        dailies = [
+            {"entry_date": "2024-01-01", "score": 8, "answers": {question: True}},
+            {"entry_date": "2024-01-02", "score": 3, "answers": {question: False}},
+        ]
+        client.post("/holos/daily/batch", json={"dailies": dailies})
+
+        response = client.get("/holos/analytics?end=2024-01-02")
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["dailies"] == 2
+        assert [q["question"] for q in data["questions"]] == sample_holo_config[
+            "questions"
+        ]
+        first = data["questions"][0]
+        assert first["completion_rate"] == 0.5
+        assert first["longest_streak"] == 1
+        assert first["score_correlation"] == 1.0
@@ -0,0 +1,297 @@
+import fnmatch
+import socketserver
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Commands that change a key and so abort transactions watching it
+_WRITES = {"SET", "SADD", "PEXPIRE", "DEL"}
+
+
+class _StandInRedis(socketserver.ThreadingTCPServer):
+    """Minimal in-memory server for the Redis commands the backend uses"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 64
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _StandInHandler)
+        self.data: dict[bytes, tuple] = {}  # key -> (value, expires_at or None)
+        self.versions: dict[bytes, int] = {}  # key -> write count, for WATCH
+        self.lock = threading.Lock()
+
+    def live(self, key):
+        item = self.data.get(key)
+        if item is not None and item[1] is not None and item[1] < time.monotonic():
+            del self.data[key]
+            return None
+        return item
+
+
+class _StandInHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        self.watched: dict[bytes, int] = {}
+        self.queued = None  # commands between MULTI and EXEC
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            args = []
+            for _ in range(int(line[1:-2])):
+                length = int(self.rfile.readline()[1:-2])
+                args.append(self.rfile.read(length + 2)[:-2])
+            with self.server.lock:
+                reply = self.transact(args[0].upper().decode(), args[1:])
+            self.wfile.write(reply)
+
+    def transact(self, command, args):
+        server = self.server
+        if command == "WATCH":
+            for key in args:
+                self.watched[key] = server.versions.get(key, 0)
+            return b"+OK\r\n"
+        if command == "UNWATCH":
+            self.watched = {}
+            return b"+OK\r\n"
+        if command == "MULTI":
+            self.queued = []
+            return b"+OK\r\n"
+        if command == "EXEC":
+            queued, self.queued = self.queued, None
+            watched, self.watched = self.watched, {}
+            if any(server.versions.get(k, 0) != v for k, v in watched.items()):
+                return b"*-1\r\n"
+            return b"*%d\r\n" % len(queued) + b"".join(
+                self.dispatch(*queued_command) for queued_command in queued
+            )
+        if self.queued is not None:
+            self.queued.append((command, args))
+            return b"+QUEUED\r\n"
+        return self.dispatch(command, args)
+
+    def dispatch(self, command, args):
+        server = self.server
+        if command in _WRITES:
+            for key in args[:1] if command != "DEL" else args:
+                server.versions[key] = server.versions.get(key, 0) + 1
+        if command == "GET":
+            item = server.live(args[0])
+            return b"$-1\r\n" if item is None else _bulk(item[0])
+        if command == "SET":
+            expires_at = time.monotonic() + int(args[3]) / 1000 if args[2:] else None
+            server.data[args[0]] = (args[1], expires_at)
+            return b"+OK\r\n"
+        if command == "SADD":
+            item = server.live(args[0]) or (set(), None)
+            item[0].update(args[1:])
+            server.data[args[0]] = item
+            return b":1\r\n"
+        if command == "PEXPIRE":
+            item = server.live(args[0])
+            if item is not None:
+                server.data[args[0]] = (item[0], time.monotonic() + int(args[1]) / 1000)
+            return b":1\r\n"
+        if command == "SMEMBERS":
+            item = server.live(args[0])
+            members = sorted(item[0]) if item else []
+            return b"*%d\r\n" % len(members) + b"".join(map(_bulk, members))
+        if command == "DEL":
+            deleted = sum(server.data.pop(key, None) is not None for key in args)
+            return b":%d\r\n" % deleted
+        if command == "SCAN":
+            pattern = args[2].decode()
+            keys = [k for k in server.data if fnmatch.fnmatch(k.decode(), pattern)]
+            return (
+                b"*2\r\n"
+                + _bulk(b"0")
+                + b"*%d\r\n" % len(keys)
+                + b"".join(map(_bulk, keys))
+            )
+        return b"-ERR unknown command\r\n"
+
+
+def _bulk(value: bytes) -> bytes:
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+@pytest.fixture()
+def redis_url():
+    server = _StandInRedis()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"redis://127.0.0.1:{server.server_address[1]}/0"
+    server.shutdown()
+    server.server_close()
+
+
+def _read_varint(data: bytes, i: int) -> tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[i]
+        i += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, i
+
+
+def snappy_decompress(data: bytes) -> bytes:
+    """Decode snappy block format (literals and 1/2/4-byte offset copies)"""
+    length, i = _read_varint(data, 0)
+    out = bytearray()
+    while i < len(data):
+        tag = data[i]
+        i += 1
+        kind = tag & 3
+        if kind == 0:
+            n = tag >> 2
+            if n >= 60:
+                size = n - 59
+                n = int.from_bytes(data[i : i + size], "little")
+                i += size
+            out += data[i : i + n + 1]
+            i += n + 1
+            continue
+        if kind == 1:
+            n, offset = 4 + (tag >> 2 & 7), (tag >> 5) << 8 | data[i]
+            i += 1
+        else:
+            size = 2 if kind == 2 else 4
+            n, offset = (tag >> 2) + 1, int.from_bytes(data[i : i + size], "little")
+            i += size
+        for _ in range(n):
+            out.append(out[-offset])
+    assert len(out) == length
+    return bytes(out)
+
+
+def _fields(data: bytes):
+    """Yield (field number, value) from a protobuf message"""
+    i = 0
+    while i < len(data):
+        key, i = _read_varint(data, i)
+        number, wire_type = key >> 3, key & 7
+        if wire_type == 0:
+            value, i = _read_varint(data, i)
+        elif wire_type == 1:
+            value, i = struct.unpack("<d", data[i : i + 8])[0], i + 8
+        else:
+            size, i = _read_varint(data, i)
+            value, i = data[i : i + size], i + size
+        yield number, value
+
+
+def decode_write_request(body: bytes) -> list[tuple[dict, list]]:
+    """WriteRequest protobuf as [(labels, [(value, timestamp_ms)])]"""
+    series = []
+    for _, raw in _fields(body):
+        labels, samples = {}, []
+        for number, value in _fields(raw):
+            fields = dict(_fields(value))
+            if number == 1:
+                labels[fields[1].decode()] = fields.get(2, b"").decode()
+            else:
+                samples.append((fields.get(1, 0.0), fields.get(2, 0)))
+        series.append((labels, samples))
+    return series
+
+
+class _StandInReceiver(ThreadingHTTPServer):
+    """Records remote-write requests and answers with scripted statuses"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _ReceiverHandler)
+        self.requests: list[tuple[dict, bytes]] = []
+        self.statuses: list[int] = []  # consumed per request; then 204
+
+    def series(self) -> list[tuple[dict, list]]:
+        """Every time series received so far, decoded"""
+        return [
+            s
+            for headers, body in self.requests
+            for s in decode_write_request(snappy_decompress(body))
+        ]
+
+
+class _ReceiverHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        server = self.server
+        status = server.statuses.pop(0) if server.statuses else 204
+        if status < 300:
+            server.requests.append((dict(self.headers), body))
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def remote_write_receiver():
+    server = _StandInReceiver()
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/api/v1/remote_write"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class _StandInCollector(ThreadingHTTPServer):
+    """Records spans posted to an OTLP/HTTP (protobuf) traces endpoint"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _CollectorHandler)
+        self.bodies: list[bytes] = []
+
+    def spans(self) -> list:
+        """Every span received so far (opentelemetry.proto Span messages)"""
+        from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import (
+            ExportTraceServiceRequest,
+        )
+
+        spans = []
+        for body in self.bodies:
+            request = ExportTraceServiceRequest()
+            request.ParseFromString(body)
+            for resource_spans in request.resource_spans:
+                for scope_spans in resource_spans.scope_spans:
+                    spans.extend(scope_spans.spans)
+        return spans
+
+
+class _CollectorHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.server.bodies.append(self.rfile.read(int(self.headers["Content-Length"])))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-protobuf")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def otlp_collector():
+    server = _StandInCollector()
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/v1/traces"
+    yield server
+    server.shutdown()
+    server.server_close()
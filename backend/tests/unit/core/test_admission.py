@@ -0,0 +1,107 @@
+import asyncio
+
+from src.core.admission import AdmissionControlMiddleware
+
+
+class _SlowApp:
+    """ASGI app that holds each request (except health checks) until released"""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.started = 0
+
+    async def __call__(self, scope, receive, send):
+        self.started += 1
+        if not scope["path"].startswith("/api/health"):
+            await self.release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def _request(app, path="/entries"):
+    """Run one request through the ASGI app; returns (status, headers)"""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path, "headers": []}
+    await app(scope, receive, send)
+    start = messages[0]
+    return start["status"], dict(start["headers"])
+
+
+class TestAdmissionControl:
+    def test_admits_up_to_limit_then_queues(self):
+        """Test that queued requests run once a slot frees up"""
+
+        async def main():
+            inner = _SlowApp()
+            app = AdmissionControlMiddleware(
+                inner, max_in_flight=1, max_queue=1, queue_timeout=5
+            )
+            first = asyncio.ensure_future(_request(app))
+            second = asyncio.ensure_future(_request(app))
+            await asyncio.sleep(0.01)
+            assert (inner.started, app.queue_depth()) == (1, 1)
+            inner.release.set()
+            statuses = [(await first)[0], (await second)[0]]
+            return statuses, app.in_flight
+
+        assert asyncio.run(main()) == ([200, 200], 0)
+
+    def test_sheds_when_queue_full(self):
+        """Test that requests beyond the queue get 503 with Retry-After"""
+
+        async def main():
+            inner = _SlowApp()
+            app = AdmissionControlMiddleware(
+                inner, max_in_flight=1, max_queue=1, queue_timeout=5, retry_after=2
+            )
+            running = [asyncio.ensure_future(_request(app)) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            status, headers = await _request(app)
+            inner.release.set()
+            await asyncio.gather(*running)
+            return status, headers
+
+        status, headers = asyncio.run(main())
+        assert status == 503
+        assert headers[b"retry-after"] == b"2"
+
+    def test_sheds_after_queue_timeout(self):
+        """Test that a queued request gives up after the timeout"""
+
+        async def main():
+            inner = _SlowApp()
+            app = AdmissionControlMiddleware(
+                inner, max_in_flight=1, max_queue=4, queue_timeout=0.05
+            )
+            running = asyncio.ensure_future(_request(app))
+            await asyncio.sleep(0.01)
+            status, _ = await _request(app)
+            depth = app.queue_depth()
+            inner.release.set()
+            await running
+            return status, depth, app.in_flight
+
+        assert asyncio.run(main()) == (503, 0, 0)
+
+    def test_health_bypasses_limit(self):
+        """Test that health checks are answered while the worker is saturated"""
+
+        async def main():
+            inner = _SlowApp()
+            app = AdmissionControlMiddleware(inner, max_in_flight=1, max_queue=0)
+            running = asyncio.ensure_future(_request(app))
+            await asyncio.sleep(0.01)
+            health = await _request(app, "/api/health/ping")
+            shed = await _request(app)
+            inner.release.set()
+            await running
+            return health[0], shed[0]
+
+        assert asyncio.run(main()) == (200, 503)
@@ -6,9 +6,9 @@ from src.core.auth import verify_token, verify_token_and_ensure_user
 class TestAuthCore:
     def test_verify_token_success(self):
         """Test successful token verification"""
-        with patch("src.core.auth.auth.verify_id_token") as mock_verify, patch(
+        with patch("firebase_admin.auth.verify_id_token") as mock_verify, patch(
             "src.core.auth.initialize_firebase"
-        ) as mock_init, patch("src.core.auth.firebase_admin.get_app") as mock_get_app:
+        ) as mock_init, patch("firebase_admin.get_app") as mock_get_app:
             mock_init.return_value = True
             mock_get_app.return_value = MagicMock()
             mock_verify.return_value = {"uid": "test-user", "email": "test@example.com"}
@@ -18,9 +18,9 @@ class TestAuthCore:
 
     def test_verify_token_failure(self):
         """Test token verification failure"""
-        with patch("src.core.auth.auth.verify_id_token") as mock_verify, patch(
+        with patch("firebase_admin.auth.verify_id_token") as mock_verify, patch(
             "src.core.auth.initialize_firebase"
-        ) as mock_init, patch("src.core.auth.firebase_admin.get_app") as mock_get_app:
+        ) as mock_init, patch("firebase_admin.get_app") as mock_get_app:
             mock_init.return_value = True
             mock_get_app.return_value = MagicMock()
             mock_verify.side_effect = Exception("Invalid token")
@@ -30,11 +30,9 @@ class TestAuthCore:
 
     def test_verify_token_and_ensure_user_success(self):
         """Test successful token verification with user creation"""
-        with patch("src.core.auth.auth.verify_id_token") as mock_verify, patch(
+        with patch("firebase_admin.auth.verify_id_token") as mock_verify, patch(
             "src.core.auth.initialize_firebase"
-        ) as mock_init, patch(
-            "src.core.auth.firebase_admin.get_app"
-        ) as mock_get_app, patch(
+        ) as mock_init, patch("firebase_admin.get_app") as mock_get_app, patch(
             "src.core.auth.SessionLocal"
         ) as mock_session_local, patch(
             "src.core.auth.ensure_user_exists"
@@ -58,9 +56,9 @@ class TestAuthCore:
 
     def test_verify_token_and_ensure_user_invalid_token(self):
         """Test token verification with invalid token"""
-        with patch("src.core.auth.auth.verify_id_token") as mock_verify, patch(
+        with patch("firebase_admin.auth.verify_id_token") as mock_verify, patch(
             "src.core.auth.initialize_firebase"
-        ) as mock_init, patch("src.core.auth.firebase_admin.get_app") as mock_get_app:
+        ) as mock_init, patch("firebase_admin.get_app") as mock_get_app:
             mock_init.return_value = True
             mock_get_app.return_value = MagicMock()
             mock_verify.side_effect = Exception("Invalid token")
@@ -70,9 +68,9 @@ class TestAuthCore:
 
     def test_verify_token_and_ensure_user_no_token(self):
         """Test token verification with None token"""
-        with patch("src.core.auth.auth.verify_id_token") as mock_verify, patch(
+        with patch("firebase_admin.auth.verify_id_token") as mock_verify, patch(
             "src.core.auth.initialize_firebase"
-        ) as mock_init, patch("src.core.auth.firebase_admin.get_app") as mock_get_app:
+        ) as mock_init, patch("firebase_admin.get_app") as mock_get_app:
             mock_init.return_value = True
             mock_get_app.return_value = MagicMock()
             mock_verify.return_value = None
@@ -82,11 +80,9 @@ class TestAuthCore:
 
     def test_verify_token_and_ensure_user_no_user_data(self):
         """Test token verification when user creation fails"""
-        with patch("src.core.auth.auth.verify_id_token") as mock_verify, patch(
+        with patch("firebase_admin.auth.verify_id_token") as mock_verify, patch(
             "src.core.auth.initialize_firebase"
-        ) as mock_init, patch(
-            "src.core.auth.firebase_admin.get_app"
-        ) as mock_get_app, patch(
+        ) as mock_init, patch("firebase_admin.get_app") as mock_get_app, patch(
             "src.core.auth.SessionLocal"
         ) as mock_session_local, patch(
             "src.core.auth.ensure_user_exists"
@@ -105,9 +101,9 @@ class TestAuthCore:
 
     def test_verify_token_and_ensure_user_exception(self):
         """Test token verification when exception occurs"""
-        with patch("src.core.auth.auth.verify_id_token") as mock_verify, patch(
+        with patch("firebase_admin.auth.verify_id_token") as mock_verify, patch(
             "src.core.auth.initialize_firebase"
-        ) as mock_init, patch("src.core.auth.firebase_admin.get_app") as mock_get_app:
+        ) as mock_init, patch("firebase_admin.get_app") as mock_get_app:
             mock_init.return_value = True
             mock_get_app.return_value = MagicMock()
             mock_verify.side_effect = Exception("Firebase error")
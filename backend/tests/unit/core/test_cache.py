@@ -0,0 +1,124 @@
+import time
+from unittest.mock import patch
+
+from src.core.cache import RedisCache, TTLCache
+
+
+class TestTTLCache:
+    def test_get_set(self):
+        """Test basic get/set and default on miss"""
+        cache = TTLCache(maxsize=4, ttl=60)
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        assert cache.get("missing", "default") == "default"
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first"""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_ttl_expiry(self):
+        """Test that entries expire after their TTL"""
+        cache = TTLCache(maxsize=4, ttl=10)
+        with patch("src.core.cache.time.monotonic", return_value=100.0):
+            cache.set("a", 1)
+        with patch("src.core.cache.time.monotonic", return_value=105.0):
+            assert cache.get("a") == 1
+        with patch("src.core.cache.time.monotonic", return_value=111.0):
+            assert cache.get("a") is None
+
+    def test_invalidate_tag(self):
+        """Test that tag invalidation drops only tagged entries"""
+        cache = TTLCache(maxsize=8, ttl=60)
+        cache.set("a", 1, tags=["holo:1"])
+        cache.set("b", 2, tags=["holo:1", "holo:2"])
+        cache.set("c", 3, tags=["holo:2"])
+
+        assert cache.invalidate_tag("holo:1") == 2
+        assert cache.get("a") is None
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+        assert cache.invalidate_tag("holo:1") == 0
+
+    def test_set_if_unchanged(self):
+        """Test that a value loaded before an invalidation is not stored"""
+        cache = TTLCache(maxsize=8, ttl=60)
+        generation = cache.generation("a", ["holo:1"])
+        assert cache.set_if_unchanged("a", 1, generation, tags=["holo:1"])
+        assert cache.get("a") == 1
+
+        for invalidate in (
+            lambda: cache.invalidate_tag("holo:1"),
+            lambda: cache.invalidate("a"),
+            cache.clear,
+        ):
+            generation = cache.generation("a", ["holo:1"])
+            invalidate()
+            assert not cache.set_if_unchanged("a", 2, generation, tags=["holo:1"])
+            assert cache.get("a") is None
+
+        # Writes to other keys and tags do not matter
+        generation = cache.generation("a", ["holo:1"])
+        cache.invalidate("b")
+        cache.invalidate_tag("holo:2")
+        assert cache.set_if_unchanged("a", 3, generation, tags=["holo:1"])
+
+
+class TestRedisCache:
+    def test_get_set(self, redis_url):
+        """Test basic get/set of bytes and default on miss"""
+        cache = RedisCache(redis_url, ttl=60)
+        cache.set("a", b"1")
+        assert cache.get("a") == b"1"
+        assert cache.get("missing", b"default") == b"default"
+
+    def test_ttl_expiry(self, redis_url):
+        """Test that entries expire server-side after their TTL"""
+        cache = RedisCache(redis_url, ttl=60)
+        cache.set("a", b"1", ttl=0.05)
+        assert cache.get("a") == b"1"
+        time.sleep(0.1)
+        assert cache.get("a") is None
+
+    def test_invalidate_tag(self, redis_url):
+        """Test that tag invalidation drops only tagged entries"""
+        cache = RedisCache(redis_url, ttl=60)
+        cache.set("a", b"1", tags=["holo:1"])
+        cache.set("b", b"2", tags=["holo:1", "holo:2"])
+        cache.set("c", b"3", tags=["holo:2"])
+
+        assert cache.invalidate_tag("holo:1") == 2
+        assert cache.get("a") is None
+        assert cache.get("b") is None
+        assert cache.get("c") == b"3"
+        assert cache.invalidate_tag("holo:1") == 0
+
+    def test_shared_between_instances(self, redis_url):
+        """Test that invalidation on one worker's client reaches the others"""
+        first, second = RedisCache(redis_url), RedisCache(redis_url)
+        first.set("a", b"1", tags=["entries:u"])
+        assert second.get("a") == b"1"
+        second.invalidate_tag("entries:u")
+        assert first.get("a") is None
+
+    def test_clear_only_own_prefix(self, redis_url):
+        """Test that clear leaves keys of other prefixes alone"""
+        ours, theirs = RedisCache(redis_url), RedisCache(redis_url, prefix="other:")
+        ours.set("a", b"1")
+        theirs.set("a", b"2")
+        ours.clear()
+        assert ours.get("a") is None
+        assert theirs.get("a") == b"2"
+
+    def test_server_unavailable_is_a_miss(self):
+        """Test that connection errors never propagate"""
+        cache = RedisCache("redis://127.0.0.1:1/0", timeout=0.1)
+        cache.set("a", b"1", tags=["t"])
+        assert cache.get("a") is None
+        assert cache.invalidate_tag("t") == 0
@@ -0,0 +1,86 @@
+import asyncio
+import contextvars
+import threading
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from src.core.executors import BoundedExecutor, DBRoute
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+@pytest.fixture()
+def executor():
+    executor = BoundedExecutor("test", max_workers=1)
+    yield executor
+    executor.shutdown()
+
+
+class TestBoundedExecutor:
+    def test_run_returns_result(self, executor):
+        """Test that the call runs on the pool and its result is awaited"""
+
+        def call(a, b=0):
+            return threading.current_thread().name, a + b
+
+        name, total = asyncio.run(executor.run(call, 1, b=2))
+        assert name.startswith("test-executor")
+        assert total == 3
+
+    def test_run_propagates_errors(self, executor):
+        """Test that exceptions are re-raised in the caller"""
+
+        def call():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            asyncio.run(executor.run(call))
+
+    def test_context_is_copied(self, executor):
+        """Test that the call sees the caller's context variables"""
+
+        async def main():
+            request_id.set("abc")
+            return await executor.run(request_id.get)
+
+        assert asyncio.run(main()) == "abc"
+
+    def test_queue_depth(self, executor):
+        """Test that calls waiting for a thread are counted until they start"""
+        release = threading.Event()
+
+        async def main():
+            first = asyncio.ensure_future(executor.run(release.wait))
+            second = asyncio.ensure_future(executor.run(lambda: "done"))
+            await asyncio.sleep(0.05)
+            assert executor.queue_depth() == 1
+            release.set()
+            return await first, await second
+
+        assert asyncio.run(main()) == (True, "done")
+        assert executor.queue_depth() == 0
+
+
+class TestDBRoute:
+    def test_sync_endpoint_runs_on_db_executor(self):
+        """Test that sync endpoints are moved off AnyIO's threadpool"""
+        router = APIRouter(route_class=DBRoute)
+
+        @router.get("/thread")
+        def sync_endpoint(value: int = 0):
+            return {"thread": threading.current_thread().name, "value": value}
+
+        @router.get("/async")
+        async def async_endpoint():
+            return {"thread": threading.current_thread().name}
+
+        app = FastAPI()
+        app.include_router(router)
+        client = TestClient(app)
+
+        response = client.get("/thread", params={"value": 3})
+        assert response.status_code == 200
+        assert response.json()["thread"].startswith("db-executor")
+        assert response.json()["value"] == 3
+        assert not client.get("/async").json()["thread"].startswith("db-executor")
@@ -0,0 +1,197 @@
+import io
+import json
+import logging
+import queue
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.core.logs import (
+    ACCESS_LOGGER,
+    SERVER_ACCESS_LOGGERS,
+    SERVER_LOGGERS,
+    DroppingQueueHandler,
+    LogPipeline,
+    RateLimitFilter,
+    RequestContextMiddleware,
+    route_server_logs,
+)
+
+
+@pytest.fixture()
+def pipeline():
+    """Pipeline writing JSON lines to a buffer, fed by the test loggers only"""
+    stream = io.StringIO()
+    pipeline = LogPipeline(stream, fmt="json", rate_limit=RateLimitFilter(3, 60))
+    pipeline.start()
+    loggers = [logging.getLogger("test.logs"), logging.getLogger(ACCESS_LOGGER)]
+    for logger in loggers:
+        logger.addHandler(pipeline.handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+    def records():
+        pipeline.stop()
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    pipeline.records = records
+    yield pipeline
+    pipeline.stop()
+    for logger in loggers:
+        logger.removeHandler(pipeline.handler)
+        logger.propagate = True
+
+
+def _app():
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        logging.getLogger("test.logs").info("reading %d", item_id)
+        return {"item_id": item_id}
+
+    app.add_middleware(RequestContextMiddleware)
+    return app
+
+
+class TestRequestContext:
+    def test_records_carry_request_fields(self, pipeline):
+        """Test that records logged in a request have its ID, route and latency"""
+        response = TestClient(_app()).get("/items/3")
+        request_id = response.headers["x-request-id"]
+
+        handler, access = pipeline.records()
+        assert handler["message"] == "reading 3"
+        assert handler["logger"] == "test.logs"
+        assert handler["request_id"] == request_id
+        assert handler["method"] == "GET"
+        assert handler["route"] == "/items/{item_id}"
+        assert handler["latency_ms"] >= 0
+
+        assert access["logger"] == ACCESS_LOGGER
+        assert access["message"] == "GET /items/3 200"
+        assert access["status"] == 200
+        assert access["request_id"] == request_id
+        assert access["latency_ms"] >= handler["latency_ms"]
+
+    def test_incoming_request_id_kept(self, pipeline):
+        """Test that a caller-supplied X-Request-ID is reused"""
+        response = TestClient(_app()).get(
+            "/items/1", headers={"X-Request-ID": "abc-123"}
+        )
+        assert response.headers["x-request-id"] == "abc-123"
+        assert {r["request_id"] for r in pipeline.records()} == {"abc-123"}
+
+    def test_outside_request(self, pipeline):
+        """Test that records logged outside a request have no request fields"""
+        logging.getLogger("test.logs").info("startup")
+        (record,) = pipeline.records()
+        assert "request_id" not in record
+
+
+class TestRateLimitFilter:
+    def test_repeated_warnings_suppressed(self, pipeline):
+        """Test that a repeated warning is capped per message template"""
+        logger = logging.getLogger("test.logs")
+        for i in range(10):
+            logger.warning("Invalid token: %s", i)
+        logger.warning("Another warning")
+        for i in range(5):
+            logger.info("info %d", i)
+
+        messages = [r["message"] for r in pipeline.records()]
+        assert messages[:3] == [
+            "Invalid token: 0",
+            "Invalid token: 1",
+            "Invalid token: 2",
+        ]
+        assert "Invalid token: 3" not in messages
+        assert "Another warning" in messages
+        # Below the warning level nothing is limited
+        assert sum(m.startswith("info") for m in messages) == 5
+
+    def test_suppressed_count_reported(self):
+        """Test that the first record of a new window counts the suppressed ones"""
+        limit = RateLimitFilter(burst=1, period=60)
+        records = [
+            logging.makeLogRecord({"msg": "same", "levelno": logging.WARNING})
+            for _ in range(4)
+        ]
+        assert [limit.filter(r) for r in records] == [True, False, False, False]
+
+        limit.period = 0  # the window has passed
+        record = logging.makeLogRecord({"msg": "same", "levelno": logging.WARNING})
+        assert limit.filter(record)
+        assert record.suppressed == 3
+
+
+class TestDroppingQueueHandler:
+    def test_full_queue_drops_without_blocking(self):
+        """Test that logging never waits for the writer"""
+        handler = DroppingQueueHandler(queue.Queue(2))
+        logger = logging.getLogger("test.logs.full")
+        logger.addHandler(handler)
+        logger.propagate = False
+        try:
+            done = threading.Event()
+
+            def log_many():
+                for i in range(100):
+                    logger.error("record %d", i)
+                done.set()
+
+            threading.Thread(target=log_many).start()
+            assert done.wait(5)
+        finally:
+            logger.removeHandler(handler)
+            logger.propagate = True
+
+        assert handler.queue.qsize() == 2
+        assert handler.dropped == 98
+
+    def test_exception_kept_separate(self, pipeline):
+        """Test that tracebacks go in their own field"""
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logging.getLogger("test.logs").exception("failed")
+
+        (record,) = pipeline.records()
+        assert record["message"] == "failed"
+        assert "ValueError: boom" in record["exception"]
+
+
+class TestServerLogs:
+    @pytest.fixture()
+    def server_loggers(self):
+        loggers = [
+            logging.getLogger(name) for name in SERVER_LOGGERS + SERVER_ACCESS_LOGGERS
+        ]
+        saved = [(lg.handlers[:], lg.propagate, lg.level) for lg in loggers]
+        yield loggers
+        for logger, (handlers, propagate, level) in zip(loggers, saved):
+            logger.handlers = handlers
+            logger.propagate = propagate
+            logger.setLevel(level)
+
+    def test_server_loggers_propagate(self, server_loggers, pipeline):
+        """Test that gunicorn/uvicorn records reach the pipeline, not a stream"""
+        for logger in server_loggers:
+            # What gunicorn and the uvicorn worker set up
+            logger.addHandler(logging.StreamHandler(io.StringIO()))
+            logger.propagate = False
+        root = logging.getLogger()
+        root.addHandler(pipeline.handler)
+        try:
+            route_server_logs()
+            assert all(not lg.handlers and lg.propagate for lg in server_loggers)
+
+            logging.getLogger("uvicorn.error").warning("worker booted")
+            logging.getLogger("uvicorn.access").info("GET / 200")
+        finally:
+            root.removeHandler(pipeline.handler)
+
+        (record,) = pipeline.records()
+        assert record["logger"] == "uvicorn.error"
+        assert record["message"] == "worker booted"
@@ -0,0 +1,74 @@
+import glob
+import os
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from src.core import multiprocess
+from src.core.multiprocess import enable_multiprocess, mark_process_dead
+from src.core.server import gunicorn_options
+from src.scripts.bench_metrics_scrape import run_worker
+
+
+def _values(path):
+    """Merged scrape as {(sample name, labels): value}"""
+    return {
+        (s.name, tuple(sorted(s.labels.items()))): s.value
+        for metric in multiprocess.scrape_registry(path).collect()
+        for s in metric.samples
+    }
+
+
+@pytest.fixture()
+def metrics_dir(tmp_path):
+    return str(tmp_path)
+
+
+class TestMultiprocessMetrics:
+    def test_scrape_merges_workers(self, metrics_dir):
+        """Test that a scrape sums every worker's values"""
+        for _ in range(2):
+            run_worker(metrics_dir, routes=2, requests=3)
+        values = _values(metrics_dir)
+        route = (("handler", "/route/0"), ("method", "GET"), ("status", "2xx"))
+        assert values[("http_requests_total", route)] == 6
+        assert values[("in_flight", ())] == 2
+
+    def test_dead_worker_archived(self, metrics_dir):
+        """Test that totals survive cleanup while live gauges and files go"""
+        first = run_worker(metrics_dir, routes=2, requests=3)
+        run_worker(metrics_dir, routes=2, requests=1)
+        before = _values(metrics_dir)
+
+        mark_process_dead(first, metrics_dir)
+
+        after = _values(metrics_dir)
+        assert after[("in_flight", ())] == 1
+        del before[("in_flight", ())], after[("in_flight", ())]
+        assert after == before
+        assert not glob.glob(os.path.join(metrics_dir, f"*_{first}.db"))
+
+    def test_archive_accumulates_across_workers(self, metrics_dir):
+        """Test that archiving several workers keeps one file per type"""
+        for _ in range(3):
+            mark_process_dead(run_worker(metrics_dir, routes=1), metrics_dir)
+        files = sorted(os.path.basename(f) for f in glob.glob(f"{metrics_dir}/*.db"))
+        assert files == ["counter_archive.db", "histogram_archive.db"]
+        values = _values(metrics_dir)
+        route = (("handler", "/route/0"), ("method", "GET"), ("status", "2xx"))
+        assert values[("http_requests_total", route)] == 3
+
+    def test_enable_clears_previous_run(self, metrics_dir, monkeypatch):
+        """Test that startup removes files left by an earlier server"""
+        monkeypatch.delenv(multiprocess.ENV, raising=False)
+        run_worker(metrics_dir)
+        assert enable_multiprocess(metrics_dir) == metrics_dir
+        assert os.environ[multiprocess.ENV] == metrics_dir
+        assert not glob.glob(os.path.join(metrics_dir, "*.db"))
+
+    def test_gunicorn_cleans_up_workers(self):
+        """Test that the master archives each exiting worker"""
+        child_exit = gunicorn_options(2)["child_exit"]
+        with patch("src.core.server.mark_process_dead") as mark:
+            child_exit(None, SimpleNamespace(pid=4242))
+        mark.assert_called_once_with(4242)
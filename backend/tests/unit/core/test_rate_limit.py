@@ -0,0 +1,81 @@
+import threading
+from unittest.mock import patch
+
+from src.core.rate_limit import Budget, MemoryRateLimiter, RedisRateLimiter
+
+BUDGET = Budget(rate=1, burst=3)
+
+
+class TestMemoryRateLimiter:
+    def test_burst_then_reject(self):
+        """Test that a full bucket admits a burst and then rejects"""
+        limiter = MemoryRateLimiter()
+        with patch("src.core.rate_limit.time.monotonic", return_value=100.0):
+            decisions = [limiter.take("read:u", BUDGET) for _ in range(4)]
+
+        assert [d.allowed for d in decisions] == [True, True, True, False]
+        assert [d.remaining for d in decisions] == [2, 1, 0, 0]
+        assert decisions[-1].retry_after == 1.0
+        assert decisions[-1].headers()["Retry-After"] == "1"
+        assert decisions[0].headers()["RateLimit-Limit"] == "3"
+
+    def test_refill(self):
+        """Test that tokens come back at the budget's rate"""
+        limiter = MemoryRateLimiter()
+        with patch("src.core.rate_limit.time.monotonic", return_value=100.0):
+            for _ in range(3):
+                limiter.take("read:u", BUDGET)
+        with patch("src.core.rate_limit.time.monotonic", return_value=101.0):
+            assert limiter.take("read:u", BUDGET).allowed
+            assert not limiter.take("read:u", BUDGET).allowed
+        with patch("src.core.rate_limit.time.monotonic", return_value=110.0):
+            assert limiter.take("read:u", BUDGET).remaining == 2
+
+    def test_buckets_are_per_key(self):
+        """Test that one user's bucket does not drain another's"""
+        limiter = MemoryRateLimiter()
+        with patch("src.core.rate_limit.time.monotonic", return_value=100.0):
+            for _ in range(3):
+                limiter.take("read:a", BUDGET)
+            assert not limiter.take("read:a", BUDGET).allowed
+            assert limiter.take("read:b", BUDGET).allowed
+            assert limiter.take("write:a", BUDGET).allowed
+
+
+class TestRedisRateLimiter:
+    def test_burst_then_reject(self, redis_url):
+        """Test that the shared bucket admits a burst and then rejects"""
+        limiter = RedisRateLimiter(redis_url)
+        with patch("src.core.rate_limit.time.time", return_value=1000.0):
+            decisions = [limiter.take("read:u", BUDGET) for _ in range(4)]
+        assert [d.allowed for d in decisions] == [True, True, True, False]
+
+    def test_shared_between_instances(self, redis_url):
+        """Test that workers draw from the same bucket"""
+        first, second = RedisRateLimiter(redis_url), RedisRateLimiter(redis_url)
+        with patch("src.core.rate_limit.time.time", return_value=1000.0):
+            for _ in range(3):
+                first.take("read:u", BUDGET)
+            assert not second.take("read:u", BUDGET).allowed
+
+    def test_concurrent_takes_never_exceed_burst(self, redis_url):
+        """Test that racing requests cannot overdraw the bucket"""
+        limiter = RedisRateLimiter(redis_url, timeout=5, retries=50)
+        budget = Budget(rate=0.001, burst=5)
+        results = []
+
+        def take():
+            results.append(limiter.take("write:u", budget).allowed)
+
+        threads = [threading.Thread(target=take) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sum(results) == 5
+
+    def test_server_unavailable_allows(self):
+        """Test that a limiter outage never fails the request"""
+        limiter = RedisRateLimiter("redis://127.0.0.1:1/0", timeout=0.1)
+        for _ in range(5):
+            assert limiter.take("read:u", BUDGET).allowed
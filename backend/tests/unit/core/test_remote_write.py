@@ -0,0 +1,131 @@
+from unittest.mock import patch
+
+from prometheus_client import CollectorRegistry, Counter, Gauge
+from src.core.metrics import AMPRemoteWrite
+
+LABELS = {"job": "test", "instance": "host:1"}
+
+
+def _writer(url, registry, **kwargs):
+    options = dict(
+        registry=registry, sigv4=False, labels=LABELS, backoff=0.01, max_retries=2
+    )
+    options.update(kwargs)
+    return AMPRemoteWrite(url, **options)
+
+
+def _registry():
+    registry = CollectorRegistry()
+    Counter("jobs", "Jobs run", ["kind"], registry=registry).labels(kind="a").inc(3)
+    Gauge("temperature", "Temperature", registry=registry).set(21.5)
+    return registry
+
+
+class TestAMPRemoteWrite:
+    def test_sends_registry_snapshot(self, remote_write_receiver):
+        """Test that collected samples arrive as a snappy protobuf WriteRequest"""
+        writer = _writer(remote_write_receiver.url, _registry())
+        with patch("src.core.metrics.time.time", return_value=1700000000.0):
+            assert writer.collect() == 2
+        assert writer.flush()
+
+        headers, _ = remote_write_receiver.requests[0]
+        assert headers["Content-Encoding"] == "snappy"
+        assert headers["Content-Type"] == "application/x-protobuf"
+        series = {s[0]["__name__"]: s for s in remote_write_receiver.series()}
+        labels, samples = series["jobs_total"]
+        assert labels == {**LABELS, "__name__": "jobs_total", "kind": "a"}
+        assert samples == [(3.0, 1700000000000)]
+        assert series["temperature"][1] == [(21.5, 1700000000000)]
+        assert writer.buffered() == 0
+
+    def test_batches_and_compresses_large_payloads(self, remote_write_receiver):
+        """Test that large snapshots are split into batches that round-trip"""
+        registry = CollectorRegistry()
+        gauge = Gauge("queue_depth", "Depth", ["queue"], registry=registry)
+        for i in range(500):
+            gauge.labels(queue=f"queue-{i:04d}").set(i)
+        writer = _writer(remote_write_receiver.url, registry, batch_size=200)
+        writer.collect()
+        assert writer.flush()
+
+        assert len(remote_write_receiver.requests) == 3
+        received = {s[0]["queue"]: s[1][0][0] for s in remote_write_receiver.series()}
+        assert received == {f"queue-{i:04d}": float(i) for i in range(500)}
+        # Label names repeat in every series, so the body must shrink
+        _, body = remote_write_receiver.requests[0]
+        assert len(body) < 200 * 40
+
+    def test_retries_server_errors(self, remote_write_receiver):
+        """Test that 5xx and 429 responses are retried with backoff"""
+        remote_write_receiver.statuses = [503, 429]
+        writer = _writer(remote_write_receiver.url, _registry())
+        writer.collect()
+        assert writer.flush()
+        assert len(remote_write_receiver.series()) == 2
+
+    def test_failed_batch_kept_for_next_round(self, remote_write_receiver):
+        """Test that a batch failing every retry stays buffered"""
+        remote_write_receiver.statuses = [500] * 3
+        writer = _writer(remote_write_receiver.url, _registry())
+        writer.collect()
+        assert not writer.flush()
+        assert writer.buffered() == 2
+        assert writer.flush()
+        assert len(remote_write_receiver.series()) == 2
+
+    def test_client_errors_dropped(self, remote_write_receiver):
+        """Test that a rejected batch is not retried"""
+        remote_write_receiver.statuses = [400]
+        writer = _writer(remote_write_receiver.url, _registry())
+        writer.collect()
+        assert writer.flush()
+        assert writer.buffered() == 0
+        assert remote_write_receiver.requests == []
+
+    def test_full_buffer_drops_oldest(self, remote_write_receiver):
+        """Test that backpressure evicts the oldest samples first"""
+        registry = CollectorRegistry()
+        gauge = Gauge("reading", "Reading", registry=registry)
+        writer = _writer(remote_write_receiver.url, registry, max_buffer=3)
+        for value in range(5):
+            gauge.set(value)
+            writer.collect()
+        assert writer.buffered() == 3
+        assert writer.flush()
+        ((labels, samples),) = remote_write_receiver.series()
+        assert [value for value, _ in samples] == [2.0, 3.0, 4.0]
+
+    def test_unreachable_endpoint(self):
+        """Test that connection failures are retried, then reported"""
+        writer = _writer("http://127.0.0.1:1/write", _registry(), timeout=0.5)
+        writer.collect()
+        assert not writer.flush()
+        assert writer.buffered() == 2
+
+    def test_background_thread_flushes_on_stop(self, remote_write_receiver):
+        """Test that stopping the sender sends what is left"""
+        writer = _writer(remote_write_receiver.url, _registry(), interval=3600)
+        writer.start()
+        writer.stop()
+        assert len(remote_write_receiver.series()) == 2
+
+    def test_sigv4_signs_requests(self, remote_write_receiver):
+        """Test that SigV4 adds an aps Authorization header"""
+        writer = _writer(remote_write_receiver.url, _registry(), sigv4=True)
+        env = {"AWS_ACCESS_KEY_ID": "AKIDEXAMPLE", "AWS_SECRET_ACCESS_KEY": "secret"}
+        with patch.dict("os.environ", env):
+            writer.collect()
+            assert writer.flush()
+
+        headers, _ = remote_write_receiver.requests[0]
+        assert headers["Authorization"].startswith("AWS4-HMAC-SHA256 Credential=AKID")
+        assert "/eu-west-1/aps/aws4_request" in headers["Authorization"]
+        assert "X-Amz-Date" in headers
+
+    def test_disabled_without_endpoint(self):
+        """Test that no thread is started without an endpoint"""
+        writer = AMPRemoteWrite(amp_endpoint="", registry=_registry())
+        writer.start()
+        assert not writer.enabled
+        assert writer._thread is None
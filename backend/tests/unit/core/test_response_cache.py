@@ -0,0 +1,188 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import pytest
+from fastapi import HTTPException
+from prometheus_client import REGISTRY
+from pydantic import BaseModel
+from src.core import response_cache as response_cache_module
+from src.core.cache import TTLCache
+from src.core.response_cache import cached_response, invalidate_response_tag
+
+
+class Item(BaseModel):
+    name: str
+    size: Optional[int] = None
+
+
+class ItemRow:
+    """Stands in for an ORM row"""
+
+    def __init__(self, name):
+        self.name = name
+        self.size = None
+
+
+@pytest.fixture()
+def cache(monkeypatch):
+    cache = TTLCache(maxsize=16, ttl=60)
+    monkeypatch.setattr(response_cache_module, "response_cache", cache)
+    return cache
+
+
+def _count(route, result):
+    return (
+        REGISTRY.get_sample_value(
+            "response_cache_requests_total", {"route": route, "result": result}
+        )
+        or 0
+    )
+
+
+def test_hit_skips_handler_and_serialization(cache):
+    """Test that a hit returns the stored bytes without running the handler"""
+    calls = []
+
+    @cached_response("test.items", Item, tags=lambda user_id, db: [f"u:{user_id}"])
+    def handler(name: str, db=None, user=None):
+        calls.append(name)
+        return ItemRow(name)
+
+    hits, misses = _count("test.items", "hit"), _count("test.items", "miss")
+    first = handler(name="a", db=None, user={"uid": "u1"})
+    second = handler(name="a", db=None, user={"uid": "u1"})
+
+    assert calls == ["a"]
+    assert first.body == second.body == b'{"name":"a","size":null}'
+    assert _count("test.items", "hit") == hits + 1
+    assert _count("test.items", "miss") == misses + 1
+
+
+def test_keys_are_scoped_by_user_and_params(cache):
+    """Test that different users and query params get separate entries"""
+    calls = []
+
+    @cached_response("test.scoped", Item)
+    def handler(name: str, db=None, user=None):
+        calls.append((user["uid"], name))
+        return Item(name=name)
+
+    handler(name="a", db=None, user={"uid": "u1"})
+    handler(name="a", db=None, user={"uid": "u2"})
+    handler(name="b", db=None, user={"uid": "u1"})
+    assert len(calls) == 3
+
+
+def test_tag_invalidation(cache):
+    """Test that invalidating a tag forces the next call to miss"""
+    calls = []
+
+    @cached_response("test.tagged", tags=lambda user_id, db: [f"u:{user_id}"])
+    def handler(db=None, user=None):
+        calls.append(1)
+        return {"count": len(calls)}
+
+    handler(db=None, user={"uid": "u1"})
+    invalidate_response_tag("u:u1")
+    assert handler(db=None, user={"uid": "u1"}).body == b'{"count":2}'
+
+
+def test_errors_are_not_cached(cache):
+    """Test that handler exceptions propagate and leave no entry"""
+
+    @cached_response("test.errors")
+    def handler(db=None, user=None):
+        raise HTTPException(404, "not found")
+
+    with pytest.raises(HTTPException):
+        handler(db=None, user={"uid": "u1"})
+    assert len(cache) == 0
+
+
+def test_disabled_passes_through(monkeypatch):
+    """Test that handlers run unchanged with caching and coalescing disabled"""
+    monkeypatch.setattr(response_cache_module, "response_cache", None)
+    monkeypatch.setattr(response_cache_module.settings, "REQUEST_COALESCING", False)
+
+    @cached_response("test.disabled", Item)
+    def handler(db=None, user=None):
+        return Item(name="raw")
+
+    assert handler(db=None, user={"uid": "u1"}) == Item(name="raw")
+
+
+def test_concurrent_misses_share_one_execution(monkeypatch):
+    """Test that identical concurrent reads run the handler once"""
+    monkeypatch.setattr(response_cache_module, "response_cache", None)
+    monkeypatch.setattr(response_cache_module.settings, "REQUEST_COALESCING", True)
+    release = threading.Event()
+    calls = []
+
+    @cached_response("test.coalesced", Item)
+    def handler(db=None, user=None):
+        calls.append(1)
+        release.wait(5)
+        return Item(name="shared")
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(handler, db=None, user={"uid": "u1"}) for _ in range(4)]
+        calls_in_flight = response_cache_module.in_flight._calls
+        while sum(call.waiters for call in list(calls_in_flight.values())) < 3:
+            time.sleep(0.005)
+        release.set()
+        bodies = {future.result().body for future in futures}
+
+    assert calls == [1]
+    assert bodies == {b'{"name":"shared","size":null}'}
+
+
+def test_write_during_miss_is_not_cached(cache):
+    """Test that a result computed across a write is returned but not stored"""
+    calls = []
+
+    @cached_response("test.racing", tags=lambda user_id, db: [f"u:{user_id}"])
+    def handler(db=None, user=None):
+        calls.append(1)
+        if len(calls) == 1:
+            # A write commits and invalidates while this read is running
+            invalidate_response_tag("u:u1")
+        return {"count": len(calls)}
+
+    assert handler(db=None, user={"uid": "u1"}).body == b'{"count":1}'
+    assert len(cache) == 0
+    assert handler(db=None, user={"uid": "u1"}).body == b'{"count":2}'
+    assert handler(db=None, user={"uid": "u1"}).body == b'{"count":2}'
+
+
+def test_reads_after_write_do_not_join_older_flight(monkeypatch):
+    """Test that a request arriving after a write gets its own execution"""
+    monkeypatch.setattr(response_cache_module, "response_cache", None)
+    monkeypatch.setattr(response_cache_module.settings, "REQUEST_COALESCING", True)
+    monkeypatch.setattr(
+        response_cache_module.settings, "REQUEST_COALESCING_TIMEOUT_SECONDS", 30
+    )
+    started, release = threading.Event(), threading.Event()
+    versions = ["before", "after"]
+
+    @cached_response("test.generations", Item, tags=lambda user_id, db: ["t"])
+    def handler(db=None, user=None):
+        name = versions.pop(0)
+        if name == "before":
+            started.set()
+            release.wait(5)
+        return Item(name=name)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(handler, db=None, user={"uid": "u1"})
+        assert started.wait(5)
+        invalidate_response_tag("t")
+        try:
+            # Does not wait for the leader, which is still blocked
+            after = pool.submit(handler, db=None, user={"uid": "u1"}).result(2)
+        finally:
+            release.set()
+
+        assert leader.result().body == b'{"name":"before","size":null}'
+    assert after.body == b'{"name":"after","size":null}'
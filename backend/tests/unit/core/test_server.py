@@ -0,0 +1,78 @@
+import pytest
+from src.core import server
+from src.core.server import cpu_limit, gunicorn_options, memory_limit, worker_count
+
+
+@pytest.fixture()
+def settings(monkeypatch):
+    monkeypatch.setattr(server.settings, "WEB_CONCURRENCY", 0)
+    monkeypatch.setattr(server.settings, "WEB_WORKERS_PER_CORE", 1.0)
+    monkeypatch.setattr(server.settings, "WEB_WORKER_MEMORY_MB", 192)
+    monkeypatch.setattr(server.settings, "WEB_MAX_WORKERS", 16)
+    return server.settings
+
+
+def test_cpu_limit_cgroup_v2(tmp_path, monkeypatch):
+    """Test that a CFS quota caps the CPU count"""
+    monkeypatch.setattr(server.os, "sched_getaffinity", lambda pid: set(range(8)))
+    (tmp_path / "cpu.max").write_text("200000 100000\n")
+    assert cpu_limit(tmp_path) == 2.0
+
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    assert cpu_limit(tmp_path) == 8.0
+
+
+def test_cpu_limit_cgroup_v1(tmp_path, monkeypatch):
+    """Test the cgroup v1 quota files"""
+    monkeypatch.setattr(server.os, "sched_getaffinity", lambda pid: set(range(8)))
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("25000")
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000")
+    assert cpu_limit(tmp_path) == 0.25
+
+
+def test_memory_limit(tmp_path):
+    """Test cgroup v2 and v1 memory limits"""
+    (tmp_path / "memory.max").write_text("536870912\n")
+    assert memory_limit(tmp_path) == 512 << 20
+
+    (tmp_path / "memory.max").unlink()
+    (tmp_path / "memory").mkdir()
+    (tmp_path / "memory" / "memory.limit_in_bytes").write_text("1073741824")
+    assert memory_limit(tmp_path) == 1 << 30
+
+
+@pytest.mark.parametrize(
+    "cpus, memory_mb, expected",
+    [
+        (0.25, 512, 1),  # Fractional CPU still gets a worker
+        (2.0, 4096, 2),  # One worker per core
+        (4.0, 512, 2),  # Memory-bound: 512MB / 192MB per worker
+        (64.0, 1 << 20, 16),  # Capped by WEB_MAX_WORKERS
+        (1.0, 64, 1),  # Never below one
+    ],
+)
+def test_worker_count(settings, cpus, memory_mb, expected):
+    assert worker_count(cpus, memory_mb << 20) == expected
+
+
+def test_worker_count_override(settings):
+    """Test that WEB_CONCURRENCY pins the worker count"""
+    settings.WEB_CONCURRENCY = 3
+    assert worker_count(64.0, 1 << 40) == 3
+
+
+def test_gunicorn_options_are_valid(settings):
+    """Test that every option is a known gunicorn setting"""
+    from gunicorn.config import Config
+
+    config = Config()
+    options = gunicorn_options(workers=2)
+    for key, value in options.items():
+        config.set(key, value)
+
+    assert config.workers == 2
+    assert config.preload_app is True
+    assert config.keepalive == settings.SERVER_KEEPALIVE_SECONDS
+    assert config.worker_class_str == "uvicorn_worker.UvicornWorker"
+    assert config.accesslog is None
@@ -0,0 +1,83 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from src.core.single_flight import SingleFlight
+
+
+def _wait_for_waiters(flight, key, count):
+    while flight._calls.get(key) is None or flight._calls[key].waiters < count:
+        time.sleep(0.005)
+
+
+def test_concurrent_calls_share_the_leader_result():
+    """Test that waiters get the leader's result without running fn"""
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait(5)
+        return "result"
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        leader = pool.submit(flight.do, "k", fn, 5)
+        while flight.in_flight() == 0:
+            time.sleep(0.005)
+        waiters = [pool.submit(flight.do, "k", fn, 5) for _ in range(2)]
+        _wait_for_waiters(flight, "k", 2)
+        release.set()
+
+        assert leader.result() == ("result", "leader")
+        assert [w.result() for w in waiters] == [("result", "shared")] * 2
+    assert calls == [1]
+    assert flight.in_flight() == 0
+
+
+def test_leader_error_is_shared():
+    """Test that waiters see the leader's exception"""
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def fn():
+        release.wait(5)
+        raise ValueError("boom")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flight.do, "k", fn, 5)
+        while flight.in_flight() == 0:
+            time.sleep(0.005)
+        waiter = pool.submit(flight.do, "k", fn, 5)
+        _wait_for_waiters(flight, "k", 1)
+        release.set()
+
+        with pytest.raises(ValueError):
+            leader.result()
+        with pytest.raises(ValueError):
+            waiter.result()
+
+    # The failed call is not remembered
+    assert flight.do("k", lambda: "retry") == ("retry", "leader")
+
+
+def test_waiter_timeout_runs_its_own_call():
+    """Test that a waiter stops waiting on a slow leader"""
+    flight = SingleFlight()
+    release = threading.Event()
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        leader = pool.submit(flight.do, "k", lambda: release.wait(5) and "slow", 5)
+        while flight.in_flight() == 0:
+            time.sleep(0.005)
+        assert flight.do("k", lambda: "own", timeout=0.01) == ("own", "timeout")
+        release.set()
+        assert leader.result() == ("slow", "leader")
+
+
+def test_different_keys_do_not_coalesce():
+    """Test that only identical keys share an execution"""
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == (1, "leader")
+    assert flight.do("b", lambda: 2) == (2, "leader")
@@ -0,0 +1,93 @@
+import pytest
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+from src.core.executors import DBRoute
+from src.core.metrics import request_phase_seconds
+from src.core.timing import ServerTimingMiddleware, current_timing, phase
+
+
+def _parse(header):
+    """Server-Timing header as {name: milliseconds}"""
+    entries = dict(item.split(";dur=") for item in header.split(", "))
+    return {name: float(dur) for name, dur in entries.items()}
+
+
+@pytest.fixture()
+def engine():
+    return create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+
+def _app(engine, header=True):
+    router = APIRouter(route_class=DBRoute)
+
+    def authenticated():
+        with phase("auth"):
+            return {"uid": "u"}
+
+    @router.get("/items/{item_id}")
+    def read_item(item_id: int, user=Depends(authenticated)):
+        with engine.connect() as conn:
+            value = conn.execute(text("SELECT :v"), {"v": item_id}).scalar()
+        return {"item_id": value}
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(ServerTimingMiddleware, header=header)
+    return app
+
+
+class TestPhase:
+    def test_no_op_outside_request(self):
+        """Test that spans outside a request are ignored"""
+        with phase("auth"):
+            pass
+        assert current_timing() is None
+
+
+class TestServerTimingMiddleware:
+    def test_header_has_each_phase(self, engine):
+        """Test that auth, db, handler, serialize and total are reported"""
+        client = TestClient(_app(engine))
+        response = client.get("/items/3")
+
+        assert response.json() == {"item_id": 3}
+        timings = _parse(response.headers["server-timing"])
+        assert set(timings) == {"auth", "db", "handler", "serialize", "total"}
+        assert timings["db"] <= timings["handler"] <= timings["total"]
+
+    def test_header_disabled(self, engine):
+        """Test that the header is opt-in"""
+        client = TestClient(_app(engine, header=False))
+        response = client.get("/items/3")
+        assert response.status_code == 200
+        assert "server-timing" not in response.headers
+
+    def test_observed_per_route(self, engine):
+        """Test that phases land in the histogram under the route template"""
+        if request_phase_seconds is None:
+            pytest.skip("prometheus_client not installed")
+        labels = {"handler": "/items/{item_id}", "phase": "db"}
+        sample = "http_request_phase_duration_seconds_count"
+
+        def count():
+            for metric in request_phase_seconds.collect():
+                for s in metric.samples:
+                    if s.name == sample and s.labels == labels:
+                        return s.value
+            return 0
+
+        before = count()
+        TestClient(_app(engine)).get("/items/1")
+        assert count() == before + 1
+
+    def test_sql_outside_request_not_recorded(self, engine):
+        """Test that queries outside a request do not leave timing state"""
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            assert "request_timing_starts" not in conn.info
@@ -0,0 +1,121 @@
+import time
+
+import pytest
+from fastapi import APIRouter, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+from src.core import tracing
+from src.core.executors import DBRoute
+from src.core.tracing import (
+    TracingMiddleware,
+    configure_tracing,
+    shutdown_tracing,
+    traced,
+)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+@pytest.fixture()
+def client():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    router = APIRouter(route_class=DBRoute)
+
+    @router.get("/items/{item_id}")
+    def read_item(item_id: int, delay: float = 0, fail: bool = False):
+        with traced("lookup", item_id=item_id):
+            with engine.connect() as conn:
+                value = conn.execute(text("SELECT :v"), {"v": item_id}).scalar()
+        time.sleep(delay)
+        if fail:
+            raise HTTPException(status_code=503)
+        return {"item_id": value}
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(TracingMiddleware)
+    yield TestClient(app)
+    shutdown_tracing()
+
+
+@pytest.fixture()
+def collector(otlp_collector):
+    pytest.importorskip("opentelemetry.sdk")
+    pytest.importorskip("opentelemetry.exporter.otlp.proto.http.trace_exporter")
+    return otlp_collector
+
+
+def _configure(collector, ratio, slow_ms=10_000):
+    assert configure_tracing(collector.url, sample_ratio=ratio, slow_ms=slow_ms)
+
+
+class TestTraced:
+    def test_no_op_when_disabled(self):
+        """Test that spans cost nothing while tracing is off"""
+        assert tracing._tracer is None
+        with traced("anything") as span:
+            assert span is None
+
+
+class TestTracing:
+    def test_head_sampled_request(self, client, collector):
+        """Test that route, custom and SQL spans form one trace"""
+        _configure(collector, ratio=1.0)
+        assert client.get("/items/7").status_code == 200
+        shutdown_tracing()
+
+        spans = {span.name: span for span in collector.spans()}
+        assert set(spans) == {"GET /items/{item_id}", "lookup", "SELECT"}
+        server = spans["GET /items/{item_id}"]
+        lookup, sql = spans["lookup"], spans["SELECT"]
+        assert lookup.parent_span_id == server.span_id
+        assert sql.parent_span_id == lookup.span_id
+        assert len({s.trace_id for s in spans.values()}) == 1
+        attributes = {a.key: a.value for a in sql.attributes}
+        assert attributes["db.statement"].string_value == "SELECT ?"
+
+    def test_fast_unsampled_request_dropped(self, client, collector):
+        """Test that traces outside the head sample are not exported"""
+        _configure(collector, ratio=0.0)
+        assert client.get("/items/7").status_code == 200
+        shutdown_tracing()
+        assert collector.spans() == []
+
+    def test_slow_request_kept(self, client, collector):
+        """Test that tail sampling keeps every span of a slow trace"""
+        _configure(collector, ratio=0.0, slow_ms=50)
+        client.get("/items/7")
+        client.get("/items/8", params={"delay": 0.1})
+        shutdown_tracing()
+
+        spans = collector.spans()
+        assert sorted(s.name for s in spans) == [
+            "GET /items/{item_id}",
+            "SELECT",
+            "lookup",
+        ]
+        lookup = next(s for s in spans if s.name == "lookup")
+        assert {a.key: a.value.int_value for a in lookup.attributes} == {"item_id": 8}
+
+    def test_failed_request_kept(self, client, collector):
+        """Test that tail sampling keeps traces of server errors"""
+        _configure(collector, ratio=0.0)
+        assert client.get("/items/7", params={"fail": True}).status_code == 503
+        shutdown_tracing()
+        assert len(collector.spans()) == 3
+
+    def test_continues_incoming_trace(self, client, collector):
+        """Test that a sampled traceparent from upstream is continued"""
+        _configure(collector, ratio=0.0)
+        client.get("/items/7", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"})
+        shutdown_tracing()
+
+        server = next(s for s in collector.spans() if s.name.startswith("GET"))
+        assert server.trace_id.hex() == TRACE_ID
+        assert server.parent_span_id.hex() == PARENT_ID
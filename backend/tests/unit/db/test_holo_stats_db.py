@@ -0,0 +1,299 @@
+import threading
+import time
+from datetime import date
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from src.db.holo_stats import (
+    get_holo_stats,
+    get_holo_streak,
+    rebuild_holo_stats,
+    reconcile_holo_stats,
+)
+from src.db.holos import (
+    create_holo_config,
+    create_holo_daily,
+    get_avg_score,
+    upsert_holo_dailies,
+    upsert_holo_daily,
+)
+from src.db.session import Base
+from src.models.holos import (
+    HoloCreate,
+    HoloDailiesTable,
+    HoloDailyCreate,
+    HoloDailyUpdate,
+    HoloStatsTable,
+)
+
+
+@pytest.fixture()
+def db_session():
+    """Create a database session for testing using in-memory SQLite"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    session = TestingSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def _make_holo(db_session):
+    from src.db.users import create_user
+    from src.models.users import UserCreate
+
+    user_id = str(uuid4())
+    create_user(
+        UserCreate(user_id=user_id, user_name="Test", user_email="t@example.com"),
+        db_session,
+    )
+    holo = create_holo_config(
+        user_id, HoloCreate(user_id=user_id, questions=["q1"]), db_session
+    )
+    return holo.holo_id
+
+
+@pytest.fixture()
+def holo_id(db_session):
+    """Create a user with a holo config and return its holo_id"""
+    return _make_holo(db_session)
+
+
+def _daily(entry_date, score):
+    return HoloDailyCreate(entry_date=entry_date, score=score, answers={"q1": True})
+
+
+def _stats_tuple(stats):
+    return (
+        stats.score_sum,
+        stats.score_count,
+        stats.score_min,
+        stats.score_max,
+        stats.last_entry_date,
+    )
+
+
+def _streak_tuple(stats):
+    return (stats.streak_start, stats.streak_length, stats.longest_streak)
+
+
+class TestHoloStats:
+    def test_stats_follow_inserts(self, db_session, holo_id):
+        """Test that inserts update the aggregate in the same transaction"""
+        create_holo_daily(holo_id, _daily("2024-01-10", 5), db_session)
+        create_holo_daily(holo_id, _daily("2024-01-12", 9), db_session)
+        create_holo_daily(holo_id, _daily("2024-01-11", 3), db_session)
+
+        stats = get_holo_stats(holo_id, db_session)
+        assert _stats_tuple(stats) == (17, 3, 3, 9, date(2024, 1, 12))
+        assert get_avg_score(holo_id, db_session) == 5.67
+
+    def test_stats_follow_upserts(self, db_session, holo_id):
+        """Test that replacing a day adjusts sum and recomputes a stale max"""
+        create_holo_daily(holo_id, _daily("2024-01-10", 5), db_session)
+        create_holo_daily(holo_id, _daily("2024-01-11", 9), db_session)
+
+        upsert_holo_daily(
+            holo_id,
+            date(2024, 1, 11),
+            HoloDailyUpdate(score=4, answers={"q1": False}),
+            db_session,
+        )
+
+        stats = get_holo_stats(holo_id, db_session)
+        assert _stats_tuple(stats) == (9, 2, 4, 5, date(2024, 1, 11))
+
+    def test_stats_follow_batches(self, db_session, holo_id):
+        """Test that batch upserts count only new days"""
+        create_holo_daily(holo_id, _daily("2024-01-10", 5), db_session)
+        upsert_holo_dailies(
+            holo_id,
+            [_daily("2024-01-10", 7), _daily("2024-01-11", 1), _daily("bad", 1)],
+            db_session,
+        )
+
+        stats = get_holo_stats(holo_id, db_session)
+        assert _stats_tuple(stats) == (8, 2, 1, 7, date(2024, 1, 11))
+        assert get_avg_score(holo_id, db_session) == 4.0
+
+    def test_stats_rebuilt_for_existing_history(self, db_session, holo_id):
+        """Test that the first write after rollout includes older history"""
+        db_session.add(
+            HoloDailiesTable(
+                holo_id=holo_id, entry_date=date(2023, 12, 1), score=2, answers={}
+            )
+        )
+        db_session.commit()
+        assert get_holo_stats(holo_id, db_session) is None
+        assert get_avg_score(holo_id, db_session) == 2.0
+
+        create_holo_daily(holo_id, _daily("2024-01-10", 6), db_session)
+
+        stats = get_holo_stats(holo_id, db_session)
+        assert _stats_tuple(stats) == (8, 2, 2, 6, date(2024, 1, 10))
+
+    def test_rebuild_over_row_written_elsewhere(self, db_session, holo_id):
+        """Test that a rebuild updates a row another transaction inserted"""
+        create_holo_daily(holo_id, _daily("2024-01-10", 5), db_session)
+        db_session.expunge_all()
+        db_session.execute(
+            update(HoloStatsTable)
+            .where(HoloStatsTable.holo_id == holo_id)
+            .values(score_sum=0, score_count=0)
+        )
+
+        stats = rebuild_holo_stats(holo_id, db_session)
+        db_session.commit()
+        assert _stats_tuple(stats) == (5, 1, 5, 5, date(2024, 1, 10))
+        assert db_session.query(HoloStatsTable).count() == 1
+
+    def test_concurrent_new_day_counted_once(self, tmp_path, monkeypatch):
+        """Test that two writers of the same new day count it once"""
+        import src.db.holos as holos_db
+
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'holo.db'}", connect_args={"timeout": 10}
+        )
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        with Session() as session:
+            holo_id = _make_holo(session)
+            create_holo_daily(holo_id, _daily("2024-01-09", 5), session)
+
+        first_written = threading.Event()
+        publish = holos_db._publish_holo_change
+        existing_scores = holos_db._existing_scores
+        seen = []
+
+        def recording_existing_scores(*args):
+            seen.append(existing_scores(*args))
+            return seen[-1]
+
+        def slow_publish(holo_id, db):
+            # The first writer holds its transaction open after the upsert
+            if not first_written.is_set():
+                first_written.set()
+                time.sleep(0.3)
+            publish(holo_id, db)
+
+        monkeypatch.setattr(holos_db, "_publish_holo_change", slow_publish)
+        monkeypatch.setattr(holos_db, "_existing_scores", recording_existing_scores)
+        update = HoloDailyUpdate(score=4, answers={"q1": True})
+
+        def write():
+            with Session() as session:
+                upsert_holo_daily(holo_id, date(2024, 1, 10), update, session)
+
+        first = threading.Thread(target=write)
+        first.start()
+        assert first_written.wait(5)
+        write()
+        first.join()
+
+        # The second writer waited for the first and replaced its score
+        assert seen == [{}, {date(2024, 1, 10): 4}]
+        with Session() as session:
+            stats = get_holo_stats(holo_id, session)
+            assert _stats_tuple(stats) == (9, 2, 4, 5, date(2024, 1, 10))
+        engine.dispose()
+
+    def test_reconcile_repairs_drift(self, db_session, holo_id):
+        """Test that the verifier detects and fixes a drifted aggregate"""
+        create_holo_daily(holo_id, _daily("2024-01-10", 5), db_session)
+        stats = db_session.get(HoloStatsTable, holo_id)
+        stats.score_sum = 100
+        db_session.commit()
+
+        assert reconcile_holo_stats(db_session) == [holo_id]
+        assert get_avg_score(holo_id, db_session) == 5.0
+        assert reconcile_holo_stats(db_session) == []
+
+
+class TestHoloStreak:
+    def test_streak_extends_incrementally(self, db_session, holo_id):
+        """Test that consecutive days extend the streak and a gap resets it"""
+        for entry_date in ["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-05"]:
+            create_holo_daily(holo_id, _daily(entry_date, 5), db_session)
+
+        stats = get_holo_stats(holo_id, db_session)
+        assert _streak_tuple(stats) == (date(2024, 1, 5), 1, 3)
+
+        create_holo_daily(holo_id, _daily("2024-01-06", 5), db_session)
+        stats = get_holo_stats(holo_id, db_session)
+        assert _streak_tuple(stats) == (date(2024, 1, 5), 2, 3)
+
+    def test_backfill_joins_runs(self, db_session, holo_id):
+        """Test that filling a gap in the history merges the two runs"""
+        upsert_holo_dailies(
+            holo_id,
+            [_daily(d, 5) for d in ["2024-01-01", "2024-01-02", "2024-01-04"]],
+            db_session,
+        )
+        assert _streak_tuple(get_holo_stats(holo_id, db_session)) == (
+            date(2024, 1, 4),
+            1,
+            2,
+        )
+
+        create_holo_daily(holo_id, _daily("2024-01-03", 5), db_session)
+        assert _streak_tuple(get_holo_stats(holo_id, db_session)) == (
+            date(2024, 1, 1),
+            4,
+            4,
+        )
+
+    def test_incremental_matches_rebuild(self, db_session, holo_id):
+        """Test that incremental maintenance agrees with the gaps-and-islands build"""
+        for entry_date in ["2024-02-27", "2024-02-28", "2024-02-29", "2024-03-01"]:
+            create_holo_daily(holo_id, _daily(entry_date, 5), db_session)
+        upsert_holo_dailies(
+            holo_id,
+            [_daily("2024-03-03", 5), _daily("2024-03-04", 5)],
+            db_session,
+        )
+        incremental = _streak_tuple(get_holo_stats(holo_id, db_session))
+
+        rebuilt = _streak_tuple(rebuild_holo_stats(holo_id, db_session))
+        assert incremental == rebuilt == (date(2024, 3, 3), 2, 4)
+
+    def test_current_streak_expires(self, db_session, holo_id):
+        """Test that the current streak survives one missed day only"""
+        for entry_date in ["2024-01-01", "2024-01-02"]:
+            create_holo_daily(holo_id, _daily(entry_date, 5), db_session)
+
+        alive = get_holo_streak(holo_id, db_session, today=date(2024, 1, 3))
+        assert (alive.current_streak, alive.longest_streak) == (2, 2)
+        assert alive.current_streak_start == date(2024, 1, 1)
+
+        broken = get_holo_streak(holo_id, db_session, today=date(2024, 1, 4))
+        assert (broken.current_streak, broken.longest_streak) == (0, 2)
+
+    def test_streak_read_does_not_write(self, db_session, holo_id):
+        """Test that a streak read without an aggregate row leaves it missing"""
+        for day in (1, 2):
+            db_session.add(
+                HoloDailiesTable(
+                    holo_id=holo_id, entry_date=date(2024, 1, day), score=5, answers={}
+                )
+            )
+        db_session.commit()
+
+        streak = get_holo_streak(holo_id, db_session, today=date(2024, 1, 2))
+        assert (streak.current_streak, streak.longest_streak) == (2, 2)
+        assert not db_session.new
+        assert get_holo_stats(holo_id, db_session) is None
+
+    def test_streak_without_dailies(self, db_session, holo_id):
+        """Test that a holo with no dailies has no streak"""
+        streak = get_holo_streak(holo_id, db_session, today=date(2024, 1, 1))
+        assert (streak.current_streak, streak.longest_streak) == (0, 0)
@@ -1,23 +1,41 @@
-from datetime import date
+from datetime import date, timedelta
+from unittest.mock import patch
 from uuid import uuid4
 
 import pytest
+from pydantic import ValidationError
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 # Import the modules
+from src.core.cache import holo_tag
 from src.db.holos import (
+    apply_invalidation,
     create_holo_config,
     create_holo_daily,
     get_avg_score,
     get_holo_config,
+    get_holo_config_snapshot,
     get_holo_daily_by_date,
     get_latest_holo_daily,
+    normalize_holo_questions,
+    rename_holo_questions,
+    rescore_holo_dailies,
     update_holo_config,
+    upsert_holo_dailies,
+    upsert_holo_daily,
 )
 from src.db.session import Base
-from src.models.holos import HoloCreate, HoloDailyCreate, HoloTable, HoloUpdate
+from src.models.holos import (
+    HoloCreate,
+    HoloDailiesTable,
+    HoloDailyCreate,
+    HoloDailyUpdate,
+    HoloQuestionsRename,
+    HoloTable,
+    HoloUpdate,
+)
 
 
 @pytest.fixture()
@@ -123,8 +141,8 @@ class TestHoloConfig:
         result = get_holo_config(sample_user_id, db_session)
         assert result is None
 
-    def test_get_holo_config_with_nested_questions(self, db_session, sample_user_id):
-        """Test getting holo config when questions are stored as nested dict"""
+    def test_normalize_nested_questions(self, db_session, sample_user_id):
+        """Test migrating holo configs stored as a nested questions dict"""
         # Create holo with nested questions structure
         holo_table = HoloTable(
             user_id=sample_user_id,
@@ -133,10 +151,71 @@ class TestHoloConfig:
         db_session.add(holo_table)
         db_session.commit()
 
+        assert normalize_holo_questions(db_session) == 1
+        assert normalize_holo_questions(db_session) == 0
+
         result = get_holo_config(sample_user_id, db_session)
         assert result is not None
         assert result.questions == ["How are you?", "What did you learn?"]
 
+    def test_config_snapshot_is_cached(
+        self, db_session, sample_user_id, sample_holo_config
+    ):
+        """Test that snapshots are served from the cache until a config write"""
+        assert get_holo_config_snapshot(sample_user_id, db_session) is None
+        created = create_holo_config(sample_user_id, sample_holo_config, db_session)
+
+        snapshot = get_holo_config_snapshot(sample_user_id, db_session)
+        assert snapshot.holo_id == created.holo_id
+        assert snapshot.questions == tuple(sample_holo_config.questions)
+        assert get_holo_config_snapshot(sample_user_id, db_session) is snapshot
+        with pytest.raises(ValidationError):
+            snapshot.questions = ("changed",)
+
+        update_holo_config(sample_user_id, HoloUpdate(questions=["New"]), db_session)
+        assert get_holo_config_snapshot(sample_user_id, db_session).questions == (
+            "New",
+        )
+
+        rename_holo_questions(
+            sample_user_id, HoloQuestionsRename(renames={"New": "Renamed"}), db_session
+        )
+        assert get_holo_config_snapshot(sample_user_id, db_session).questions == (
+            "Renamed",
+        )
+
+    def test_config_notice_drops_snapshot(
+        self, db_session, sample_user_id, sample_holo_config
+    ):
+        """Test that another worker's config notice (a bare user_id) drops it"""
+        created = create_holo_config(sample_user_id, sample_holo_config, db_session)
+        snapshot = get_holo_config_snapshot(sample_user_id, db_session)
+
+        apply_invalidation(holo_tag(created.holo_id))
+        assert get_holo_config_snapshot(sample_user_id, db_session) is snapshot
+        apply_invalidation(sample_user_id)
+        assert get_holo_config_snapshot(sample_user_id, db_session) is not snapshot
+
+    def test_config_write_during_load_not_cached(
+        self, db_session, sample_user_id, sample_holo_config
+    ):
+        """Test that a snapshot read before a config write's invalidation is dropped"""
+        import src.db.holos as holos_db
+
+        create_holo_config(sample_user_id, sample_holo_config, db_session)
+        load = holos_db.get_holo_config
+
+        def load_then_write(user_id, db):
+            holo = load(user_id, db)
+            # Another request commits a config write and invalidates meanwhile
+            apply_invalidation(user_id)
+            return holo
+
+        with patch.object(holos_db, "get_holo_config", load_then_write):
+            stale = get_holo_config_snapshot(sample_user_id, db_session)
+        assert stale is not None
+        assert get_holo_config_snapshot(sample_user_id, db_session) is not stale
+
     def test_update_holo_config(self, db_session, sample_user_id, sample_holo_config):
         """Test updating an existing holo configuration"""
         # Create first
@@ -195,6 +274,22 @@ class TestHoloDaily:
         with pytest.raises(ValueError, match="Invalid date format"):
             create_holo_daily(holo_config.holo_id, invalid_daily, db_session)
 
+    def test_create_holo_daily_scoring_error(
+        self, db_session, sample_user_id, sample_holo_config, sample_holo_daily
+    ):
+        """Test that scoring errors keep their message and roll back"""
+        holo_config = create_holo_config(sample_user_id, sample_holo_config, db_session)
+        holo_config.question_weights = {sample_holo_config.questions[0]: 1.0}
+        db_session.commit()
+
+        error = ValueError("Question weights must be finite and non-negative")
+        with patch("src.db.holos.score_answers", side_effect=error):
+            with pytest.raises(ValueError, match="finite and non-negative"):
+                create_holo_daily(holo_config.holo_id, sample_holo_daily, db_session)
+
+        assert not db_session.new
+        assert get_latest_holo_daily(holo_config.holo_id, db_session) is None
+
     def test_get_holo_daily_by_date(
         self, db_session, sample_user_id, sample_holo_config, sample_holo_daily
     ):
@@ -303,3 +398,432 @@ class TestHoloDaily:
         # Try to create another with same date - should fail
         with pytest.raises(Exception):  # SQLAlchemy will raise an exception
             create_holo_daily(holo_config.holo_id, sample_holo_daily, db_session)
+
+
+class TestHoloDailyUpsert:
+    @pytest.fixture(autouse=True)
+    def setup_test_user(self, db_session, test_user):
+        """Automatically set up test user for all tests in this class"""
+        pass
+
+    def test_upsert_creates_new_daily(
+        self, db_session, sample_user_id, sample_holo_config
+    ):
+        """Test that upsert inserts a daily when the date is new"""
+        holo_config = create_holo_config(sample_user_id, sample_holo_config, db_session)
+
+        result = upsert_holo_daily(
+            holo_config.holo_id,
+            date(2024, 1, 15),
+            HoloDailyUpdate(score=6, answers={"q1": True}),
+            db_session,
+        )
+
+        assert result.holo_daily_id is not None
+        assert result.entry_date == date(2024, 1, 15)
+        assert result.score == 6
+        assert result.answers == {"q1": True}
+
+    def test_upsert_updates_existing_daily(
+        self, db_session, sample_user_id, sample_holo_config, sample_holo_daily
+    ):
+        """Test that upsert replaces an existing daily in place"""
+        holo_config = create_holo_config(sample_user_id, sample_holo_config, db_session)
+        created = create_holo_daily(holo_config.holo_id, sample_holo_daily, db_session)
+
+        result = upsert_holo_daily(
+            holo_config.holo_id,
+            date(2024, 1, 15),
+            HoloDailyUpdate(score=3, answers={"q1": False}),
+            db_session,
+        )
+
+        assert result.holo_daily_id == created.holo_daily_id
+        assert result.score == 3
+        assert result.answers == {"q1": False}
+        assert db_session.query(HoloDailiesTable).count() == 1
+
+        fetched = get_holo_daily_by_date(
+            holo_config.holo_id, date(2024, 1, 15), db_session
+        )
+        assert fetched.score == 3
+
+    def test_upsert_holo_dailies_batch(
+        self, db_session, sample_user_id, sample_holo_config, sample_holo_daily
+    ):
+        """Test that a batch reports created, updated, invalid and skipped days"""
+        holo_config = create_holo_config(sample_user_id, sample_holo_config, db_session)
+        existing = create_holo_daily(holo_config.holo_id, sample_holo_daily, db_session)
+
+        result = upsert_holo_dailies(
+            holo_config.holo_id,
+            [
+                HoloDailyCreate(entry_date="2024-01-14", score=4, answers={"q": 1}),
+                HoloDailyCreate(entry_date="2024-01-15", score=1, answers={"q": 0}),
+                HoloDailyCreate(entry_date="bad-date", score=1, answers={"q": 0}),
+                HoloDailyCreate(entry_date="2024-01-16", score=2, answers={"q": 0}),
+                HoloDailyCreate(entry_date="2024-01-16", score=9, answers={"q": 1}),
+            ],
+            db_session,
+        )
+
+        assert [r.status for r in result.results] == [
+            "created",
+            "updated",
+            "invalid",
+            "skipped",
+            "created",
+        ]
+        assert (result.created, result.updated, result.failed) == (2, 1, 1)
+        assert result.results[1].holo_daily_id == existing.holo_daily_id
+        assert db_session.query(HoloDailiesTable).count() == 3
+
+        updated = get_holo_daily_by_date(
+            holo_config.holo_id, date(2024, 1, 15), db_session
+        )
+        assert updated.score == 1
+        last_wins = get_holo_daily_by_date(
+            holo_config.holo_id, date(2024, 1, 16), db_session
+        )
+        assert last_wins.score == 9
+
+
+class TestHoloDailyPackedAnswers:
+    @pytest.fixture(autouse=True)
+    def setup_test_user(self, db_session, test_user):
+        """Automatically set up test user for all tests in this class"""
+        pass
+
+    @pytest.fixture()
+    def bits_storage(self, monkeypatch):
+        monkeypatch.setattr("src.db.holos.settings.HOLO_ANSWER_STORAGE", "bits")
+
+    @pytest.fixture()
+    def holo_config(self, db_session, sample_user_id):
+        return create_holo_config(
+            sample_user_id,
+            HoloCreate(user_id=sample_user_id, questions=["q1", "q2", "q3"]),
+            db_session,
+        )
+
+    def test_create_holo_config_indexes_questions(self, holo_config):
+        """Test that a new config gets a question bit index"""
+        assert holo_config.question_index == {"q1": 0, "q2": 1, "q3": 2}
+        assert holo_config.questions_version == 1
+
+    def test_update_holo_config_extends_index(
+        self, db_session, sample_user_id, holo_config
+    ):
+        """Test that new questions get new bits and bump the version"""
+        result = update_holo_config(
+            sample_user_id, HoloUpdate(questions=["q3", "q4"]), db_session
+        )
+        assert result.question_index == {"q1": 0, "q2": 1, "q3": 2, "q4": 3}
+        assert result.questions_version == 2
+
+    def test_bits_storage_roundtrip(self, db_session, holo_config, bits_storage):
+        """Test that packed answers are stored compactly and read back unchanged"""
+        answers = {"q1": True, "q2": False, "q3": True}
+        created = create_holo_daily(
+            holo_config.holo_id,
+            HoloDailyCreate(entry_date="2024-01-15", score=5, answers=answers),
+            db_session,
+        )
+        assert created.answers == answers
+
+        row = db_session.query(HoloDailiesTable).one()
+        assert row.answers == {}
+        assert (row.answer_bits, row.answer_mask) == (0b101, 0b111)
+        assert row.answers_version == 1
+
+        fetched = get_holo_daily_by_date(
+            holo_config.holo_id, date(2024, 1, 15), db_session
+        )
+        assert fetched.answers == answers
+
+        updated = upsert_holo_daily(
+            holo_config.holo_id,
+            date(2024, 1, 15),
+            HoloDailyUpdate(score=6, answers={"q2": True}),
+            db_session,
+        )
+        assert updated.answers == {"q2": True}
+
+    def test_bits_storage_keeps_json_when_not_packable(
+        self, db_session, holo_config, bits_storage
+    ):
+        """Test that free-form answers fall back to JSON storage"""
+        answers = {"q1": True, "mood": "Great"}
+        create_holo_daily(
+            holo_config.holo_id,
+            HoloDailyCreate(entry_date="2024-01-15", score=5, answers=answers),
+            db_session,
+        )
+
+        row = db_session.query(HoloDailiesTable).one()
+        assert row.answers == answers
+        assert row.answer_mask is None
+
+
+class TestHoloQuestionRename:
+    @pytest.fixture(autouse=True)
+    def setup_test_user(self, db_session, test_user):
+        """Automatically set up test user for all tests in this class"""
+        pass
+
+    @pytest.fixture()
+    def holo_config(self, db_session, sample_user_id):
+        return create_holo_config(
+            sample_user_id,
+            HoloCreate(user_id=sample_user_id, questions=["q1", "q2", "q3"]),
+            db_session,
+        )
+
+    def _add_daily(self, db, holo_id, entry_date, answers):
+        create_holo_daily(
+            holo_id,
+            HoloDailyCreate(entry_date=entry_date, score=5, answers=answers),
+            db,
+        )
+
+    def test_rename_rewrites_history(
+        self, db_session, sample_user_id, holo_config, monkeypatch
+    ):
+        """Test that renames rewrite every affected answers row in chunks"""
+        monkeypatch.setattr("src.db.holos.ANSWER_REWRITE_CHUNK", 2)
+        for day in range(1, 6):
+            self._add_daily(
+                db_session,
+                holo_config.holo_id,
+                f"2024-01-0{day}",
+                {"q1": True, "q2": False},
+            )
+        self._add_daily(db_session, holo_config.holo_id, "2024-01-06", {"q3": True})
+
+        holo, rows_touched = rename_holo_questions(
+            sample_user_id,
+            HoloQuestionsRename(renames={"q1": "Slept well?", "q2": "q1"}),
+            db_session,
+        )
+
+        assert rows_touched == 5
+        assert holo.questions == ["Slept well?", "q1", "q3"]
+        assert holo.question_index == {"Slept well?": 0, "q1": 1, "q3": 2}
+        assert holo.questions_version == 2
+        answers = [
+            get_holo_daily_by_date(
+                holo_config.holo_id, date(2024, 1, day), db_session
+            ).answers
+            for day in range(1, 7)
+        ]
+        assert answers[:5] == [{"Slept well?": True, "q1": False}] * 5
+        assert answers[5] == {"q3": True}
+
+    def test_reorder_only(self, db_session, sample_user_id, holo_config):
+        """Test that a pure reorder touches no answer rows"""
+        self._add_daily(db_session, holo_config.holo_id, "2024-01-01", {"q1": True})
+
+        holo, rows_touched = rename_holo_questions(
+            sample_user_id,
+            HoloQuestionsRename(order=["q3", "q1", "q2"]),
+            db_session,
+        )
+        assert rows_touched == 0
+        assert holo.questions == ["q3", "q1", "q2"]
+
+    @pytest.mark.parametrize(
+        "rename",
+        [
+            HoloQuestionsRename(renames={"missing": "x"}),
+            HoloQuestionsRename(renames={"q1": "q2"}),
+            HoloQuestionsRename(renames={"q1": " "}),
+            HoloQuestionsRename(order=["q1", "q2"]),
+        ],
+    )
+    def test_rename_validation(self, db_session, sample_user_id, holo_config, rename):
+        """Test that invalid renames are rejected before touching anything"""
+        with pytest.raises(ValueError):
+            rename_holo_questions(sample_user_id, rename, db_session)
+
+    def test_rename_rejects_retired_question_text(
+        self, db_session, sample_user_id, holo_config
+    ):
+        """Test that a removed question's text cannot be reused by a rename"""
+        update_holo_config(sample_user_id, HoloUpdate(questions=["q1"]), db_session)
+        with pytest.raises(ValueError, match="removed questions"):
+            rename_holo_questions(
+                sample_user_id,
+                HoloQuestionsRename(renames={"q1": "q2"}),
+                db_session,
+            )
+
+    def test_rename_not_found(self, db_session, sample_user_id):
+        """Test renaming when there is no holo config"""
+        assert (
+            rename_holo_questions(
+                sample_user_id, HoloQuestionsRename(renames={"a": "b"}), db_session
+            )
+            is None
+        )
+
+
+class TestHoloScoring:
+    @pytest.fixture(autouse=True)
+    def setup_test_user(self, db_session, test_user):
+        """Automatically set up test user for all tests in this class"""
+        pass
+
+    @pytest.fixture()
+    def weighted_holo(self, db_session, sample_user_id):
+        return create_holo_config(
+            sample_user_id,
+            HoloCreate(
+                user_id=sample_user_id,
+                questions=["q1", "q2", "q3"],
+                question_weights={"q1": 2.0, "q2": 1.0, "q3": 1.0},
+            ),
+            db_session,
+        )
+
+    def test_submit_is_scored_server_side(self, db_session, weighted_holo):
+        """Test that weighted holos ignore the client-supplied score"""
+        result = create_holo_daily(
+            weighted_holo.holo_id,
+            HoloDailyCreate(
+                entry_date="2024-01-01", score=1, answers={"q1": True, "q2": False}
+            ),
+            db_session,
+        )
+        assert result.score == 5
+
+        result = upsert_holo_daily(
+            weighted_holo.holo_id,
+            date(2024, 1, 1),
+            HoloDailyUpdate(score=1, answers={"q1": True, "q2": True, "q3": True}),
+            db_session,
+        )
+        assert result.score == 10
+        assert get_avg_score(weighted_holo.holo_id, db_session) == 10
+
+    def test_unweighted_holo_keeps_client_score(
+        self, db_session, sample_user_id, sample_holo_config
+    ):
+        """Test that holos without weights still trust the client score"""
+        holo = create_holo_config(sample_user_id, sample_holo_config, db_session)
+        result = create_holo_daily(
+            holo.holo_id,
+            HoloDailyCreate(entry_date="2024-01-01", score=7, answers={}),
+            db_session,
+        )
+        assert result.score == 7
+
+    def test_rescore_history(self, db_session, sample_user_id, weighted_holo):
+        """Test that changing weights and rescoring rewrites every score"""
+        upsert_holo_dailies(
+            weighted_holo.holo_id,
+            [
+                HoloDailyCreate(
+                    entry_date=(date(2024, 1, 1) + timedelta(days=day)).isoformat(),
+                    score=0,
+                    answers={"q1": day % 2 == 0, "q3": True},
+                )
+                for day in range(365)
+            ],
+            db_session,
+        )
+        update_holo_config(
+            sample_user_id,
+            HoloUpdate(questions=["q1", "q2", "q3"], question_weights={"q1": 1.0}),
+            db_session,
+        )
+
+        result = rescore_holo_dailies(sample_user_id, db_session)
+
+        assert result.dailies == 365
+        # Even days go from 8 to 10, odd days from 3 to 0
+        assert result.rescored == 365
+        assert (
+            get_holo_daily_by_date(
+                weighted_holo.holo_id, date(2024, 1, 1), db_session
+            ).score
+            == 10
+        )
+        assert (
+            get_holo_daily_by_date(
+                weighted_holo.holo_id, date(2024, 1, 2), db_session
+            ).score
+            == 0
+        )
+        assert get_avg_score(weighted_holo.holo_id, db_session) == round(
+            183 * 10 / 365, 2
+        )
+
+        # Nothing changes on a second pass
+        assert rescore_holo_dailies(sample_user_id, db_session).rescored == 0
+
+    def test_rescore_packed_answers(
+        self, db_session, sample_user_id, weighted_holo, monkeypatch
+    ):
+        """Test that rescoring reads answers stored only as packed bits"""
+        monkeypatch.setattr("src.db.holos.settings.HOLO_ANSWER_STORAGE", "bits")
+        create_holo_daily(
+            weighted_holo.holo_id,
+            HoloDailyCreate(
+                entry_date="2024-01-01", score=0, answers={"q2": True, "q3": True}
+            ),
+            db_session,
+        )
+        update_holo_config(
+            sample_user_id,
+            HoloUpdate(questions=["q1", "q2", "q3"], question_weights={"q2": 1.0}),
+            db_session,
+        )
+
+        assert rescore_holo_dailies(sample_user_id, db_session).rescored == 1
+        assert (
+            get_holo_daily_by_date(
+                weighted_holo.holo_id, date(2024, 1, 1), db_session
+            ).score
+            == 10
+        )
+
+    def test_weights_follow_question_changes(
+        self, db_session, sample_user_id, weighted_holo
+    ):
+        """Test that renames carry weights and removed questions drop theirs"""
+        rename_holo_questions(
+            sample_user_id, HoloQuestionsRename(renames={"q1": "new"}), db_session
+        )
+        holo = update_holo_config(
+            sample_user_id, HoloUpdate(questions=["new", "q2"]), db_session
+        )
+        assert holo.question_weights == {"new": 2.0, "q2": 1.0}
+
+        holo = update_holo_config(
+            sample_user_id,
+            HoloUpdate(questions=["new", "q2"], question_weights=None),
+            db_session,
+        )
+        assert holo.question_weights is None
+
+    def test_invalid_weights_rejected(self, db_session, sample_user_id):
+        """Test that weights for unknown questions are rejected"""
+        with pytest.raises(ValueError):
+            create_holo_config(
+                sample_user_id,
+                HoloCreate(
+                    user_id=sample_user_id,
+                    questions=["q1"],
+                    question_weights={"q2": 1.0},
+                ),
+                db_session,
+            )
+
+    def test_rescore_requires_weights(
+        self, db_session, sample_user_id, sample_holo_config
+    ):
+        """Test rescoring without weights or without a holo"""
+        assert rescore_holo_dailies(sample_user_id, db_session) is None
+        create_holo_config(sample_user_id, sample_holo_config, db_session)
+        with pytest.raises(ValueError):
+            rescore_holo_dailies(sample_user_id, db_session)
@@ -0,0 +1,119 @@
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from src.db.migrations import migrate_schema
+from src.db.session import Base
+from src.models.holos import HoloDailiesTable, HoloTable
+
+
+def _engine():
+    return create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+
+# holo and holo_dailies as first deployed, before the packed answers and weights
+LEGACY_SCHEMA = [
+    """CREATE TABLE users (
+        user_id VARCHAR PRIMARY KEY,
+        user_name VARCHAR NOT NULL,
+        user_email VARCHAR NOT NULL,
+        created_at TIMESTAMP,
+        updated_at TIMESTAMP,
+        deleted_at TIMESTAMP
+    )""",
+    """CREATE TABLE holo (
+        holo_id VARCHAR PRIMARY KEY,
+        user_id VARCHAR NOT NULL REFERENCES users(user_id),
+        questions JSONB NOT NULL,
+        created_at TIMESTAMP,
+        updated_at TIMESTAMP,
+        deleted_at TIMESTAMP,
+        UNIQUE (user_id)
+    )""",
+    """CREATE TABLE holo_dailies (
+        holo_daily_id VARCHAR PRIMARY KEY,
+        holo_id VARCHAR NOT NULL REFERENCES holo(holo_id),
+        entry_date DATE NOT NULL,
+        score INTEGER NOT NULL,
+        answers JSONB NOT NULL,
+        created_at TIMESTAMP,
+        updated_at TIMESTAMP,
+        deleted_at TIMESTAMP,
+        UNIQUE (holo_id, entry_date)
+    )""",
+    "INSERT INTO users (user_id, user_name, user_email) VALUES ('u', 'U', 'u@x')",
+    "INSERT INTO holo (holo_id, user_id, questions) VALUES ('h', 'u', '[\"q1\"]')",
+]
+
+
+class TestMigrateSchema:
+    def test_adds_missing_columns(self):
+        """Test that a pre-existing database can be read through the models"""
+        engine = _engine()
+        with engine.begin() as conn:
+            for statement in LEGACY_SCHEMA:
+                conn.execute(text(statement))
+
+        added = migrate_schema(engine)
+        assert "holo.question_weights" in added
+        assert "holo_dailies.answer_bits" in added
+        assert "holo_stats" in added
+
+        with Session(engine) as db:
+            holo = db.query(HoloTable).one()
+            assert (holo.questions, holo.questions_version) == (["q1"], 1)
+            assert holo.question_index is None
+            assert db.query(HoloDailiesTable).count() == 0
+        assert migrate_schema(engine) == []
+
+    def test_creates_missing_tables(self):
+        """Test that tables added after the database was created are created"""
+        engine = _engine()
+        Base.metadata.create_all(
+            bind=engine,
+            tables=[
+                table
+                for table in Base.metadata.sorted_tables
+                if table.name != "holo_stats"
+            ],
+        )
+
+        assert migrate_schema(engine) == ["holo_stats"]
+        assert inspect(engine).has_table("holo_stats")
+
+    def test_idempotent(self):
+        """Test that an up-to-date schema is left alone"""
+        engine = _engine()
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    "INSERT INTO users (user_id, user_name, user_email) VALUES ('u', 'U', 'u@x')"
+                )
+            )
+
+        assert migrate_schema(engine) == []
+        assert migrate_schema(engine) == []
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT count(*) FROM users")).scalar() == 1
+
+    def test_normalizes_legacy_questions(self):
+        """Test that legacy {"questions": [...]} configs become plain lists"""
+        engine = _engine()
+        with engine.begin() as conn:
+            for statement in LEGACY_SCHEMA:
+                conn.execute(text(statement))
+            conn.execute(
+                text("UPDATE holo SET questions = :q"),
+                {"q": '{"questions": ["q1", "q2"]}'},
+            )
+
+        added = migrate_schema(engine)
+        assert "holo.questions (1 legacy config(s) normalized)" in added
+
+        with Session(engine) as db:
+            assert db.query(HoloTable).one().questions == ["q1", "q2"]
+        assert migrate_schema(engine) == []
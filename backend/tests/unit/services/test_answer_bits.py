@@ -0,0 +1,46 @@
+import pytest
+from src.services.answer_bits import (
+    MAX_PACKED_QUESTIONS,
+    extend_question_index,
+    pack_answers,
+    unpack_answers,
+)
+
+
+def test_extend_question_index_is_append_only():
+    index, changed = extend_question_index(["a", "b"], None)
+    assert index == {"a": 0, "b": 1} and changed
+
+    # Removed questions keep their bit; new ones never reuse it
+    index, changed = extend_question_index(["b", "c"], index)
+    assert index == {"a": 0, "b": 1, "c": 2} and changed
+
+    _, changed = extend_question_index(["c", "a"], index)
+    assert not changed
+
+
+def test_pack_roundtrip():
+    index = {"a": 0, "b": 1, "c": 5}
+    answers = {"a": True, "b": False, "c": True}
+
+    bits, mask = pack_answers(answers, index)
+    assert (bits, mask) == (0b100001, 0b100011)
+    assert unpack_answers(bits, mask, index) == answers
+
+
+@pytest.mark.parametrize(
+    "answers",
+    [
+        {},
+        {"unknown": True},
+        {"a": "yes"},
+        {"a": 1},
+    ],
+)
+def test_pack_rejects_lossy_answers(answers):
+    assert pack_answers(answers, {"a": 0}) is None
+
+
+def test_pack_rejects_bits_beyond_limit():
+    assert pack_answers({"a": True}, {"a": MAX_PACKED_QUESTIONS}) is None
+    assert pack_answers({"a": True}, {"a": MAX_PACKED_QUESTIONS - 1}) is not None
@@ -0,0 +1,226 @@
+from datetime import date
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from src.core.cache import derived_cache, holo_tag
+from src.db.holos import (
+    apply_invalidation,
+    create_holo_config,
+    create_holo_daily,
+    rename_holo_questions,
+    upsert_holo_dailies,
+)
+from src.db.session import Base
+from src.models.holos import (
+    HoloCreate,
+    HoloDailiesTable,
+    HoloDailyCreate,
+    HoloQuestionsRename,
+    HoloTable,
+)
+from src.services.holo_analytics import get_answer_analytics, is_yes
+
+QUESTIONS = ["Have you worked out?", "Have you slept +8h?", "Never answered?"]
+
+
+@pytest.fixture()
+def db_session():
+    """Create a database session for testing using in-memory SQLite"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    derived_cache.clear()
+
+    session = TestingSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        derived_cache.clear()
+
+
+@pytest.fixture()
+def holo_id(db_session):
+    user_id = str(uuid4())
+    holo = create_holo_config(
+        user_id, HoloCreate(user_id=user_id, questions=QUESTIONS), db_session
+    )
+    return holo.holo_id
+
+
+@pytest.fixture()
+def history(db_session, holo_id):
+    workout, sleep = QUESTIONS[0], QUESTIONS[1]
+    upsert_holo_dailies(
+        holo_id,
+        [
+            HoloDailyCreate(
+                entry_date="2024-01-01",
+                score=8,
+                answers={workout: True, sleep: "yes", "legacy": 1},
+            ),
+            HoloDailyCreate(
+                entry_date="2024-01-02", score=2, answers={workout: False, sleep: True}
+            ),
+            HoloDailyCreate(
+                entry_date="2024-01-03", score=9, answers={workout: True, sleep: 1}
+            ),
+            HoloDailyCreate(
+                entry_date="2024-01-04", score=7, answers={workout: True, sleep: "no"}
+            ),
+        ],
+        db_session,
+    )
+
+
+def test_is_yes():
+    assert is_yes(True) and is_yes(1) and is_yes(" Yes ") and is_yes("true")
+    assert not (is_yes(False) or is_yes(0) or is_yes("no") or is_yes("Great"))
+
+
+def test_per_question_analytics(db_session, holo_id, history):
+    result = get_answer_analytics(holo_id, QUESTIONS, db_session, end=date(2024, 1, 5))
+    assert result.dailies == 4
+    assert [q.question for q in result.questions] == QUESTIONS + ["legacy"]
+
+    workout, sleep, never, legacy = result.questions
+    assert (workout.answered, workout.yes_count, workout.completion_rate) == (
+        4,
+        3,
+        0.75,
+    )
+    assert (workout.current_streak, workout.longest_streak) == (2, 2)
+    assert workout.score_correlation == pytest.approx(0.9649, abs=1e-4)
+
+    assert (sleep.yes_count, sleep.longest_streak, sleep.current_streak) == (3, 3, 0)
+    assert never.answered == 0 and never.completion_rate is None
+    assert (legacy.answered, legacy.yes_count) == (1, 1)
+    # A question that was always "yes" has no variance, so no correlation
+    assert legacy.score_correlation is None
+
+
+def test_period_filter(db_session, holo_id, history):
+    result = get_answer_analytics(
+        holo_id,
+        QUESTIONS,
+        db_session,
+        start=date(2024, 1, 2),
+        end=date(2024, 1, 3),
+    )
+    assert result.dailies == 2
+    workout = result.questions[0]
+    assert (workout.answered, workout.yes_count, workout.current_streak) == (2, 1, 1)
+
+
+def test_end_bounded(db_session, holo_id, history):
+    """Streaks past the last daily end, and the period never runs past today"""
+    for end in (date(2024, 1, 6), date(2024, 3, 1)):
+        workout = get_answer_analytics(
+            holo_id, QUESTIONS, db_session, end=end
+        ).questions[0]
+        assert (workout.current_streak, workout.longest_streak) == (0, 2)
+
+    result = get_answer_analytics(
+        holo_id, QUESTIONS, db_session, end=date(9999, 12, 31)
+    )
+    assert result.end == date.today()
+    assert result.dailies == 4
+
+
+def test_cached_until_next_write(db_session, holo_id, history):
+    end = date(2024, 1, 10)
+    first = get_answer_analytics(holo_id, QUESTIONS, db_session, end=end)
+    assert get_answer_analytics(holo_id, QUESTIONS, db_session, end=end) is first
+
+    create_holo_daily(
+        holo_id,
+        HoloDailyCreate(entry_date="2024-01-05", score=5, answers={QUESTIONS[0]: True}),
+        db_session,
+    )
+    refreshed = get_answer_analytics(holo_id, QUESTIONS, db_session, end=end)
+    assert refreshed.dailies == 5
+
+
+def test_cache_invalidated_by_other_worker(db_session, holo_id, history):
+    """Renames are announced too, and a notice drops this worker's entry"""
+    user_id = db_session.get(HoloTable, holo_id).user_id
+    with patch("src.db.holos._publish_invalidation") as publish:
+        rename_holo_questions(
+            user_id,
+            HoloQuestionsRename(renames={QUESTIONS[2]: "Never asked?"}),
+            db_session,
+        )
+    publish.assert_any_call(holo_tag(holo_id), db_session)
+
+    end = date(2024, 1, 10)
+    first = get_answer_analytics(holo_id, QUESTIONS, db_session, end=end)
+    # Committed by another worker: this worker's cache only hears the notice
+    db_session.add(
+        HoloDailiesTable(
+            holo_id=holo_id, entry_date=date(2024, 1, 6), score=1, answers={}
+        )
+    )
+    db_session.commit()
+    assert get_answer_analytics(holo_id, QUESTIONS, db_session, end=end) is first
+
+    apply_invalidation(holo_tag(holo_id))
+    refreshed = get_answer_analytics(holo_id, QUESTIONS, db_session, end=end)
+    assert refreshed.dailies == 5
+
+
+def test_packed_answers_match_json(db_session, holo_id, monkeypatch):
+    """Analytics over packed rows equal analytics over the same JSON rows"""
+    dailies = [
+        HoloDailyCreate(
+            entry_date=f"2024-01-0{day}",
+            score=score,
+            answers={QUESTIONS[0]: workout, QUESTIONS[1]: not workout},
+        )
+        for day, score, workout in [(1, 8, True), (2, 3, False), (3, 9, True)]
+    ]
+    upsert_holo_dailies(holo_id, dailies, db_session)
+    as_json = get_answer_analytics(holo_id, QUESTIONS, db_session, end=date(2024, 1, 3))
+
+    monkeypatch.setattr("src.db.holos.settings.HOLO_ANSWER_STORAGE", "bits")
+    upsert_holo_dailies(holo_id, dailies, db_session)
+    packed = db_session.query(HoloDailiesTable).filter(
+        HoloDailiesTable.answers == {}, HoloDailiesTable.answer_mask.isnot(None)
+    )
+    assert packed.count() == 3
+    as_bits = get_answer_analytics(holo_id, QUESTIONS, db_session, end=date(2024, 1, 3))
+
+    assert as_bits is not as_json
+    assert as_bits == as_json
+
+
+def test_write_during_computation_not_cached(db_session, holo_id, history):
+    """A result computed before a daily write's invalidation is not stored"""
+    import src.services.holo_analytics as analytics
+
+    end = date(2024, 1, 10)
+    compute = analytics._analytics_numpy
+
+    def compute_then_write(holo_id, start, end, db):
+        result = compute(holo_id, start, end, db)
+        create_holo_daily(
+            holo_id,
+            HoloDailyCreate(
+                entry_date="2024-01-05", score=5, answers={QUESTIONS[0]: True}
+            ),
+            db,
+        )
+        return result
+
+    with patch.object(analytics, "_analytics_numpy", compute_then_write):
+        stale = get_answer_analytics(holo_id, QUESTIONS, db_session, end=end)
+    assert stale.questions[0].answered == 4
+    fresh = get_answer_analytics(holo_id, QUESTIONS, db_session, end=end)
+    assert fresh.questions[0].answered == 5
@@ -0,0 +1,159 @@
+from datetime import date, timedelta
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from src.core.cache import derived_cache, holo_tag
+from src.db.holos import apply_invalidation, create_holo_config, upsert_holo_dailies
+from src.db.session import Base
+from src.models.holos import HoloCreate, HoloDailiesTable, HoloDailyCreate
+from src.services.holo_timeseries import get_score_timeseries
+
+
+@pytest.fixture()
+def db_session():
+    """Create a database session for testing using in-memory SQLite"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    derived_cache.clear()
+
+    session = TestingSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        derived_cache.clear()
+
+
+@pytest.fixture()
+def holo_id(db_session):
+    user_id = str(uuid4())
+    holo = create_holo_config(
+        user_id, HoloCreate(user_id=user_id, questions=["q1"]), db_session
+    )
+    return holo.holo_id
+
+
+def _backfill(holo_id, db, scores_by_date):
+    upsert_holo_dailies(
+        holo_id,
+        [
+            HoloDailyCreate(entry_date=d.isoformat(), score=s, answers={"q1": True})
+            for d, s in scores_by_date.items()
+        ],
+        db,
+    )
+
+
+def test_empty_history(db_session, holo_id):
+    result = get_score_timeseries(holo_id, db_session)
+    assert result.daily == []
+    assert result.weekly == []
+    assert result.weekdays == []
+
+
+def test_moving_averages_use_calendar_windows(db_session, holo_id):
+    """A gap longer than the window drops older days out of the average"""
+    _backfill(
+        holo_id,
+        db_session,
+        {
+            date(2024, 1, 1): 2,  # Monday
+            date(2024, 1, 3): 4,
+            date(2024, 1, 7): 6,  # Sunday, still within 7 days of Jan 1
+            date(2024, 1, 8): 8,  # Jan 1 falls out of the 7-day window
+            date(2024, 3, 1): 10,  # only Jan dailies within 90 days
+        },
+    )
+
+    daily = get_score_timeseries(holo_id, db_session).daily
+    assert [p.ma_7 for p in daily] == [2.0, 3.0, 4.0, 6.0, 10.0]
+    assert [p.ma_30 for p in daily] == [2.0, 3.0, 4.0, 5.0, 10.0]
+    assert daily[-1].ma_90 == 6.0
+
+
+def test_period_and_weekday_means(db_session, holo_id):
+    _backfill(
+        holo_id,
+        db_session,
+        {
+            date(2024, 1, 29): 2,  # Monday
+            date(2024, 1, 31): 4,  # Wednesday
+            date(2024, 2, 5): 6,  # Monday
+        },
+    )
+
+    result = get_score_timeseries(holo_id, db_session)
+    assert [(w.period_start, w.avg_score, w.count) for w in result.weekly] == [
+        (date(2024, 1, 29), 3.0, 2),
+        (date(2024, 2, 5), 6.0, 1),
+    ]
+    assert [(m.period_start, m.avg_score) for m in result.monthly] == [
+        (date(2024, 1, 1), 3.0),
+        (date(2024, 2, 1), 6.0),
+    ]
+    assert [(w.weekday, w.avg_score, w.count) for w in result.weekdays] == [
+        (0, 4.0, 2),
+        (2, 4.0, 1),
+    ]
+
+
+def test_cache_invalidated_by_daily_write(db_session, holo_id):
+    start = date(2024, 1, 1)
+    _backfill(holo_id, db_session, {start + timedelta(days=i): i for i in range(3)})
+
+    first = get_score_timeseries(holo_id, db_session)
+    assert get_score_timeseries(holo_id, db_session) is first
+
+    _backfill(holo_id, db_session, {start + timedelta(days=3): 9})
+    refreshed = get_score_timeseries(holo_id, db_session)
+    assert refreshed is not first
+    assert len(refreshed.daily) == 4
+
+
+def test_cache_invalidated_by_other_worker(db_session, holo_id):
+    """A write on another worker is announced by NOTIFY and drops this entry"""
+    start = date(2024, 1, 1)
+    with patch("src.db.holos._publish_invalidation") as publish:
+        _backfill(holo_id, db_session, {start: 1})
+    publish.assert_called_once_with(holo_tag(holo_id), db_session)
+
+    first = get_score_timeseries(holo_id, db_session)
+    # Committed by another worker: this worker's cache only hears the notice
+    db_session.add(
+        HoloDailiesTable(
+            holo_id=holo_id, entry_date=start + timedelta(days=1), score=3, answers={}
+        )
+    )
+    db_session.commit()
+    assert get_score_timeseries(holo_id, db_session) is first
+
+    apply_invalidation(holo_tag(holo_id))
+    assert len(get_score_timeseries(holo_id, db_session).daily) == 2
+
+
+def test_write_during_computation_not_cached(db_session, holo_id):
+    """A result computed before a daily write's invalidation is not stored"""
+    import src.services.holo_timeseries as timeseries
+
+    start = date(2024, 1, 1)
+    _backfill(holo_id, db_session, {start: 1})
+    compute = timeseries._timeseries_numpy
+
+    def compute_then_write(holo_id, db):
+        result = compute(holo_id, db)
+        _backfill(holo_id, db, {start + timedelta(days=1): 3})
+        return result
+
+    with patch.object(timeseries, "_timeseries_numpy", compute_then_write):
+        stale = get_score_timeseries(holo_id, db_session)
+    assert len(stale.daily) == 1
+    assert len(get_score_timeseries(holo_id, db_session).daily) == 2
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from src.services.scoring import (
+    compute_scores,
+    score_answers,
+    validate_weights,
+    yes_matrix,
+)
+
+
+def test_yes_matrix_mixes_json_and_packed_rows():
+    rows = [
+        ({"a": True, "b": "no", "other": True}, None, None),
+        ({}, 0b101, 0b111),  # packed: a yes, b no, c yes
+        ({}, None, None),
+    ]
+    yes = yes_matrix(rows, ["a", "b", "c"], {"a": 0, "b": 1, "c": 2})
+    assert yes.tolist() == [
+        [True, False, False],
+        [True, False, True],
+        [False, False, False],
+    ]
+
+
+def test_compute_scores_weighted_share():
+    yes = np.array([[1, 0, 0], [1, 1, 1], [0, 1, 1], [0, 0, 0]], dtype=bool)
+    weights = np.array([2.0, 1.0, 1.0])
+    assert compute_scores(yes, weights).tolist() == [5, 10, 5, 0]
+
+
+def test_compute_scores_rounds_half_up():
+    yes = np.array([[1, 0, 0, 0]], dtype=bool)
+    # 1/8 of 10 is 1.25 -> 1; 3/8 is 3.75 -> 4; 1/4 is exactly 2.5 -> 3
+    assert compute_scores(yes, np.array([1.0, 7.0, 0, 0]))[0] == 1
+    assert compute_scores(yes, np.array([3.0, 5.0, 0, 0]))[0] == 4
+    assert compute_scores(yes, np.array([1.0, 3.0, 0, 0]))[0] == 3
+
+
+def test_compute_scores_zero_weights():
+    yes = np.ones((2, 2), dtype=bool)
+    assert compute_scores(yes, np.zeros(2)).tolist() == [0, 0]
+
+
+def test_score_answers_matches_bulk_path():
+    weights = {"a": 3.0, "b": 1.0}
+    assert score_answers({"a": True, "b": False}, weights) == 8
+    assert score_answers({}, weights, 0b10, 0b11, {"a": 0, "b": 1}) == 3
+
+
+@pytest.mark.parametrize(
+    "weights",
+    [
+        {"missing": 1.0},
+        {"a": -1.0},
+        {"a": float("inf")},
+    ],
+)
+def test_validate_weights_rejects(weights):
+    with pytest.raises(ValueError):
+        validate_weights(weights, ["a"])
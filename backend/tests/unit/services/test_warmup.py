@@ -0,0 +1,66 @@
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from src.core.cache import derived_cache
+from src.db.session import Base
+from src.models.holos import HoloStatsTable
+from src.services import warmup
+from src.services.warmup import warm_statement_cache
+
+
+@pytest.fixture()
+def engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+class TestWarmStatementCache:
+    def test_runs_every_read_without_writing(self, engine):
+        """Test that warm-up reads succeed and leave no rows or cache entries"""
+        statements = []
+        event.listen(
+            engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: statements.append(statement),
+        )
+        db = sessionmaker(bind=engine)()
+        try:
+            assert warm_statement_cache(db) == []
+            assert db.scalar(select(func.count()).select_from(HoloStatsTable)) == 0
+        finally:
+            db.close()
+
+        assert statements
+        assert not any(s.lstrip().upper().startswith("INSERT") for s in statements)
+        assert derived_cache.get(("timeseries", warmup.WARMUP_ID)) is None
+
+    def test_failed_read_is_reported(self, engine):
+        """Test that one failing read does not stop the others"""
+        db = sessionmaker(bind=engine)()
+        Base.metadata.drop_all(bind=engine, tables=[HoloStatsTable.__table__])
+        try:
+            failed = warm_statement_cache(db)
+        finally:
+            db.close()
+        assert "holos.streak" in failed
+        assert "entries.list" not in failed
+
+
+class TestReadiness:
+    def test_ready_after_startup(self):
+        """Test that readiness flips to 200 once the lifespan has started"""
+        warmup.ready.clear()
+        client = TestClient(app)
+        assert client.get("/api/health/ready").status_code == 503
+        with TestClient(app) as started:
+            response = started.get("/api/health/ready")
+        assert response.status_code == 200
+        assert response.json() == {"status": "ready"}
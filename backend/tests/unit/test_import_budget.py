@@ -0,0 +1,29 @@
+import os
+from pathlib import Path
+
+import pytest
+from src.scripts.profile_imports import profile_imports, total_seconds
+
+BACKEND = Path(__file__).resolve().parents[2]
+
+# Loaded on first use (token verification, NumPy fallbacks, engine creation)
+LAZY_MODULES = ("firebase_admin", "numpy", "psycopg2")
+
+# Generous so that slow CI machines pass; lower it locally to catch creep
+BUDGET_SECONDS = float(os.getenv("IMPORT_BUDGET_SECONDS", "3.0"))
+
+
+@pytest.fixture(scope="module")
+def timings():
+    return profile_imports("main", cwd=str(BACKEND))
+
+
+class TestImportBudget:
+    def test_heavy_modules_are_lazy(self, timings):
+        """Test that importing the app does not pull in the heavy SDKs"""
+        imported = {timing.module for timing in timings}
+        assert not imported.intersection(LAZY_MODULES)
+
+    def test_import_within_budget(self, timings):
+        """Test that importing the app stays within the cold-start budget"""
+        assert 0 < total_seconds(timings) < BUDGET_SECONDS
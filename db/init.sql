@@ -1,3 +1,6 @@
+-- Creates a fresh database. Existing databases get new tables and columns
+-- from the idempotent migration: python -m src.scripts.migrate_schema
+
 -- USERS
 CREATE TABLE IF NOT EXISTS users (
     user_id VARCHAR PRIMARY KEY,
@@ -26,6 +29,9 @@ CREATE TABLE IF NOT EXISTS holo (
     holo_id VARCHAR PRIMARY KEY,
     user_id VARCHAR NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
     questions JSONB NOT NULL,
+    question_index JSONB NULL,
+    question_weights JSONB NULL,
+    questions_version INTEGER NOT NULL DEFAULT 1,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     deleted_at TIMESTAMP NULL,
@@ -39,6 +45,9 @@ CREATE TABLE IF NOT EXISTS holo_dailies (
     entry_date DATE NOT NULL,
     score INTEGER NOT NULL,
     answers JSONB NOT NULL,
+    answer_bits BIGINT NULL,
+    answer_mask BIGINT NULL,
+    answers_version INTEGER NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     deleted_at TIMESTAMP NULL,
@@ -52,3 +61,17 @@ CREATE INDEX IF NOT EXISTS idx_entries_entry_date ON entries(entry_date);
 CREATE INDEX IF NOT EXISTS idx_holo_user_id ON holo(user_id);
 CREATE INDEX IF NOT EXISTS idx_holo_dailies_holo_id ON holo_dailies(holo_id);
 CREATE INDEX IF NOT EXISTS idx_holo_dailies_entry_date ON holo_dailies(entry_date);
+
+-- HOLO_STATS (running score aggregate per holo, kept in sync with holo_dailies)
+CREATE TABLE IF NOT EXISTS holo_stats (
+    holo_id VARCHAR PRIMARY KEY REFERENCES holo(holo_id) ON DELETE CASCADE,
+    score_sum INTEGER NOT NULL DEFAULT 0,
+    score_count INTEGER NOT NULL DEFAULT 0,
+    score_min INTEGER NULL,
+    score_max INTEGER NULL,
+    last_entry_date DATE NULL,
+    streak_start DATE NULL,
+    streak_length INTEGER NOT NULL DEFAULT 0,
+    longest_streak INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
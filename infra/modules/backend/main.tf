@@ -254,7 +254,7 @@ resource "aws_lb_target_group" "this" {
     unhealthy_threshold = 3
     timeout             = 5
     interval            = 30
-    path                = "/nginx-health"
+    path                = "/ready" # backend readiness, proxied by nginx
     protocol            = "HTTP"
     matcher             = "200"
   }
@@ -289,6 +289,9 @@ resource "aws_ecs_service" "this" {
   desired_count   = 1
   launch_type     = "FARGATE"
 
+  # Allow for startup and warm-up before failed health checks count
+  health_check_grace_period_seconds = 60
+
   network_configuration {
     subnets          = data.aws_subnets.default.ids
     security_groups  = [aws_security_group.ecs_sg.id]